@@ -0,0 +1,223 @@
+"""Micro-benchmarks of the client-side overhead of every PestoAPI endpoint method
+
+Requests are answered by a local stub transport (see stub.py), so what is
+measured is argument preprocessing, url building, header merging, response
+handling and JSON decoding. Run from the repository root:
+
+    python -m benchmarks.bench_client                      # print results
+    python -m benchmarks.bench_client --save baseline.json # save a baseline
+    python -m benchmarks.bench_client --compare baseline.json
+
+``--compare`` exits with status 1 when a benchmark is slower than the
+baseline by more than ``--threshold`` (default 15%).
+"""
+
+import argparse
+import inspect
+import json
+import sys
+import time
+import tracemalloc
+
+from pypestoai import PestoAPI
+from pypestoai.transport import InMemoryTransport
+from pypestoai.utils import canonical_url, default_json_decoder, func_args_preprocessing
+
+from .stub import StubAdapter, coins_list, coins_markets, market_chart, stub_handler
+
+# value used for each required argument of the endpoint methods
+ARGUMENTS = {
+    "id": "bitcoin",
+    "coin_id": "bitcoin",
+    "ids": ["bitcoin", "ethereum", "tether", "solana", "ripple"],
+    "vs_currency": "usd",
+    "vs_currencies": ["usd", "eur"],
+    "contract_address": "0xdac17f958d2ee523a2206206994597c13d831ec7",
+    "contract_addresses": ["0xdac17f958d2ee523a2206206994597c13d831ec7"],
+    "asset_platform_id": "ethereum",
+    "market_id": "binance",
+    "days": 1,
+    "from_timestamp": 1672531200,
+    "to_timestamp": 1704067200,
+    "date": "30-12-2023",
+    "interval": "daily",
+    "query": "bitcoin",
+}
+
+
+def endpoint_methods(pto):
+    """Return (name, bound method, kwargs) for every endpoint method of the client"""
+    methods = []
+    for name, method in inspect.getmembers(pto, inspect.ismethod):
+        if not (name.startswith("get_") or name in ("ping", "key", "search")):
+            continue
+        parameters = inspect.signature(method).parameters.values()
+        kwargs = {
+            p.name: ARGUMENTS[p.name]
+            for p in parameters
+            if p.kind is p.POSITIONAL_OR_KEYWORD and p.default is p.empty
+        }
+        methods.append((name, method, kwargs))
+    return methods
+
+
+def measure(fn, min_time):
+    """Return (ops/sec, mean seconds, peak KiB allocated per call) of fn()"""
+    fn()  # warm up
+    iterations = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        fn()
+        iterations += 1
+        elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return iterations / elapsed, elapsed / iterations, peak / 1024
+
+
+def micro_benchmarks():
+    """Benchmarks of the individual steps of the request hot path"""
+    decoder = default_json_decoder()
+    stdlib_decoder = json.loads
+    coins = json.dumps(coins_list()).encode()
+    markets = json.dumps(coins_markets()).encode()
+    chart = json.dumps(market_chart()).encode()
+
+    @func_args_preprocessing
+    def preprocessed(ids, vs_currencies, **kwargs):
+        return kwargs
+
+    params = {
+        "vs_currency": "usd",
+        "per_page": 250,
+        "page": 3,
+        "order": "market_cap_desc",
+    }
+    extra_params = {"x-demo-api-key": "key"}
+
+    def merge_headers():
+        headers = {}
+        headers.update(extra_params)
+        return headers
+
+    return [
+        (
+            "func_args_preprocessing",
+            lambda: preprocessed(
+                ARGUMENTS["ids"], ARGUMENTS["vs_currencies"], include_market_cap=True
+            ),
+        ),
+        (
+            "url_building",
+            lambda: "{0}coins/{1}/market_chart".format(
+                "https://api.pestoai.fun/v2/", "bitcoin"
+            ),
+        ),
+        (
+            "canonical_url",
+            lambda: canonical_url("https://api.pestoai.fun/v2/coins/markets", params),
+        ),
+        ("header_merging", merge_headers),
+        ("decode coins_list 15k", lambda: decoder(coins)),
+        ("decode coins_markets 250", lambda: decoder(markets)),
+        ("decode market_chart 1y/5m", lambda: decoder(chart)),
+        ("decode coins_list 15k (json)", lambda: stdlib_decoder(coins)),
+        ("decode market_chart 1y/5m (json)", lambda: stdlib_decoder(chart)),
+    ]
+
+
+def client(transport):
+    """Return a client answering from the stub payloads through the given transport
+
+    "requests" mounts the stub as a requests adapter, so the requests
+    overhead is measured; "memory" uses an InMemoryTransport and measures
+    the client alone.
+    """
+    if transport == "memory":
+        return PestoAPI(
+            demo_api_key="key",
+            transport=InMemoryTransport(stub_handler(), record=False),
+        )
+    pto = PestoAPI(demo_api_key="key")
+    pto.session.mount("https://", StubAdapter())
+    return pto
+
+
+def run(min_time, name_filter=None, transport="requests"):
+    pto = client(transport)
+
+    benchmarks = micro_benchmarks()
+    for name, method, kwargs in endpoint_methods(pto):
+        benchmarks.append((name, lambda method=method, kwargs=kwargs: method(**kwargs)))
+
+    results = {}
+    for name, fn in benchmarks:
+        if name_filter and name_filter not in name:
+            continue
+        ops, mean, peak_kib = measure(fn, min_time)
+        results[name] = {
+            "ops_per_sec": ops,
+            "mean_us": mean * 1e6,
+            "peak_kib": peak_kib,
+        }
+        print(
+            "{0:<70} {1:>12.1f} ops/s {2:>12.1f} us {3:>12.1f} KiB".format(
+                name, ops, mean * 1e6, peak_kib
+            )
+        )
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the benchmarks slower than the baseline by more than threshold, return their count"""
+    regressions = 0
+    for name, result in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        change = result["ops_per_sec"] / previous["ops_per_sec"] - 1
+        if change < -threshold:
+            regressions += 1
+            print("REGRESSION {0}: {1:+.1%} ops/s".format(name, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds per benchmark"
+    )
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--save", help="save the results as a JSON baseline")
+    parser.add_argument("--compare", help="compare with a JSON baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=0.15, help="allowed slowdown"
+    )
+    parser.add_argument(
+        "--transport",
+        choices=["requests", "memory"],
+        default="requests",
+        help="stub behind requests, or an in-memory transport",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.min_time, args.filter, args.transport)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Local stub transport serving realistic canned payloads, so benchmarks need no network"""
+
+import json
+import random
+import re
+from functools import lru_cache
+
+import requests
+from requests.adapters import BaseAdapter
+from urllib.parse import urlsplit
+
+from pypestoai.endpoints import ENDPOINTS_BY_PATH
+
+API_PATH = "/v2/"
+_NOW_MS = 1704067200000
+_FIVE_MINUTES_MS = 5 * 60 * 1000
+
+_PLACEHOLDER = re.compile(r"\{[^}]+\}")
+_STATIC_PATHS = frozenset(p for p in ENDPOINTS_BY_PATH if "{" not in p)
+# templates with more literal segments are tried first, so that e.g.
+# "coins/{id}/market_chart/range" wins over "coins/{id}/contract/{contract_address}"
+_TEMPLATE_PATTERNS = [
+    (
+        template,
+        re.compile(
+            "[^/]+".join(re.escape(part) for part in _PLACEHOLDER.split(template)) + "$"
+        ),
+    )
+    for template in sorted(
+        (p for p in ENDPOINTS_BY_PATH if "{" in p),
+        key=lambda p: -len(_PLACEHOLDER.sub("", p)),
+    )
+]
+
+
+@lru_cache(maxsize=4096)
+def resolve_endpoint(path):
+    """Return the endpoint path template matching a request path, or the path itself if unknown"""
+    if path in _STATIC_PATHS:
+        return path
+    for template, pattern in _TEMPLATE_PATTERNS:
+        if pattern.match(path):
+            return template
+    return path
+
+
+def coins_list(count=15000, include_platform=False):
+    """A /coins/list payload of count entries"""
+    rng = random.Random(0)
+    coins = []
+    for i in range(count):
+        coin = {
+            "id": "coin-{0}".format(i),
+            "symbol": "c{0}".format(rng.randrange(count // 2)),
+            "name": "Coin {0}".format(i),
+        }
+        if include_platform:
+            coin["platforms"] = {"ethereum": "0x{0:040x}".format(i)}
+        coins.append(coin)
+    return coins
+
+
+def coins_markets(rows=250):
+    """A /coins/markets page of rows entries"""
+    rng = random.Random(1)
+    return [
+        {
+            "id": "coin-{0}".format(i),
+            "symbol": "c{0}".format(i),
+            "name": "Coin {0}".format(i),
+            "image": "https://assets.pestoai.fun/coins/images/{0}/large/coin.png".format(
+                i
+            ),
+            "current_price": rng.uniform(0.01, 70000),
+            "market_cap": rng.uniform(1e6, 1e12),
+            "market_cap_rank": i + 1,
+            "fully_diluted_valuation": rng.uniform(1e6, 1e12),
+            "total_volume": rng.uniform(1e3, 1e10),
+            "high_24h": rng.uniform(0.01, 70000),
+            "low_24h": rng.uniform(0.01, 70000),
+            "price_change_24h": rng.uniform(-100, 100),
+            "price_change_percentage_24h": rng.uniform(-10, 10),
+            "market_cap_change_24h": rng.uniform(-1e6, 1e6),
+            "market_cap_change_percentage_24h": rng.uniform(-10, 10),
+            "circulating_supply": rng.uniform(1e6, 1e9),
+            "total_supply": rng.uniform(1e6, 1e9),
+            "max_supply": None,
+            "ath": rng.uniform(0.01, 70000),
+            "ath_change_percentage": rng.uniform(-99, 0),
+            "ath_date": "2021-11-10T14:24:11.849Z",
+            "atl": rng.uniform(0.0001, 1),
+            "atl_change_percentage": rng.uniform(0, 1e6),
+            "atl_date": "2013-07-06T00:00:00.000Z",
+            "roi": None,
+            "last_updated": "2024-01-01T00:00:00.000Z",
+        }
+        for i in range(rows)
+    ]
+
+
+def series(points):
+    """A [timestamp, value] series of points 5 minutes apart"""
+    rng = random.Random(2)
+    start = _NOW_MS - points * _FIVE_MINUTES_MS
+    return [
+        [start + i * _FIVE_MINUTES_MS, rng.uniform(1, 70000)] for i in range(points)
+    ]
+
+
+def market_chart(points=365 * 24 * 12):
+    """A market chart payload, one year at 5-minute granularity by default"""
+    return {
+        "prices": series(points),
+        "market_caps": series(points),
+        "total_volumes": series(points),
+    }
+
+
+def ohlc(rows=365 * 6):
+    """OHLC rows, one year of 4-hour candles by default"""
+    return [row[:1] + [row[1]] * 4 for row in series(rows)]
+
+
+def payloads():
+    """Return the body served for each endpoint path template"""
+    chart = json.dumps(market_chart()).encode()
+    supply = json.dumps({"circulating_supply": series(365 * 24)}).encode()
+    bodies = {
+        "coins/list": json.dumps(coins_list()).encode(),
+        "coins/markets": json.dumps(coins_markets()).encode(),
+        "coins/{id}/market_chart": chart,
+        "coins/{id}/market_chart/range": chart,
+        "coins/{id}/contract/{contract_address}/market_chart": chart,
+        "coins/{id}/contract/{contract_address}/market_chart/range": chart,
+        "coins/{id}/ohlc": json.dumps(ohlc()).encode(),
+        "coins/{id}/ohlc/range": json.dumps(ohlc()).encode(),
+        "coins/{id}/circulating_supply_chart": supply,
+        "coins/{id}/circulating_supply_chart/range": supply,
+        "coins/{id}/total_supply_chart": supply,
+        "coins/{id}/total_supply_chart/range": supply,
+        "global": b'{"data": {"active_cryptocurrencies": 10000, "markets": 900}}',
+        "global/decentralized_finance_defi": b'{"data": {"defi_market_cap": "1"}}',
+    }
+    return bodies
+
+
+def stub_handler(bodies=None, default=b'{"ok": true}'):
+    """InMemoryTransport handler answering every endpoint with its canned payload"""
+    bodies = payloads() if bodies is None else bodies
+
+    def handler(path, params, headers):
+        return 200, bodies.get(resolve_endpoint(path), default)
+
+    return handler
+
+
+class StubAdapter(BaseAdapter):
+    """requests transport adapter answering every request from memory"""
+
+    def __init__(self, bodies=None, default=b'{"ok": true}'):
+        super().__init__()
+        self.bodies = payloads() if bodies is None else bodies
+        self.default = default
+
+    def send(self, request, **kwargs):
+        path = urlsplit(request.url).path
+        template = resolve_endpoint(path[path.index(API_PATH) + len(API_PATH) :])
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response._content = self.bodies.get(template, self.default)
+        response.headers["Content-Type"] = "application/json"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
@@ -1,2 +1,11 @@
 from .api import PestoAPI
+from .async_api import AsyncPestoAPI
+from .exceptions import (
+    CircuitOpenError,
+    CreditBudgetError,
+    NotFoundError,
+    PestoAPIError,
+    RateLimitError,
+    ServerError,
+)
 from ._version import __version__
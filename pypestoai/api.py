@@ -1,17 +1,80 @@
-import json
+import contextvars
+import threading
+import time
 import requests
 
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
-
-from .utils import func_args_preprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from .bulk import bulk
+from .cache import ResponseCache
+from .circuit import CircuitBreaker
+from .coalesce import SingleFlight
+from .conditional import ValidatorStore
+from .endpoints import add_endpoint_methods
+from .exceptions import error_from_response
+from .metrics import InMemoryMetrics, RequestSample
+from .pagination import paginate
+from .ranges import merge_series, range_batches
+from .ratelimit import RateLimiter
+from .records import to_records
+from .retry import JitteredRetry
+from .scheduler import CreditScheduler
+from .streaming import JSONArrayStream
+from .transport import RequestsTransport, Urllib3Transport
+from .utils import (
+    canonical_url,
+    default_json_decoder,
+    merge_batch_results,
+    split_batches,
+)
 
 
 class PestoAPI:
+    """Client of the Pesto API
+
+    An instance may be shared between threads: requests go through a pool of
+    up to ``pool_maxsize`` keep-alive connections (``pool_block=True`` makes
+    threads wait for a free connection instead of opening extra, unpooled
+    ones). With ``per_thread_session=True`` every thread uses its own
+    requests.Session and connection pool instead.
+
+    Requests are sent by a Transport: requests by default, ``"urllib3"``
+    for the lower-overhead urllib3 PoolManager backend, or any Transport
+    instance (e.g. an InMemoryTransport in tests).
+
+    429 and temporary 5xx responses are retried up to ``retries`` times
+    within ``retry_budget`` seconds, honouring Retry-After, see JitteredRetry.
+    """
+
     __API_URL_BASE = "https://api.pestoai.fun/v2/"
     __PRO_API_URL_BASE = "https://api.pestoai.fun/v2/"
 
-    def __init__(self, api_key: str = "", retries=5, demo_api_key: str = ""):
+    def __init__(
+        self,
+        api_key: str = "",
+        retries=5,
+        demo_api_key: str = "",
+        cache=None,
+        max_list_length=2000,
+        max_batch_workers=8,
+        rate_limit=None,
+        json_decoder=None,
+        conditional_requests=False,
+        coalesce=False,
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_block=False,
+        keep_alive=True,
+        connect_timeout=None,
+        read_timeout=120,
+        per_thread_session=False,
+        metrics=None,
+        stream_chunk_size=65536,
+        transport=None,
+        retry_budget=60,
+        circuit_breaker=None,
+        scheduler=None,
+    ):
 
         self.extra_params = None
         if api_key:
@@ -22,434 +85,384 @@ class PestoAPI:
             if demo_api_key:
                 self.extra_params = {"x-demo-api-key": demo_api_key}
 
-        self.request_timeout = 120
-        self.session = requests.Session()
-        retries = Retry(
-            total=retries, backoff_factor=0.5, status_forcelist=[502, 503, 504]
+        # a (connect, read) tuple when connect_timeout is set
+        self.request_timeout = (
+            read_timeout if connect_timeout is None else (connect_timeout, read_timeout)
+        )
+        self.retry = JitteredRetry(
+            total=retries, backoff_factor=0.5, budget=retry_budget
         )
-        self.session.mount("https://", HTTPAdapter(max_retries=retries))
+        if transport is None or transport == "requests":
+            transport = RequestsTransport(
+                self.retry,
+                pool_connections,
+                pool_maxsize,
+                pool_block,
+                keep_alive,
+                per_thread_session,
+            )
+        elif transport == "urllib3":
+            transport = Urllib3Transport(
+                self.retry, pool_connections, pool_maxsize, pool_block, keep_alive
+            )
+        self.transport = transport
+
+        # opt-in response cache: True for the defaults, or a ResponseCache
+        if cache is True:
+            cache = ResponseCache()
+        self.cache = cache if cache is not False else None
+
+        # comma-separated list params longer than this are split into batches
+        self.max_list_length = max_list_length
+        self.max_batch_workers = max_batch_workers
+
+        # client-side rate limit: calls per minute, or a shared RateLimiter
+        if isinstance(rate_limit, (int, float)):
+            rate_limit = RateLimiter(rate_limit)
+        self.rate_limiter = rate_limit
+
+        # decodes raw response bytes, orjson when installed
+        self.json_decoder = json_decoder or default_json_decoder()
+
+        # opt-in ETag / Last-Modified revalidation: True, or a ValidatorStore
+        if conditional_requests is True:
+            conditional_requests = ValidatorStore()
+        self.validators = (
+            conditional_requests if conditional_requests is not False else None
+        )
+
+        # opt-in single-flight: concurrent identical requests share one call
+        self.coalescer = SingleFlight() if coalesce else None
+
+        # per-endpoint instrumentation: True for InMemoryMetrics, or a MetricsHook
+        if metrics is True:
+            metrics = InMemoryMetrics()
+        self.metrics = metrics if metrics is not False else None
+
+        # bytes read at a time by the stream_* methods
+        self.stream_chunk_size = stream_chunk_size
+
+        # opt-in fail-fast per endpoint: True for the defaults, or a CircuitBreaker
+        if circuit_breaker is True:
+            circuit_breaker = CircuitBreaker()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not False else None
+
+        # opt-in credit budget and lanes: True for a CreditScheduler, or an instance
+        if scheduler is True:
+            scheduler = CreditScheduler()
+        self.scheduler = scheduler if scheduler is not False else None
+
+    @property
+    def session(self):
+        """The requests.Session used by the calling thread (requests transport only)"""
+        return self.transport.session
+
+    @session.setter
+    def session(self, session):
+        self.transport.session = session
+
+    def warm_up(self, connections=1):
+        """Open connections to the API ahead of time and return how many requests succeeded
+
+        ``connections`` concurrent requests to /ping are made, so that many
+        connections (at most ``pool_maxsize``) are left open in the pool of the
+        transport (of the calling thread's session with the requests transport).
+        The requests go straight to the session or transport: they bypass the
+        rate limiter, the credit scheduler and the circuit breaker.
+        """
+        if connections < 1:
+            return 0
+        get = self.transport.get
+        if isinstance(self.transport, RequestsTransport):
+            session = self.transport.session
+            get = lambda url, params, headers, timeout: session.get(
+                url, headers=headers, timeout=timeout
+            )
+        url = "{0}ping".format(self.api_base_url)
+        headers = dict(self.extra_params or {})
+        barrier = threading.Barrier(connections)
+
+        def ping(_):
+            # start every request at the same time so none reuses a connection
+            barrier.wait()
+            try:
+                get(url, None, headers, self.request_timeout)
+            except requests.exceptions.RequestException:
+                return False
+            return True
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            return sum(executor.map(ping, range(connections)))
+
+    def bulk(self, func, arg_sets, max_workers=16, ordered=True):
+        """Call an endpoint method once per argument set on a pool of max_workers threads
+
+        e.g. ``pto.bulk(pto.get_coin_by_id, [{"id": id} for id in ids])``. Returns
+        an iterator of BulkResult (index, args, result, error), in input order or
+        as calls complete; failed calls carry their exception instead of
+        aborting the batch. Calls go through the client's rate limiter.
+        """
+        return bulk(func, arg_sets, max_workers, ordered)
+
+    def _call_endpoint(self, endpoint, args, kwargs):
+        """Request an endpoint for a call of its generated public method"""
+        path, params = endpoint.bind(args, kwargs)
+        url = self.api_base_url + path
+        as_arrays = params.pop("as_arrays", False)
+        if as_arrays and not endpoint.to_arrays:
+            raise ValueError("as_arrays is not supported by {0}".format(endpoint.name))
+        as_records = params.pop("as_records", False)
+        if as_records and not endpoint.records:
+            raise ValueError("as_records is not supported by {0}".format(endpoint.name))
+        split = params.pop("split", None)
+        if split and not endpoint.splittable:
+            raise ValueError("split is only supported by *_range endpoints")
+        if split:
+            batches = range_batches(params, split)
+            content = merge_series(self.__request_all(url, batches, endpoint))
+        elif endpoint.batched:
+            content = self.__request_batched(url, params, endpoint)
+        else:
+            content = self.__request(url, params, endpoint)
+
+        if endpoint.result_key is not None:
+            content = content[endpoint.result_key]
+        if as_arrays:
+            return endpoint.to_arrays(content)
+        if as_records:
+            return to_records(content, endpoint.records, endpoint.records_key)
+        return content
+
+    def _stream_endpoint(self, endpoint, args, kwargs):
+        """Stream an endpoint for a call of its generated stream_* method"""
+        path, params = endpoint.bind(args, kwargs)
+        return self.__stream(self.api_base_url + path, params, endpoint)
+
+    def __request(self, url, params, endpoint):
+        if self.coalescer is not None:
+            return self.coalescer.do(
+                canonical_url(url, params), lambda: self.__fetch(url, params, endpoint)
+            )
+        return self.__fetch(url, params, endpoint)
+
+    def __fetch(self, url, params, endpoint):
+        path = endpoint.path
+
+        cache_key = None
+        if self.cache is not None:
+            ttl = self.cache.ttl_for(path)
+            if ttl:
+                cache_key = canonical_url(url, params)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self.__record(path, None, 0.0, 0, 0, 0.0, True)
+                    return self.json_decoder(cached)
+
+        validators = None
+        if self.validators is not None:
+            validators = self.validators.get(canonical_url(url, params))
+            if validators is not None and validators.is_fresh():
+                self.__record(path, None, 0.0, 0, 0, 0.0, True)
+                return validators.data
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before(path)
+        if self.scheduler is not None:
+            self.scheduler.acquire(endpoint.credits)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
 
-    def __request(self, url, params):
         headers = {}
         if self.extra_params:
             headers.update(self.extra_params)
+        if validators is not None:
+            headers.update(validators.request_headers())
+        started = time.perf_counter()
         try:
-            response = self.session.get(
-                url, params=params, headers=headers, timeout=self.request_timeout
-            )
+            response = self.transport.get(url, params, headers, self.request_timeout)
         except requests.exceptions.RequestException:
+            self.__record(path, None, time.perf_counter() - started, 0, 0, 0.0)
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.failure(path)
             raise
+        latency = time.perf_counter() - started
+        if self.circuit_breaker is not None:
+            self.__record_outcome(path, response.status_code)
 
-        try:
-            response.raise_for_status()
-            content = json.loads(response.content.decode("utf-8"))
-            return content
-        except Exception as e:
-            try:
-                content = json.loads(response.content.decode("utf-8"))
-                raise ValueError(content)
-            except json.decoder.JSONDecodeError:
-                pass
-            raise
+        content = response.content
+        if response.status_code == 304 and validators is not None:
+            self.__record(path, 304, latency, response.retries, 0, 0.0)
+            return self.validators.revalidated(validators, response.headers)
 
-    def ping(self, **kwargs):
-        """Check API server status"""
-        api_url = "{0}ping".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    def key(self, **kwargs):
-        """Monitor your account's API usage, including rate limits, monthly total credits, remaining credits, and more"""
-        api_url = "{0}key".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_price(self, ids, vs_currencies, **kwargs):
-        """Get the current price of any cryptocurrencies in any other supported currencies that you need"""
-        ids = ids.replace(" ", "")
-        kwargs["ids"] = ids
-        vs_currencies = vs_currencies.replace(" ", "")
-        kwargs["vs_currencies"] = vs_currencies
-        api_url = "{0}simple/price".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_token_price(self, id, contract_addresses, vs_currencies, **kwargs):
-        """Get the current price of any tokens on this coin (ETH only at this stage as per api docs) in any other supported currencies that you need"""
-        contract_addresses = contract_addresses.replace(" ", "")
-        kwargs["contract_addresses"] = contract_addresses
-        vs_currencies = vs_currencies.replace(" ", "")
-        kwargs["vs_currencies"] = vs_currencies
-        api_url = "{0}simple/token_price/{1}".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_supported_vs_currencies(self, **kwargs):
-        """Get list of supported_vs_currencies"""
-        api_url = "{0}simple/supported_vs_currencies".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coins(self, **kwargs):
-        """List all coins with data (name, price, market, developer, community, etc)"""
-        api_url = "{0}coins".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coin_top_gainers_losers(self, vs_currency, **kwargs):
-        """Get top gainers and losers"""
-        kwargs["vs_currency"] = vs_currency
-        api_url = "{0}coins/top_gainers_losers".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coins_list_new(self, **kwargs):
-        """This endpoint allows you to query the latest 200 coins that recently listed on Pesto"""
-        api_url = "{0}coins/list/new".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coins_list(self, **kwargs):
-        """List all supported coins id, name and symbol (no pagination required)"""
-        api_url = "{0}coins/list".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coins_markets(self, vs_currency, **kwargs):
-        """List all supported coins price, market cap, volume, and market related data"""
-        kwargs["vs_currency"] = vs_currency
-        api_url = "{0}coins/markets".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coin_by_id(self, id, **kwargs):
-        """Get current data (name, price, market, ... including exchange tickers) for a coin"""
-        api_url = "{0}coins/{1}/".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coin_ticker_by_id(self, id, **kwargs):
-        """Get coin tickers (paginated to 100 items)"""
-        api_url = "{0}coins/{1}/tickers".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coin_history_by_id(self, id, date, **kwargs):
-        """Get historical data (name, price, market, stats) at a given date for a coin"""
-        kwargs["date"] = date
-        api_url = "{0}coins/{1}/history".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coin_market_chart_by_id(self, id, vs_currency, days, **kwargs):
-        """Get historical market data include price, market cap, and 24h volume (granularity auto)"""
-        api_url = "{0}coins/{1}/market_chart".format(
-            self.api_base_url, id, vs_currency, days
+        started = time.perf_counter()
+        try:
+            data = self.json_decoder(content)
+        except ValueError:
+            if response.ok:
+                raise
+            data = None
+        self.__record(
+            path,
+            response.status_code,
+            latency,
+            response.retries,
+            len(content),
+            time.perf_counter() - started,
         )
-        kwargs["vs_currency"] = vs_currency
-        kwargs["days"] = days
-        return self.__request(api_url, kwargs)
+        if not response.ok:
+            raise error_from_response(
+                response.status_code,
+                response.reason,
+                response.url,
+                response.headers,
+                data,
+                response=response,
+            )
 
-    @func_args_preprocessing
-    def get_coin_market_chart_range_by_id(
-        self, id, vs_currency, from_timestamp, to_timestamp, **kwargs
-    ):
-        """Get historical market data include price, market cap, and 24h volume within a range of timestamp (granularity auto)"""
-        api_url = "{0}coins/{1}/market_chart/range".format(self.api_base_url, id)
-        kwargs["vs_currency"] = vs_currency
-        kwargs["from"] = from_timestamp
-        kwargs["to"] = to_timestamp
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coin_ohlc_by_id(self, id, vs_currency, days, **kwargs):
-        """Get coin's OHLC"""
-        api_url = "{0}coins/{1}/ohlc".format(self.api_base_url, id)
-        kwargs["vs_currency"] = vs_currency
-        kwargs["days"] = days
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coin_ohlc_by_id_range(
-        self, id, vs_currency, from_timestamp, to_timestamp, interval, **kwargs
-    ):
-        """Get coin's OHLC within a range of timestamp"""
-        kwargs["vs_currency"] = vs_currency
-        kwargs["from"] = from_timestamp
-        kwargs["to"] = to_timestamp
-        kwargs["interval"] = interval
-        api_url = "{0}coins/{1}/ohlc/range".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coin_circulating_supply_chart(self, id, days, **kwargs):
-        """Get coin's circulating supply chart"""
-        kwargs["days"] = days
-        api_url = "{0}coins/{1}/circulating_supply_chart".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coin_circulating_supply_chart_range(
-        self, id, from_timestamp, to_timestamp, **kwargs
-    ):
-        """Get coin's circulating supply chart within a range of timestamp"""
-        kwargs["from"] = from_timestamp
-        kwargs["to"] = to_timestamp
-        api_url = "{0}coins/{1}/circulating_supply_chart/range".format(
-            self.api_base_url, id
-        )
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coin_total_supply_chart(self, id, days, **kwargs):
-        """Get coin's total supply chart"""
-        kwargs["days"] = days
-        api_url = "{0}coins/{1}/total_supply_chart".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coin_total_supply_chart_range(
-        self, id, from_timestamp, to_timestamp, **kwargs
+        if cache_key is not None:
+            self.cache.set(cache_key, content, ttl)
+        if self.validators is not None:
+            self.validators.store(canonical_url(url, params), response.headers, data)
+        return data
+
+    def __record(
+        self,
+        endpoint,
+        status_code,
+        latency,
+        retries,
+        bytes_received,
+        decode_time,
+        cache_hit=False,
     ):
-        """Get coin's total supply chart within a range of timestamp"""
-        kwargs["from"] = from_timestamp
-        kwargs["to"] = to_timestamp
-        api_url = "{0}coins/{1}/total_supply_chart/range".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coin_info_from_contract_address_by_id(self, id, contract_address, **kwargs):
-        """Get coin info from contract address"""
-        api_url = "{0}coins/{1}/contract/{2}".format(
-            self.api_base_url, id, contract_address
-        )
-        return self.__request(api_url, kwargs)
+        if self.metrics is not None:
+            self.metrics.record(
+                RequestSample(
+                    endpoint,
+                    status_code,
+                    latency,
+                    retries,
+                    bytes_received,
+                    decode_time,
+                    cache_hit,
+                )
+            )
 
-    @func_args_preprocessing
-    def get_coin_market_chart_from_contract_address_by_id(
-        self, id, contract_address, vs_currency, days, **kwargs
-    ):
-        """Get historical market data include price, market cap, and 24h volume (granularity auto) from a contract address"""
-        api_url = "{0}coins/{1}/contract/{2}/market_chart".format(
-            self.api_base_url, id, contract_address
-        )
-        kwargs["vs_currency"] = vs_currency
-        kwargs["days"] = days
-        return self.__request(api_url, kwargs)
+    def __record_outcome(self, endpoint, status_code):
+        if status_code >= 500:
+            self.circuit_breaker.failure(endpoint)
+        else:
+            self.circuit_breaker.success(endpoint)
+
+    def __stream(self, url, params, endpoint):
+        path = endpoint.path
+        factory = None
+        if params.pop("as_records", False):
+            if not endpoint.records:
+                raise ValueError(
+                    "as_records is not supported by {0}".format(endpoint.name)
+                )
+            factory = endpoint.records.from_dict
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before(path)
+        if self.scheduler is not None:
+            self.scheduler.acquire(endpoint.credits)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        started = time.perf_counter()
+        try:
+            response = self.transport.stream(
+                url, params, self.extra_params or {}, self.request_timeout
+            )
+        except requests.exceptions.RequestException:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.failure(path)
+            raise
+        latency = time.perf_counter() - started
+        if self.circuit_breaker is not None:
+            self.__record_outcome(path, response.status_code)
+        with response:
+            if not response.ok:
+                content = response.content
+                self.__record(
+                    path,
+                    response.status_code,
+                    latency,
+                    response.retries,
+                    len(content),
+                    0.0,
+                )
+                try:
+                    data = self.json_decoder(content)
+                except ValueError:
+                    data = None
+                raise error_from_response(
+                    response.status_code,
+                    response.reason,
+                    response.url,
+                    response.headers,
+                    data,
+                    response=response,
+                )
+
+            parser = JSONArrayStream(endpoint.stream_key, factory)
+            received = 0
+            for chunk in response.iter_content(self.stream_chunk_size):
+                received += len(chunk)
+                yield from parser.feed(chunk)
+            yield from parser.close()
+            self.__record(
+                path,
+                response.status_code,
+                latency,
+                response.retries,
+                received,
+                0.0,
+            )
 
-    @func_args_preprocessing
-    def get_coin_market_chart_range_from_contract_address_by_id(
-        self, id, contract_address, vs_currency, from_timestamp, to_timestamp, **kwargs
-    ):
-        """Get historical market data include price, market cap, and 24h volume within a range of timestamp (granularity auto) from a contract address"""
-        api_url = "{0}coins/{1}/contract/{2}/market_chart/range".format(
-            self.api_base_url, id, contract_address
-        )
-        kwargs["vs_currency"] = vs_currency
-        kwargs["from"] = from_timestamp
-        kwargs["to"] = to_timestamp
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_asset_platforms(self, **kwargs):
-        """List all asset platforms (Blockchain networks)"""
-        api_url = "{0}asset_platforms".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_asset_platform_by_id(self, asset_platform_id, **kwargs):
-        """List all asset platforms (Blockchain networks) by platform id"""
-        api_url = "{0}token_lists/{1}/all.json".format(
-            self.api_base_url, asset_platform_id
-        )
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coins_categories_list(self, **kwargs):
-        """List all categories"""
-        api_url = "{0}coins/categories/list".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_coins_categories(self, **kwargs):
-        """List all categories with market data"""
-        api_url = "{0}coins/categories".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_exchanges_list(self, **kwargs):
-        """List all exchanges"""
-        api_url = "{0}exchanges".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_exchanges_id_name_list(self, **kwargs):
-        """List all supported markets id and name (no pagination required)"""
-        api_url = "{0}exchanges/list".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_exchanges_by_id(self, id, **kwargs):
-        """Get exchange volume in BTC and tickers"""
-        api_url = "{0}exchanges/{1}".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_exchanges_tickers_by_id(self, id, **kwargs):
-        """Get exchange tickers (paginated, 100 tickers per page)"""
-        api_url = "{0}exchanges/{1}/tickers".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_exchanges_volume_chart_by_id(self, id, days, **kwargs):
-        """Get volume chart data for a given exchange"""
-        kwargs["days"] = days
-        api_url = "{0}exchanges/{1}/volume_chart".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_exchanges_volume_chart_by_id_within_time_range(
-        self, id, from_timestamp, to_timestamp, **kwargs
-    ):
-        """Get volume chart data for a given exchange within a time range"""
-        kwargs["from"] = from_timestamp
-        kwargs["to"] = to_timestamp
-        api_url = "{0}exchanges/{1}/volume_chart/range".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_indexes(self, **kwargs):
-        """List all market indexes"""
-        api_url = "{0}indexes".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_indexes_by_market_id_and_index_id(self, market_id, id, **kwargs):
-        """Get market index by market id and index id"""
-        api_url = "{0}indexes/{1}/{2}".format(self.api_base_url, market_id, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_indexes_list(self, **kwargs):
-        """List market indexes id and name"""
-        api_url = "{0}indexes/list".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_derivatives(self, **kwargs):
-        """List all derivative tickers"""
-        api_url = "{0}derivatives".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_derivatives_exchanges(self, **kwargs):
-        """List all derivative tickers"""
-        api_url = "{0}derivatives/exchanges".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_derivatives_exchanges_by_id(self, id, **kwargs):
-        """List all derivative tickers"""
-        api_url = "{0}derivatives/exchanges/{1}".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_derivatives_exchanges_list(self, **kwargs):
-        """List all derivative tickers"""
-        api_url = "{0}derivatives/exchanges/list".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_nfts_list(self, **kwargs):
-        """List all supported NFT ids, paginated by 100 items per page, paginated to 100 items"""
-        api_url = "{0}nfts/list".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_nfts_by_id(self, id, **kwargs):
-        """Get current data (name, price_floor, volume_24h ...) for an NFT collection. native_currency (string) is only a representative of the currency"""
-        api_url = "{0}nfts/{1}".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_nfts_by_asset_platform_id_and_contract_address(
-        self, asset_platform_id, contract_address, **kwargs
-    ):
-        """Get current data (name, price_floor, volume_24h ...) for an NFT collection. native_currency (string) is only a representative of the currency"""
-        api_url = "{0}nfts/{1}/contract/{2}".format(
-            self.api_base_url, asset_platform_id, contract_address
-        )
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_nfts_markets(self, **kwargs):
-        """This endpoint allows you to query all the supported NFT collections with floor price, market cap, volume and market related data on Pesto"""
-        api_url = "{0}nfts/markets".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_nfts_market_chart_by_id(self, id, days, **kwargs):
-        """This endpoint allows you query historical market data of a NFT collection, including floor price, market cap, and 24h volume, by number of days away from now"""
-        kwargs["days"] = days
-        api_url = "{0}nfts/{1}/market_chart".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_ntfs_market_chart_by_asset_platform_id_and_contract_address(
-        self, asset_platform_id, contract_address, days, **kwargs
-    ):
-        """This endpoint allows you query historical market data of a NFT collection, including floor price, market cap, and 24h volume, by number of days away from now based on the provided contract address"""
-        kwargs["days"] = days
-        api_url = "{0}nfts/{1}/contract/{2}/market_chart".format(
-            self.api_base_url, asset_platform_id, contract_address
-        )
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_nfts_tickers_by_id(self, id, **kwargs):
-        """This endpoint allows you to query the latest floor price and 24h volume of a NFT collection, on each NFT marketplace, e.g. OpenSea and LooksRare"""
-        api_url = "{0}nfts/{1}/tickers".format(self.api_base_url, id)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_exchange_rates(self, **kwargs):
-        """Get BTC-to-Currency exchange rates"""
-        api_url = "{0}exchange_rates".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def search(self, query, **kwargs):
-        """Search for coins, categories and markets on Pesto"""
-        api_url = "{0}search".format(self.api_base_url)
-        kwargs["query"] = query
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_search_trending(self, **kwargs):
-        """Get top 7 trending coin searches"""
-        api_url = "{0}search/trending".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_global(self, **kwargs):
-        """Get cryptocurrency global data"""
-        api_url = "{0}global".format(self.api_base_url)
-        return self.__request(api_url, kwargs)["data"]
-
-    @func_args_preprocessing
-    def get_global_decentralized_finance_defi(self, **kwargs):
-        """Get cryptocurrency global decentralized finance(defi) data"""
-        api_url = "{0}global/decentralized_finance_defi".format(self.api_base_url)
-        return self.__request(api_url, kwargs)["data"]
-
-    @func_args_preprocessing
-    def get_global_market_cap_chart(self, days, **kwargs):
-        """Get cryptocurrency global market cap chart data"""
-        kwargs["days"] = days
-        api_url = "{0}global/market_cap_chart".format(self.api_base_url)
-        return self.__request(api_url, kwargs)
-
-    @func_args_preprocessing
-    def get_companies_public_treasury_by_coin_id(self, coin_id, **kwargs):
-        """Get public companies data"""
-        api_url = "{0}companies/public_treasury/{1}".format(self.api_base_url, coin_id)
-        return self.__request(api_url, kwargs)
+    def __request_all(self, url, batches, endpoint):
+        if len(batches) == 1:
+            return [self.__request(url, batches[0], endpoint)]
+        workers = min(self.max_batch_workers, len(batches))
+        # the batches run in the caller's context (scheduler tag and lane)
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(
+                    lambda batch: context.copy().run(
+                        self.__request, url, batch, endpoint
+                    ),
+                    batches,
+                )
+            )
+
+    def __request_batched(self, url, params, endpoint):
+        batches = split_batches(params, endpoint.batched, self.max_list_length)
+        if len(batches) == 1:
+            return self.__request(url, params, endpoint)
+        return merge_batch_results(self.__request_all(url, batches, endpoint))
+
+    def configure_rate_limit(self, burst=1):
+        """Configure the client-side rate limiter from the plan limits returned by /key"""
+        key_data = self.key()
+        if self.rate_limiter is None:
+            self.rate_limiter = RateLimiter.from_key(key_data, burst)
+        else:
+            self.rate_limiter.set_rate(key_data["rate_limit_request_per_minute"], burst)
+        return self.rate_limiter
+
+    def configure_credit_budget(self, **kwargs):
+        """Configure the credit scheduler from the plan usage returned by /key
+
+        ``kwargs`` are passed to CreditScheduler when the client has none yet.
+        """
+        key_data = self.key()
+        if self.scheduler is None:
+            self.scheduler = CreditScheduler.from_key(key_data, **kwargs)
+        else:
+            self.scheduler.sync(key_data)
+        return self.scheduler
+
+
+add_endpoint_methods(PestoAPI, paginate)
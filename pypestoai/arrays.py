@@ -0,0 +1,59 @@
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# one [timestamp, value] series of a chart: int64 ms timestamps and float64 values
+Series = namedtuple("Series", ["timestamps", "values"])
+
+OHLC_DTYPE = [
+    ("timestamp", "i8"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+]
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "as_arrays=True requires numpy, install it with: pip install pypestoai[arrays]"
+        )
+
+
+def _is_series(value):
+    return isinstance(value, list) and (
+        not value or (isinstance(value[0], list) and len(value[0]) == 2)
+    )
+
+
+def series_to_arrays(pairs):
+    """Return a list of [timestamp, value] pairs as a Series of contiguous arrays"""
+    _require_numpy()
+    if not pairs:
+        return Series(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+    # ms timestamps are exact in float64, null values become nan
+    data = np.array(pairs, dtype=np.float64)
+    return Series(data[:, 0].astype(np.int64), np.ascontiguousarray(data[:, 1]))
+
+
+def chart_to_arrays(data):
+    """Convert every [timestamp, value] series of a chart response into a Series"""
+    if isinstance(data, dict):
+        return {key: chart_to_arrays(value) for key, value in data.items()}
+    if _is_series(data):
+        return series_to_arrays(data)
+    return data
+
+
+def ohlc_to_array(rows):
+    """Return [timestamp, open, high, low, close] rows as a structured array"""
+    _require_numpy()
+    data = np.array(rows, dtype=np.float64).reshape(-1, len(OHLC_DTYPE))
+    array = np.empty(len(data), dtype=OHLC_DTYPE)
+    for i, (name, _) in enumerate(OHLC_DTYPE):
+        array[name] = data[:, i]
+    return array
@@ -0,0 +1,491 @@
+import asyncio
+import time
+
+from .cache import ResponseCache
+from .circuit import CircuitBreaker
+from .coalesce import AsyncSingleFlight
+from .conditional import ValidatorStore
+from .endpoints import add_endpoint_methods
+from .exceptions import error_from_response
+from .metrics import InMemoryMetrics, RequestSample
+from .pagination import paginate_async
+from .ranges import merge_series, range_batches
+from .ratelimit import RateLimiter
+from .records import to_records
+from .retry import RETRY_STATUSES, decorrelated_jitter, parse_retry_after
+from .scheduler import CreditScheduler
+from .streaming import JSONArrayStream
+from .utils import (
+    canonical_url,
+    default_json_decoder,
+    merge_batch_results,
+    split_batches,
+)
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+class _RetryableStatus(Exception):
+    """Internal marker for a response status that should be retried after delay seconds"""
+
+    def __init__(self, delay):
+        super().__init__(delay)
+        self.delay = delay
+
+
+def _query_params(params):
+    """Return params without None values, which requests leaves out of the query"""
+    return {k: v for k, v in params.items() if v is not None}
+
+
+class AsyncPestoAPI:
+    """asyncio counterpart of PestoAPI
+
+    Every endpoint method of PestoAPI is available here under the same name and
+    signature, returning a coroutine. All calls share one keep-alive connection
+    pool; ``max_concurrency`` bounds how many requests are in flight at once.
+    Retries follow the same policy as PestoAPI (see JitteredRetry).
+    """
+
+    __API_URL_BASE = "https://api.pestoai.fun/v2/"
+    __PRO_API_URL_BASE = "https://api.pestoai.fun/v2/"
+    __RETRY_STATUSES = RETRY_STATUSES
+
+    def __init__(
+        self,
+        api_key: str = "",
+        retries=5,
+        demo_api_key: str = "",
+        max_concurrency=100,
+        connection_limit=100,
+        keepalive_timeout=30,
+        connect_timeout=None,
+        read_timeout=120,
+        metrics=None,
+        cache=None,
+        max_list_length=2000,
+        rate_limit=None,
+        json_decoder=None,
+        conditional_requests=False,
+        coalesce=False,
+        stream_chunk_size=65536,
+        retry_budget=60,
+        circuit_breaker=None,
+        scheduler=None,
+    ):
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncPestoAPI requires aiohttp, install it with: pip install pypestoai[async]"
+            )
+
+        self.extra_params = None
+        if api_key:
+            self.api_base_url = self.__PRO_API_URL_BASE
+            self.extra_params = {"x-demo-api-key": api_key}
+        else:
+            self.api_base_url = self.__API_URL_BASE
+            if demo_api_key:
+                self.extra_params = {"x-demo-api-key": demo_api_key}
+
+        # aiohttp total timeout of a request, connect_timeout bounds connecting
+        self.request_timeout = read_timeout
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff_factor = 0.5
+        self.backoff_max = 120
+        self.retry_budget = retry_budget
+        self.max_concurrency = max_concurrency
+        self.connection_limit = connection_limit
+        self.keepalive_timeout = keepalive_timeout
+        self.session = None
+        self._semaphore = None
+
+        # opt-in response cache: True for the defaults, or a ResponseCache
+        if cache is True:
+            cache = ResponseCache()
+        self.cache = cache if cache is not False else None
+
+        # comma-separated list params longer than this are split into batches
+        self.max_list_length = max_list_length
+
+        # client-side rate limit: calls per minute, or a shared RateLimiter
+        if isinstance(rate_limit, (int, float)):
+            rate_limit = RateLimiter(rate_limit)
+        self.rate_limiter = rate_limit
+
+        # decodes raw response bytes, orjson when installed
+        self.json_decoder = json_decoder or default_json_decoder()
+
+        # opt-in ETag / Last-Modified revalidation: True, or a ValidatorStore
+        if conditional_requests is True:
+            conditional_requests = ValidatorStore()
+        self.validators = (
+            conditional_requests if conditional_requests is not False else None
+        )
+
+        # opt-in single-flight: concurrent identical requests share one call
+        self.coalescer = AsyncSingleFlight() if coalesce else None
+
+        # per-endpoint instrumentation: True for InMemoryMetrics, or a MetricsHook
+        if metrics is True:
+            metrics = InMemoryMetrics()
+        self.metrics = metrics if metrics is not False else None
+
+        # bytes read at a time by the stream_* methods
+        self.stream_chunk_size = stream_chunk_size
+
+        # opt-in fail-fast per endpoint: True for the defaults, or a CircuitBreaker
+        if circuit_breaker is True:
+            circuit_breaker = CircuitBreaker()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not False else None
+
+        # opt-in credit budget and lanes: True for a CreditScheduler, or an instance
+        if scheduler is True:
+            scheduler = CreditScheduler()
+        self.scheduler = scheduler if scheduler is not False else None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def warm_up(self, connections=1):
+        """Open connections to the API ahead of time and return how many requests succeeded
+
+        The /ping requests bypass the rate limiter, the credit scheduler and
+        the circuit breaker.
+        """
+        if connections < 1:
+            return 0
+        session = self._get_session()
+        url = "{0}ping".format(self.api_base_url)
+        headers = dict(self.extra_params or {})
+
+        async def ping():
+            try:
+                async with session.get(url, headers=headers) as response:
+                    await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return False
+            return True
+
+        return sum(await asyncio.gather(*(ping() for _ in range(connections))))
+
+    async def close(self):
+        """Close the underlying connection pool"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _get_session(self):
+        # the session and the semaphore are bound to the running event loop,
+        # so they are only created on first use
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=self.request_timeout, connect=self.connect_timeout
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.session
+
+    async def _call_endpoint(self, endpoint, args, kwargs):
+        """Request an endpoint for a call of its generated public method"""
+        path, params = endpoint.bind(args, kwargs)
+        url = self.api_base_url + path
+        as_arrays = params.pop("as_arrays", False)
+        if as_arrays and not endpoint.to_arrays:
+            raise ValueError("as_arrays is not supported by {0}".format(endpoint.name))
+        as_records = params.pop("as_records", False)
+        if as_records and not endpoint.records:
+            raise ValueError("as_records is not supported by {0}".format(endpoint.name))
+        split = params.pop("split", None)
+        if split and not endpoint.splittable:
+            raise ValueError("split is only supported by *_range endpoints")
+        if split:
+            batches = range_batches(params, split)
+            content = merge_series(
+                await asyncio.gather(
+                    *(self.__request(url, batch, endpoint) for batch in batches)
+                )
+            )
+        elif endpoint.batched:
+            content = await self.__request_batched(url, params, endpoint)
+        else:
+            content = await self.__request(url, params, endpoint)
+
+        if endpoint.result_key is not None:
+            content = content[endpoint.result_key]
+        if as_arrays:
+            return endpoint.to_arrays(content)
+        if as_records:
+            return to_records(content, endpoint.records, endpoint.records_key)
+        return content
+
+    def _stream_endpoint(self, endpoint, args, kwargs):
+        """Stream an endpoint for a call of its generated stream_* method"""
+        path, params = endpoint.bind(args, kwargs)
+        return self.__stream(self.api_base_url + path, params, endpoint)
+
+    async def __request(self, url, params, endpoint):
+        if self.coalescer is not None:
+            return await self.coalescer.do(
+                canonical_url(url, params), lambda: self.__fetch(url, params, endpoint)
+            )
+        return await self.__fetch(url, params, endpoint)
+
+    async def __fetch(self, url, params, endpoint):
+        path = endpoint.path
+        # aiohttp rejects None values, requests leaves them out
+        params = _query_params(params)
+
+        cache_key = None
+        if self.cache is not None:
+            ttl = self.cache.ttl_for(path)
+            if ttl:
+                cache_key = canonical_url(url, params)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self.__record(path, None, 0.0, 0, 0, 0.0, True)
+                    return self.json_decoder(cached)
+
+        validators = None
+        if self.validators is not None:
+            validators = self.validators.get(canonical_url(url, params))
+            if validators is not None and validators.is_fresh():
+                self.__record(path, None, 0.0, 0, 0, 0.0, True)
+                return validators.data
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before(path)
+        if self.scheduler is not None:
+            delay = self.scheduler.reserve(endpoint.credits)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        headers = {}
+        if self.extra_params:
+            headers.update(self.extra_params)
+        if validators is not None:
+            headers.update(validators.request_headers())
+        session = self._get_session()
+
+        attempt = 0
+        backoff = 0.0
+        started = time.perf_counter()
+        while True:
+            try:
+                # the semaphore is held for the attempt only, not the backoff
+                async with self._semaphore, session.get(
+                    url, params=params, headers=headers
+                ) as response:
+                    body = await response.read()
+                    status = response.status
+                    if status in self.__RETRY_STATUSES and attempt < self.retries:
+                        delay = parse_retry_after(response.headers.get("Retry-After"))
+                        if delay is None:
+                            delay = backoff = decorrelated_jitter(
+                                backoff, self.backoff_factor, self.backoff_max
+                            )
+                        if self.__within_budget(started, delay):
+                            raise _RetryableStatus(delay)
+                    latency = time.perf_counter() - started
+                    if self.circuit_breaker is not None:
+                        self.__record_outcome(path, status)
+                    if status == 304 and validators is not None:
+                        self.__record(path, 304, latency, attempt, 0, 0.0)
+                        return self.validators.revalidated(validators, response.headers)
+
+                    decode_started = time.perf_counter()
+                    try:
+                        data = self.json_decoder(body)
+                    except ValueError:
+                        if status < 400:
+                            raise
+                        data = None
+                    self.__record(
+                        path,
+                        status,
+                        latency,
+                        attempt,
+                        len(body),
+                        time.perf_counter() - decode_started,
+                    )
+                    if status >= 400:
+                        raise error_from_response(
+                            status,
+                            response.reason,
+                            response.url,
+                            response.headers,
+                            data,
+                            response=response,
+                        )
+                    if cache_key is not None:
+                        self.cache.set(cache_key, body, ttl)
+                    if self.validators is not None:
+                        self.validators.store(
+                            canonical_url(url, params), response.headers, data
+                        )
+                    return data
+            except _RetryableStatus as e:
+                delay = e.delay
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = backoff = decorrelated_jitter(
+                    backoff, self.backoff_factor, self.backoff_max
+                )
+                if attempt >= self.retries or not self.__within_budget(started, delay):
+                    self.__record(
+                        path,
+                        None,
+                        time.perf_counter() - started,
+                        attempt,
+                        0,
+                        0.0,
+                    )
+                    if self.circuit_breaker is not None:
+                        self.circuit_breaker.failure(path)
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def __within_budget(self, started, delay):
+        """Whether a retry after delay seconds ends within the retry budget"""
+        if self.retry_budget is None:
+            return True
+        return time.perf_counter() + delay - started <= self.retry_budget
+
+    def __record_outcome(self, endpoint, status_code):
+        if status_code >= 500:
+            self.circuit_breaker.failure(endpoint)
+        else:
+            self.circuit_breaker.success(endpoint)
+
+    def __record(
+        self,
+        endpoint,
+        status_code,
+        latency,
+        retries,
+        bytes_received,
+        decode_time,
+        cache_hit=False,
+    ):
+        if self.metrics is not None:
+            self.metrics.record(
+                RequestSample(
+                    endpoint,
+                    status_code,
+                    latency,
+                    retries,
+                    bytes_received,
+                    decode_time,
+                    cache_hit,
+                )
+            )
+
+    async def __stream(self, url, params, endpoint):
+        path = endpoint.path
+        factory = None
+        if params.pop("as_records", False):
+            if not endpoint.records:
+                raise ValueError(
+                    "as_records is not supported by {0}".format(endpoint.name)
+                )
+            factory = endpoint.records.from_dict
+        params = _query_params(params)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before(path)
+        if self.scheduler is not None:
+            delay = self.scheduler.reserve(endpoint.credits)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        session = self._get_session()
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                response = await session.get(
+                    url, params=params, headers=self.extra_params or {}
+                )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.failure(path)
+                raise
+            async with response:
+                latency = time.perf_counter() - started
+                if self.circuit_breaker is not None:
+                    self.__record_outcome(path, response.status)
+                if response.status >= 400:
+                    body = await response.read()
+                    self.__record(path, response.status, latency, 0, len(body), 0.0)
+                    try:
+                        data = self.json_decoder(body)
+                    except ValueError:
+                        data = None
+                    raise error_from_response(
+                        response.status,
+                        response.reason,
+                        response.url,
+                        response.headers,
+                        data,
+                        response=response,
+                    )
+
+                parser = JSONArrayStream(endpoint.stream_key, factory)
+                received = 0
+                async for chunk in response.content.iter_chunked(
+                    self.stream_chunk_size
+                ):
+                    received += len(chunk)
+                    for item in parser.feed(chunk):
+                        yield item
+                for item in parser.close():
+                    yield item
+                self.__record(path, response.status, latency, 0, received, 0.0)
+
+    async def __request_batched(self, url, params, endpoint):
+        batches = split_batches(params, endpoint.batched, self.max_list_length)
+        if len(batches) == 1:
+            return await self.__request(url, params, endpoint)
+        results = await asyncio.gather(
+            *(self.__request(url, batch, endpoint) for batch in batches)
+        )
+        return merge_batch_results(results)
+
+    async def configure_rate_limit(self, burst=1):
+        """Configure the client-side rate limiter from the plan limits returned by /key"""
+        key_data = await self.key()
+        if self.rate_limiter is None:
+            self.rate_limiter = RateLimiter.from_key(key_data, burst)
+        else:
+            self.rate_limiter.set_rate(key_data["rate_limit_request_per_minute"], burst)
+        return self.rate_limiter
+
+    async def configure_credit_budget(self, **kwargs):
+        """Configure the credit scheduler from the plan usage returned by /key"""
+        key_data = await self.key()
+        if self.scheduler is None:
+            self.scheduler = CreditScheduler.from_key(key_data, **kwargs)
+        else:
+            self.scheduler.sync(key_data)
+        return self.scheduler
+
+
+add_endpoint_methods(AsyncPestoAPI, paginate_async, asynchronous=True)
@@ -0,0 +1,49 @@
+import contextvars
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class BulkResult(namedtuple("BulkResult", ["index", "args", "result", "error"])):
+    """Outcome of one call of a bulk run: its result, or the exception it raised"""
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _call(func, index, args):
+    try:
+        if isinstance(args, dict):
+            result = func(**args)
+        elif isinstance(args, (list, tuple)):
+            result = func(*args)
+        else:
+            result = func(args)
+    except Exception as e:
+        return BulkResult(index, args, None, e)
+    return BulkResult(index, args, result, None)
+
+
+def bulk(func, arg_sets, max_workers=16, ordered=True):
+    """Run func once per argument set on a bounded thread pool
+
+    Every argument set is a dict of keyword arguments, a list or tuple of
+    positional arguments, or a single positional argument. Work starts
+    immediately; the returned iterator yields a BulkResult per argument set,
+    in input order (``ordered=True``) or as calls complete. A failing call
+    is reported in its BulkResult and does not abort the others. Calls run
+    in the caller's context (e.g. its CreditScheduler tag and lane).
+    """
+    context = contextvars.copy_context()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = [
+        executor.submit(context.copy().run, _call, func, index, args)
+        for index, args in enumerate(arg_sets)
+    ]
+    # queued calls still run; the worker threads exit once they are done
+    executor.shutdown(wait=False)
+    if ordered:
+        return (future.result() for future in futures)
+    return (future.result() for future in as_completed(futures))
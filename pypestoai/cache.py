@@ -0,0 +1,268 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from .endpoints import ENDPOINTS_BY_PATH
+
+
+class ResponseCache:
+    """In-process LRU cache of raw API responses with per-endpoint TTLs
+
+    Responses are stored as the raw bytes returned by the API, so every hit is
+    decoded into fresh objects that callers are free to mutate. Endpoints are
+    identified by their path template (e.g. ``"coins/{id}/tickers"``), see
+    :mod:`pypestoai.endpoints`. ``ttls`` overrides the ``cache_ttl`` declared
+    in the endpoint registry; endpoints without a TTL are not cached unless
+    ``default_ttl`` is set.
+    """
+
+    def __init__(self, ttls=None, default_ttl=0, max_bytes=64 * 1024 * 1024):
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ttl_for(self, endpoint):
+        """Return the TTL in seconds of an endpoint path template (0: not cached)"""
+        if endpoint in self.ttls:
+            return self.ttls[endpoint]
+        # looked up on every call, so changes to the registry take effect
+        registered = ENDPOINTS_BY_PATH.get(endpoint)
+        if registered is not None and registered.cache_ttl:
+            return registered.cache_ttl
+        return self.default_ttl
+
+    def get(self, key):
+        """Return the cached response for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._discard(key)
+            self.misses += 1
+            return None
+
+    def set(self, key, value, ttl):
+        """Store a response for ttl seconds, evicting least recently used entries if needed"""
+        entry_size = len(key) + len(value)
+        if ttl <= 0 or entry_size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self.size += entry_size
+            while self.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """Return hit/miss counters and current usage"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.size,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _discard(self, key):
+        expires_at, value = self._entries.pop(key)
+        self.size -= len(key) + len(value)
+
+
+class SQLiteCache(ResponseCache):
+    """Response cache in a SQLite file shared by every process on a host
+
+    Same interface and TTL policies as ResponseCache, so one worker's fetch
+    serves the other workers (e.g. gunicorn processes) pointing at the same
+    ``path``. Responses are stored zlib-compressed; every write is a single
+    transaction and the database runs in WAL mode, so readers never see a
+    partial entry and never block writers. Once ``max_bytes`` of compressed
+    data is reached, expired entries and then those closest to expiring are
+    evicted, which keeps reads free of writes. Hit/miss/eviction counters
+    are per process; ``entries`` and ``bytes`` describe the shared file.
+    """
+
+    def __init__(
+        self,
+        path="pesto_cache.sqlite",
+        ttls=None,
+        default_ttl=0,
+        max_bytes=256 * 1024 * 1024,
+        compress_level=6,
+        timeout=5.0,
+    ):
+        super().__init__(ttls=ttls, default_ttl=default_ttl, max_bytes=max_bytes)
+        self.path = path
+        self.compress_level = compress_level
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._transaction() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    expires_at REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    compressed INTEGER NOT NULL,
+                    value BLOB NOT NULL
+                )""")
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_expires_at"
+                " ON responses (expires_at)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS usage (id INTEGER PRIMARY KEY, bytes INTEGER)"
+            )
+            db.execute("INSERT OR IGNORE INTO usage VALUES (0, 0)")
+
+    @property
+    def _db(self):
+        # one connection per thread and per process: connections must not be
+        # shared across threads nor inherited through fork()
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def _transaction(self):
+        return _Transaction(self._db)
+
+    def get(self, key):
+        """Return the cached response for key, or None if missing or expired"""
+        row = self._db.execute(
+            "SELECT compressed, value FROM responses WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        compressed, value = row
+        return zlib.decompress(value) if compressed else value
+
+    def set(self, key, value, ttl):
+        """Store a response for ttl seconds, evicting entries if the file is full"""
+        if ttl <= 0:
+            return
+        stored = zlib.compress(value, self.compress_level)
+        compressed = len(stored) < len(value)
+        if not compressed:
+            stored = value
+        entry_size = len(key) + len(stored)
+        if entry_size > self.max_bytes:
+            return
+        now = time.time()
+        evicted = 0
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, now + ttl, entry_size, compressed, stored),
+            )
+            db.execute(
+                "UPDATE usage SET bytes = bytes + ? WHERE id = 0",
+                (entry_size - (row[0] if row else 0),),
+            )
+            (size,) = db.execute("SELECT bytes FROM usage WHERE id = 0").fetchone()
+            if size > self.max_bytes:
+                evicted = self._evict(db, key, size - self.max_bytes, now)
+        if evicted:
+            with self._lock:
+                self.evictions += evicted
+
+    def _evict(self, db, new_key, excess, now):
+        """Delete expired entries, then those expiring first, until excess bytes are freed"""
+        freed = 0
+        victims = []
+        # rows are read lazily along the expires_at index, so only the
+        # evicted entries (and one more) are visited
+        cursor = db.execute(
+            "SELECT key, size, expires_at FROM responses WHERE key != ?"
+            " ORDER BY expires_at",
+            (new_key,),
+        )
+        for key, entry_size, expires_at in cursor:
+            if freed >= excess and expires_at > now:
+                break
+            victims.append((key,))
+            freed += entry_size
+        cursor.close()
+        db.executemany("DELETE FROM responses WHERE key = ?", victims)
+        db.execute("UPDATE usage SET bytes = bytes - ? WHERE id = 0", (freed,))
+        return len(victims)
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._transaction() as db:
+            db.execute("DELETE FROM responses")
+            db.execute("UPDATE usage SET bytes = 0 WHERE id = 0")
+
+    def stats(self):
+        """Return this process' hit/miss counters and the usage of the shared file"""
+        entries, size = self._db.execute(
+            "SELECT COUNT(*), (SELECT bytes FROM usage WHERE id = 0) FROM responses"
+        ).fetchone()
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": size,
+            }
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        """Close the calling thread's connection"""
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+class _Transaction:
+    """Write transaction taking the database lock up front (BEGIN IMMEDIATE)"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.db.execute("COMMIT" if exc_type is None else "ROLLBACK")
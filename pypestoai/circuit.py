@@ -0,0 +1,90 @@
+import threading
+import time
+
+from .exceptions import CircuitOpenError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class _Circuit:
+    __slots__ = ("state", "failures", "opened_at", "probes")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+
+
+class CircuitBreaker:
+    """Per-endpoint circuit breaker failing fast while an endpoint is down
+
+    After ``failure_threshold`` consecutive failures of an endpoint path
+    (connection errors, timeouts and 5xx responses, counted once retries are
+    exhausted) its circuit opens: calls raise CircuitOpenError without
+    sending a request, so threads do not pile up behind a dead endpoint.
+    ``recovery_timeout`` seconds later the circuit half-opens and lets
+    ``half_open_calls`` probe requests through; a success closes it, a
+    failure opens it again. Other endpoints are not affected.
+    """
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0, half_open_calls=1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_calls = half_open_calls
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def before(self, endpoint):
+        """Raise CircuitOpenError unless a request to the endpoint may be sent"""
+        if endpoint not in self._circuits:
+            return
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is None or circuit.state == CLOSED:
+                return
+            now = time.monotonic()
+            remaining = circuit.opened_at + self.recovery_timeout - now
+            if circuit.state == OPEN:
+                if remaining > 0:
+                    raise CircuitOpenError(endpoint, remaining)
+                circuit.state = HALF_OPEN
+                circuit.opened_at = now
+                circuit.probes = 0
+            elif circuit.probes >= self.half_open_calls:
+                if remaining > 0:
+                    raise CircuitOpenError(endpoint, remaining)
+                # the probes never reported back: allow new ones
+                circuit.opened_at = now
+                circuit.probes = 0
+            circuit.probes += 1
+
+    def success(self, endpoint):
+        """Record a successful request, closing the endpoint's circuit"""
+        if endpoint in self._circuits:
+            with self._lock:
+                self._circuits.pop(endpoint, None)
+
+    def failure(self, endpoint):
+        """Record a failed request, opening the circuit after too many of them"""
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is None:
+                circuit = self._circuits[endpoint] = _Circuit()
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.state = OPEN
+                circuit.opened_at = time.monotonic()
+
+    def state(self, endpoint):
+        """Return "closed", "open" or "half_open" for an endpoint path"""
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            return CLOSED if circuit is None else circuit.state
+
+    def reset(self):
+        """Close every circuit"""
+        with self._lock:
+            self._circuits.clear()
@@ -0,0 +1,86 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class Validators:
+    """Validators and decoded body of the last successful response for a url"""
+
+    __slots__ = ("etag", "last_modified", "fresh_until", "data")
+
+    def __init__(self, etag, last_modified, fresh_until, data):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh_until = fresh_until
+        self.data = data
+
+    def is_fresh(self):
+        """Return True while the response is within its Cache-Control max-age"""
+        return self.fresh_until > time.monotonic()
+
+    def request_headers(self):
+        """Return the If-None-Match / If-Modified-Since headers of a conditional GET"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _fresh_until(headers):
+    match = _MAX_AGE.search(headers.get("Cache-Control") or "")
+    return time.monotonic() + int(match.group(1)) if match else 0
+
+
+class ValidatorStore:
+    """Remembers ETag / Last-Modified / max-age validators per url for conditional GETs
+
+    The decoded body is kept with the validators and handed back as is when
+    the server answers 304 Not Modified (or while the response is fresh), so
+    callers should not mutate it. The least recently used urls are forgotten
+    beyond ``max_entries``.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.not_modified = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the Validators stored for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key, headers, data):
+        """Remember the validators of a 200 response, if it has any"""
+        cache_control = headers.get("Cache-Control") or ""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        fresh_until = _fresh_until(headers)
+        if "no-store" in cache_control or not (etag or last_modified or fresh_until):
+            return
+        with self._lock:
+            self._entries[key] = Validators(etag, last_modified, fresh_until, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def revalidated(self, entry, headers):
+        """Record a 304 response for entry and return its stored body"""
+        fresh_until = _fresh_until(headers)
+        with self._lock:
+            self.not_modified += 1
+            if fresh_until:
+                entry.fresh_until = fresh_until
+        return entry.data
+
+    def __len__(self):
+        return len(self._entries)
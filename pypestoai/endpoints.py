@@ -0,0 +1,607 @@
+import inspect
+import re
+
+from .arrays import chart_to_arrays, ohlc_to_array
+from .records import CoinListEntry, CoinMarketRow, DerivativeTicker, ExchangeTicker
+from .utils import CLIENT_ARGS, arg_preprocessing
+
+_DAY = 24 * 60 * 60
+_PLACEHOLDER = re.compile(r"\{([^}]+)\}")
+
+# query names of the *_timestamp arguments of the range endpoints
+_RANGE = {"from_timestamp": "from", "to_timestamp": "to"}
+
+
+class Endpoint:
+    """Declaration of one API endpoint and the policies applied to its calls
+
+    ``path`` is relative to the API base url and its ``{placeholders}`` are
+    filled from the required ``params`` of the same name; the other required
+    params are sent as query params, under their ``renames`` name if any.
+    The public ``name`` method (and ``iter_``/``stream_`` variants when
+    ``page_size``/``streamable`` are set) is generated for both clients by
+    ``add_endpoint_methods``.
+
+    Policies: ``strip_spaces`` params have their spaces removed,
+    ``batched`` comma-separated params are split into concurrent batches,
+    ``to_arrays`` converts the response for ``as_arrays=True`` (and
+    ``splittable`` range endpoints accept ``split``), ``records`` is the
+    record type for ``as_records=True`` (of the list under ``records_key``),
+    ``result_key`` unwraps the response, ``cache_ttl`` is the default
+    ResponseCache TTL and ``credits`` the API credits charged per request.
+    """
+
+    __slots__ = (
+        "name",
+        "path",
+        "params",
+        "doc",
+        "path_params",
+        "renames",
+        "strip_spaces",
+        "batched",
+        "to_arrays",
+        "splittable",
+        "records",
+        "records_key",
+        "result_key",
+        "page_size",
+        "per_page",
+        "page_key",
+        "streamable",
+        "stream_key",
+        "cache_ttl",
+        "credits",
+    )
+
+    def __init__(
+        self,
+        name,
+        path,
+        params=(),
+        doc="",
+        renames=None,
+        strip_spaces=(),
+        batched=(),
+        to_arrays=None,
+        splittable=False,
+        records=None,
+        records_key=None,
+        result_key=None,
+        page_size=None,
+        per_page=False,
+        page_key=None,
+        streamable=False,
+        stream_key=None,
+        cache_ttl=None,
+        credits=1,
+    ):
+        self.name = name
+        self.path = path
+        self.params = tuple(params)
+        self.doc = doc
+        self.path_params = tuple(_PLACEHOLDER.findall(path))
+        self.renames = renames or {}
+        self.strip_spaces = frozenset(strip_spaces)
+        self.batched = tuple(batched)
+        self.to_arrays = to_arrays
+        self.splittable = splittable
+        self.records = records
+        self.records_key = records_key
+        self.result_key = result_key
+        self.page_size = page_size
+        self.per_page = per_page
+        self.page_key = page_key
+        self.streamable = streamable
+        self.stream_key = stream_key
+        self.cache_ttl = cache_ttl
+        self.credits = credits
+
+    def __repr__(self):
+        return "Endpoint({0!r}, {1!r})".format(self.name, self.path)
+
+    def bind(self, args, kwargs):
+        """Return the (path, query params) of a call of the endpoint's method
+
+        ``kwargs`` is the call's own keyword dict and is reused for the
+        query params; lists and booleans are converted like
+        ``func_args_preprocessing`` does.
+        """
+        names = self.params
+        if len(args) > len(names):
+            raise TypeError(
+                "{0}() takes {1} positional arguments but {2} were given".format(
+                    self.name, len(names), len(args)
+                )
+            )
+        for name in kwargs:
+            if name not in CLIENT_ARGS:
+                kwargs[name] = arg_preprocessing(kwargs[name])
+        values = {}
+        for i, name in enumerate(names):
+            if i < len(args):
+                value = arg_preprocessing(args[i])
+            elif name in kwargs:
+                value = kwargs.pop(name)
+            else:
+                raise TypeError(
+                    "{0}() missing required argument: '{1}'".format(self.name, name)
+                )
+            if name in self.strip_spaces:
+                value = value.replace(" ", "")
+            values[name] = value
+
+        path = self.path
+        if self.path_params:
+            path = path.format(**{name: values.pop(name) for name in self.path_params})
+        for name, value in values.items():
+            kwargs[self.renames.get(name, name)] = value
+        return path, kwargs
+
+
+ENDPOINTS = (
+    Endpoint("ping", "ping", doc="Check API server status"),
+    Endpoint(
+        "key",
+        "key",
+        doc="Monitor your account's API usage, including rate limits, monthly total credits, remaining credits, and more",
+    ),
+    # simple
+    Endpoint(
+        "get_price",
+        "simple/price",
+        ("ids", "vs_currencies"),
+        "Get the current price of any cryptocurrencies in any other supported currencies that you need",
+        strip_spaces=("ids", "vs_currencies"),
+        batched=("ids", "vs_currencies"),
+    ),
+    Endpoint(
+        "get_token_price",
+        "simple/token_price/{id}",
+        ("id", "contract_addresses", "vs_currencies"),
+        "Get the current price of any tokens on this coin (ETH only at this stage as per api docs) in any other supported currencies that you need",
+        strip_spaces=("contract_addresses", "vs_currencies"),
+        batched=("contract_addresses", "vs_currencies"),
+    ),
+    Endpoint(
+        "get_supported_vs_currencies",
+        "simple/supported_vs_currencies",
+        doc="Get list of supported_vs_currencies",
+        cache_ttl=_DAY,
+    ),
+    # coins
+    Endpoint(
+        "get_coins",
+        "coins",
+        doc="List all coins with data (name, price, market, developer, community, etc)",
+    ),
+    Endpoint(
+        "get_coin_top_gainers_losers",
+        "coins/top_gainers_losers",
+        ("vs_currency",),
+        "Get top gainers and losers",
+    ),
+    Endpoint(
+        "get_coins_list_new",
+        "coins/list/new",
+        doc="This endpoint allows you to query the latest 200 coins that recently listed on Pesto",
+    ),
+    Endpoint(
+        "get_coins_list",
+        "coins/list",
+        doc="List all supported coins id, name and symbol (no pagination required)",
+        records=CoinListEntry,
+        streamable=True,
+        cache_ttl=_DAY,
+    ),
+    Endpoint(
+        "get_coins_markets",
+        "coins/markets",
+        ("vs_currency",),
+        "List all supported coins price, market cap, volume, and market related data",
+        records=CoinMarketRow,
+        page_size=250,
+        per_page=True,
+    ),
+    Endpoint(
+        "get_coin_by_id",
+        "coins/{id}/",
+        ("id",),
+        "Get current data (name, price, market, ... including exchange tickers) for a coin",
+    ),
+    Endpoint(
+        "get_coin_ticker_by_id",
+        "coins/{id}/tickers",
+        ("id",),
+        "Get coin tickers (paginated to 100 items)",
+        records=ExchangeTicker,
+        records_key="tickers",
+        page_size=100,
+        page_key="tickers",
+    ),
+    Endpoint(
+        "get_coin_history_by_id",
+        "coins/{id}/history",
+        ("id", "date"),
+        "Get historical data (name, price, market, stats) at a given date for a coin",
+    ),
+    Endpoint(
+        "get_coin_market_chart_by_id",
+        "coins/{id}/market_chart",
+        ("id", "vs_currency", "days"),
+        "Get historical market data include price, market cap, and 24h volume (granularity auto)",
+        to_arrays=chart_to_arrays,
+    ),
+    Endpoint(
+        "get_coin_market_chart_range_by_id",
+        "coins/{id}/market_chart/range",
+        ("id", "vs_currency", "from_timestamp", "to_timestamp"),
+        "Get historical market data include price, market cap, and 24h volume within a range of timestamp (granularity auto)",
+        renames=_RANGE,
+        to_arrays=chart_to_arrays,
+        splittable=True,
+    ),
+    Endpoint(
+        "get_coin_ohlc_by_id",
+        "coins/{id}/ohlc",
+        ("id", "vs_currency", "days"),
+        "Get coin's OHLC",
+        to_arrays=ohlc_to_array,
+    ),
+    Endpoint(
+        "get_coin_ohlc_by_id_range",
+        "coins/{id}/ohlc/range",
+        ("id", "vs_currency", "from_timestamp", "to_timestamp", "interval"),
+        "Get coin's OHLC within a range of timestamp",
+        renames=_RANGE,
+        to_arrays=ohlc_to_array,
+        splittable=True,
+    ),
+    Endpoint(
+        "get_coin_circulating_supply_chart",
+        "coins/{id}/circulating_supply_chart",
+        ("id", "days"),
+        "Get coin's circulating supply chart",
+        to_arrays=chart_to_arrays,
+    ),
+    Endpoint(
+        "get_coin_circulating_supply_chart_range",
+        "coins/{id}/circulating_supply_chart/range",
+        ("id", "from_timestamp", "to_timestamp"),
+        "Get coin's circulating supply chart within a range of timestamp",
+        renames=_RANGE,
+        to_arrays=chart_to_arrays,
+        splittable=True,
+    ),
+    Endpoint(
+        "get_coin_total_supply_chart",
+        "coins/{id}/total_supply_chart",
+        ("id", "days"),
+        "Get coin's total supply chart",
+        to_arrays=chart_to_arrays,
+    ),
+    Endpoint(
+        "get_coin_total_supply_chart_range",
+        "coins/{id}/total_supply_chart/range",
+        ("id", "from_timestamp", "to_timestamp"),
+        "Get coin's total supply chart within a range of timestamp",
+        renames=_RANGE,
+        to_arrays=chart_to_arrays,
+        splittable=True,
+    ),
+    # contract
+    Endpoint(
+        "get_coin_info_from_contract_address_by_id",
+        "coins/{id}/contract/{contract_address}",
+        ("id", "contract_address"),
+        "Get coin info from contract address",
+    ),
+    Endpoint(
+        "get_coin_market_chart_from_contract_address_by_id",
+        "coins/{id}/contract/{contract_address}/market_chart",
+        ("id", "contract_address", "vs_currency", "days"),
+        "Get historical market data include price, market cap, and 24h volume (granularity auto) from a contract address",
+        to_arrays=chart_to_arrays,
+    ),
+    Endpoint(
+        "get_coin_market_chart_range_from_contract_address_by_id",
+        "coins/{id}/contract/{contract_address}/market_chart/range",
+        ("id", "contract_address", "vs_currency", "from_timestamp", "to_timestamp"),
+        "Get historical market data include price, market cap, and 24h volume within a range of timestamp (granularity auto) from a contract address",
+        renames=_RANGE,
+        to_arrays=chart_to_arrays,
+        splittable=True,
+    ),
+    # asset platforms
+    Endpoint(
+        "get_asset_platforms",
+        "asset_platforms",
+        doc="List all asset platforms (Blockchain networks)",
+        cache_ttl=_DAY,
+    ),
+    Endpoint(
+        "get_asset_platform_by_id",
+        "token_lists/{asset_platform_id}/all.json",
+        ("asset_platform_id",),
+        "List all asset platforms (Blockchain networks) by platform id",
+        streamable=True,
+        stream_key="tokens",
+    ),
+    # categories
+    Endpoint(
+        "get_coins_categories_list",
+        "coins/categories/list",
+        doc="List all categories",
+        cache_ttl=_DAY,
+    ),
+    Endpoint(
+        "get_coins_categories",
+        "coins/categories",
+        doc="List all categories with market data",
+    ),
+    # exchanges
+    Endpoint(
+        "get_exchanges_list",
+        "exchanges",
+        doc="List all exchanges",
+        page_size=250,
+        per_page=True,
+        streamable=True,
+    ),
+    Endpoint(
+        "get_exchanges_id_name_list",
+        "exchanges/list",
+        doc="List all supported markets id and name (no pagination required)",
+        cache_ttl=_DAY,
+    ),
+    Endpoint(
+        "get_exchanges_by_id",
+        "exchanges/{id}",
+        ("id",),
+        "Get exchange volume in BTC and tickers",
+    ),
+    Endpoint(
+        "get_exchanges_tickers_by_id",
+        "exchanges/{id}/tickers",
+        ("id",),
+        "Get exchange tickers (paginated, 100 tickers per page)",
+        records=ExchangeTicker,
+        records_key="tickers",
+        page_size=100,
+        page_key="tickers",
+    ),
+    Endpoint(
+        "get_exchanges_volume_chart_by_id",
+        "exchanges/{id}/volume_chart",
+        ("id", "days"),
+        "Get volume chart data for a given exchange",
+    ),
+    Endpoint(
+        "get_exchanges_volume_chart_by_id_within_time_range",
+        "exchanges/{id}/volume_chart/range",
+        ("id", "from_timestamp", "to_timestamp"),
+        "Get volume chart data for a given exchange within a time range",
+        renames=_RANGE,
+        to_arrays=chart_to_arrays,
+        splittable=True,
+    ),
+    # indexes
+    Endpoint("get_indexes", "indexes", doc="List all market indexes"),
+    Endpoint(
+        "get_indexes_by_market_id_and_index_id",
+        "indexes/{market_id}/{id}",
+        ("market_id", "id"),
+        "Get market index by market id and index id",
+    ),
+    Endpoint("get_indexes_list", "indexes/list", doc="List market indexes id and name"),
+    # derivatives
+    Endpoint(
+        "get_derivatives",
+        "derivatives",
+        doc="List all derivative tickers",
+        records=DerivativeTicker,
+        streamable=True,
+    ),
+    Endpoint(
+        "get_derivatives_exchanges",
+        "derivatives/exchanges",
+        doc="List all derivative tickers",
+        page_size=100,
+        per_page=True,
+    ),
+    Endpoint(
+        "get_derivatives_exchanges_by_id",
+        "derivatives/exchanges/{id}",
+        ("id",),
+        "List all derivative tickers",
+    ),
+    Endpoint(
+        "get_derivatives_exchanges_list",
+        "derivatives/exchanges/list",
+        doc="List all derivative tickers",
+    ),
+    # nfts
+    Endpoint(
+        "get_nfts_list",
+        "nfts/list",
+        doc="List all supported NFT ids, paginated by 100 items per page, paginated to 100 items",
+        page_size=250,
+        per_page=True,
+    ),
+    Endpoint(
+        "get_nfts_by_id",
+        "nfts/{id}",
+        ("id",),
+        "Get current data (name, price_floor, volume_24h ...) for an NFT collection. native_currency (string) is only a representative of the currency",
+    ),
+    Endpoint(
+        "get_nfts_by_asset_platform_id_and_contract_address",
+        "nfts/{asset_platform_id}/contract/{contract_address}",
+        ("asset_platform_id", "contract_address"),
+        "Get current data (name, price_floor, volume_24h ...) for an NFT collection. native_currency (string) is only a representative of the currency",
+    ),
+    Endpoint(
+        "get_nfts_markets",
+        "nfts/markets",
+        doc="This endpoint allows you to query all the supported NFT collections with floor price, market cap, volume and market related data on Pesto",
+        page_size=250,
+        per_page=True,
+    ),
+    Endpoint(
+        "get_nfts_market_chart_by_id",
+        "nfts/{id}/market_chart",
+        ("id", "days"),
+        "This endpoint allows you query historical market data of a NFT collection, including floor price, market cap, and 24h volume, by number of days away from now",
+    ),
+    Endpoint(
+        "get_ntfs_market_chart_by_asset_platform_id_and_contract_address",
+        "nfts/{asset_platform_id}/contract/{contract_address}/market_chart",
+        ("asset_platform_id", "contract_address", "days"),
+        "This endpoint allows you query historical market data of a NFT collection, including floor price, market cap, and 24h volume, by number of days away from now based on the provided contract address",
+    ),
+    Endpoint(
+        "get_nfts_tickers_by_id",
+        "nfts/{id}/tickers",
+        ("id",),
+        "This endpoint allows you to query the latest floor price and 24h volume of a NFT collection, on each NFT marketplace, e.g. OpenSea and LooksRare",
+    ),
+    # exchange rates, search, global, companies
+    Endpoint(
+        "get_exchange_rates", "exchange_rates", doc="Get BTC-to-Currency exchange rates"
+    ),
+    Endpoint(
+        "search",
+        "search",
+        ("query",),
+        "Search for coins, categories and markets on Pesto",
+    ),
+    Endpoint(
+        "get_search_trending", "search/trending", doc="Get top 7 trending coin searches"
+    ),
+    Endpoint(
+        "get_global",
+        "global",
+        doc="Get cryptocurrency global data",
+        result_key="data",
+    ),
+    Endpoint(
+        "get_global_decentralized_finance_defi",
+        "global/decentralized_finance_defi",
+        doc="Get cryptocurrency global decentralized finance(defi) data",
+        result_key="data",
+    ),
+    Endpoint(
+        "get_global_market_cap_chart",
+        "global/market_cap_chart",
+        ("days",),
+        "Get cryptocurrency global market cap chart data",
+        to_arrays=chart_to_arrays,
+    ),
+    Endpoint(
+        "get_companies_public_treasury_by_coin_id",
+        "companies/public_treasury/{coin_id}",
+        ("coin_id",),
+        "Get public companies data",
+    ),
+)
+
+ENDPOINTS_BY_NAME = {endpoint.name: endpoint for endpoint in ENDPOINTS}
+ENDPOINTS_BY_PATH = {endpoint.path: endpoint for endpoint in ENDPOINTS}
+
+
+def _signature(endpoint, **options):
+    P = inspect.Parameter
+    parameters = [P("self", P.POSITIONAL_OR_KEYWORD)]
+    parameters += [P(name, P.POSITIONAL_OR_KEYWORD) for name in endpoint.params]
+    parameters += [
+        P(name, P.POSITIONAL_OR_KEYWORD, default=value)
+        for name, value in options.items()
+    ]
+    parameters.append(P("kwargs", P.VAR_KEYWORD))
+    return inspect.Signature(parameters)
+
+
+def _describe(method, name, doc, signature):
+    method.__name__ = method.__qualname__ = name
+    method.__doc__ = doc
+    method.__signature__ = signature
+    return method
+
+
+def add_endpoint_methods(cls, paginate, asynchronous=False):
+    """Add the public methods of every endpoint in ENDPOINTS to a client class
+
+    The methods forward to ``cls._call_endpoint(endpoint, args, kwargs)`` and
+    ``cls._stream_endpoint(endpoint, args, kwargs)``; ``iter_`` methods use
+    ``paginate`` over the endpoint method.
+    """
+    for endpoint in ENDPOINTS:
+        setattr(cls, endpoint.name, _endpoint_method(endpoint, asynchronous))
+        if endpoint.page_size:
+            name = "iter_" + endpoint.name[len("get_") :]
+            setattr(cls, name, _iter_method(endpoint, name, paginate, asynchronous))
+        if endpoint.streamable:
+            name = "stream_" + endpoint.name[len("get_") :]
+            setattr(cls, name, _stream_method(endpoint, name, asynchronous))
+    return cls
+
+
+def _endpoint_method(endpoint, asynchronous):
+    if asynchronous:
+
+        async def method(self, *args, **kwargs):
+            return await self._call_endpoint(endpoint, args, kwargs)
+
+    else:
+
+        def method(self, *args, **kwargs):
+            return self._call_endpoint(endpoint, args, kwargs)
+
+    return _describe(method, endpoint.name, endpoint.doc, _signature(endpoint))
+
+
+def _iter_method(endpoint, name, paginate, asynchronous):
+    options = {"page": 1, "prefetch": True}
+    if endpoint.per_page:
+        options = dict(per_page=endpoint.page_size, **options)
+    required = len(endpoint.params)
+
+    def method(self, *args, **kwargs):
+        if len(args) > required + len(options):
+            raise TypeError(
+                "{0}() takes {1} positional arguments but {2} were given".format(
+                    name, required + len(options), len(args)
+                )
+            )
+        values = {
+            option: kwargs.pop(option, default) for option, default in options.items()
+        }
+        values.update(zip(options, args[required:]))
+        args = args[:required]
+        page_size = endpoint.page_size
+        if endpoint.per_page:
+            page_size = kwargs["per_page"] = values["per_page"]
+        get_page = getattr(self, endpoint.name)
+        fetch_page = lambda page: get_page(*args, page=page, **kwargs)
+        return paginate(
+            fetch_page,
+            page_size,
+            values["page"],
+            key=endpoint.page_key,
+            prefetch=values["prefetch"],
+        )
+
+    doc = "{0}terate over the records of {1}, fetching pages as needed".format(
+        "Asynchronously i" if asynchronous else "I", endpoint.path
+    )
+    return _describe(method, name, doc, _signature(endpoint, **options))
+
+
+def _stream_method(endpoint, name, asynchronous):
+    def method(self, *args, **kwargs):
+        return self._stream_endpoint(endpoint, args, kwargs)
+
+    doc = "{0}terate over the records of {1} while the response downloads".format(
+        "Asynchronously i" if asynchronous else "I", endpoint.path
+    )
+    return _describe(method, name, doc, _signature(endpoint))
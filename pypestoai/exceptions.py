@@ -0,0 +1,84 @@
+from requests.exceptions import HTTPError, RequestException
+
+from .retry import parse_retry_after
+
+
+class PestoAPIError(HTTPError, ValueError):
+    """Error response returned by the API
+
+    ``body`` holds the decoded error body (None if it was not JSON). When the
+    body is available it is also the exception message, as with the plain
+    ValueError raised by previous versions.
+    """
+
+    def __init__(self, message, response=None, status_code=None, body=None):
+        super().__init__(message, response=response)
+        self.status_code = status_code
+        self.body = body
+
+
+class RateLimitError(PestoAPIError):
+    """The API answered 429 Too Many Requests"""
+
+    def __init__(self, *args, retry_after=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retry_after = retry_after
+
+
+class NotFoundError(PestoAPIError):
+    """The API answered 404 Not Found"""
+
+
+class ServerError(PestoAPIError):
+    """The API answered with a 5xx status"""
+
+
+class CircuitOpenError(RequestException):
+    """The circuit breaker of the endpoint is open: no request was sent
+
+    ``retry_after`` is the number of seconds before the endpoint is probed again.
+    """
+
+    def __init__(self, endpoint, retry_after):
+        super().__init__(
+            "Circuit open for endpoint {0}, retry in {1:.1f}s".format(
+                endpoint, retry_after
+            )
+        )
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class CreditBudgetError(RequestException):
+    """A batch request was deferred: only the credits reserved for interactive requests remain"""
+
+    def __init__(self, tag, remaining_credits):
+        super().__init__(
+            "Credit budget reserved for interactive requests ({0} credits left), "
+            "batch request{1} deferred".format(
+                remaining_credits, "" if tag is None else " of {0!r}".format(tag)
+            )
+        )
+        self.tag = tag
+        self.remaining_credits = remaining_credits
+
+
+def error_from_response(status_code, reason, url, headers, body, response=None):
+    """Return the exception matching an error response"""
+    if body is not None:
+        message = body
+    else:
+        message = "{0} {1} Error: {2} for url: {3}".format(
+            status_code, "Client" if status_code < 500 else "Server", reason, url
+        )
+    kwargs = {"response": response, "status_code": status_code, "body": body}
+
+    if status_code == 429:
+        return RateLimitError(
+            message, retry_after=parse_retry_after(headers.get("Retry-After")), **kwargs
+        )
+    if status_code == 404:
+        return NotFoundError(message, **kwargs)
+    if status_code >= 500:
+        return ServerError(message, **kwargs)
+    return PestoAPIError(message, **kwargs)
@@ -0,0 +1,275 @@
+import bisect
+import difflib
+import gzip
+import json
+import threading
+from collections import namedtuple
+
+from .exceptions import NotFoundError
+
+
+class CoinIndex:
+    """In-memory index of the coins list with id/symbol lookups and name search
+
+    Built from ``get_coins_list()``; symbol and name lookups are case
+    insensitive. Symbols are ambiguous, so ``by_symbol`` returns every
+    candidate, ranked by market cap when market data is known (see
+    ``update_market_caps``). ``refresh`` adds newly listed coins from
+    ``get_coins_list_new()`` without reloading the whole list.
+    """
+
+    def __init__(self, coins=()):
+        self._lock = threading.RLock()
+        self._by_id = {}
+        self._by_symbol = {}
+        self._names = []  # sorted (lowercase name, id) pairs for prefix search
+        self._market_caps = {}
+        self.update(coins)
+
+    @classmethod
+    def from_api(cls, api, market_cap_pages=0, vs_currency="usd"):
+        """Build an index from the coins list, ranked with the top market_cap_pages * 250 coins"""
+        index = cls(api.get_coins_list())
+        for page in range(1, market_cap_pages + 1):
+            index.update_market_caps(
+                api.get_coins_markets(vs_currency, per_page=250, page=page)
+            )
+        return index
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, id):
+        return id in self._by_id
+
+    def update(self, coins):
+        """Add coins (dicts with id, symbol and name) to the index, replacing known ids"""
+        with self._lock:
+            for coin in coins:
+                if coin["id"] in self._by_id:
+                    self._remove(coin["id"])
+                self._add(coin)
+
+    def refresh(self, api):
+        """Add the coins recently listed on Pesto and return how many were new"""
+        with self._lock:
+            new_coins = [
+                coin
+                for coin in api.get_coins_list_new()
+                if coin["id"] not in self._by_id
+            ]
+            self.update(new_coins)
+            return len(new_coins)
+
+    def update_market_caps(self, markets):
+        """Record market caps used to rank symbol candidates, from get_coins_markets rows"""
+        with self._lock:
+            for row in markets:
+                if row.get("market_cap") is not None:
+                    self._market_caps[row["id"]] = row["market_cap"]
+
+    def get(self, id):
+        """Return the coin with this id, or None"""
+        return self._by_id.get(id)
+
+    def by_symbol(self, symbol):
+        """Return every coin with this symbol, the largest market cap first"""
+        ids = self._by_symbol.get(symbol.lower(), ())
+        ranked = sorted(ids, key=lambda id: -self._market_caps.get(id, -1))
+        return [self._by_id[id] for id in ranked]
+
+    def search(self, prefix, limit=10):
+        """Return up to limit coins whose name starts with prefix, in name order"""
+        prefix = prefix.lower()
+        with self._lock:
+            start = bisect.bisect_left(self._names, (prefix,))
+            matches = []
+            for name, id in self._names[start:]:
+                if not name.startswith(prefix) or len(matches) >= limit:
+                    break
+                matches.append(self._by_id[id])
+            return matches
+
+    def fuzzy_search(self, query, limit=10, cutoff=0.6):
+        """Return up to limit coins whose name is close to query, the closest first"""
+        with self._lock:
+            names = {}
+            for name, id in self._names:
+                names.setdefault(name, []).append(id)
+        matches = difflib.get_close_matches(query.lower(), names, limit, cutoff)
+        return [self._by_id[id] for name in matches for id in names[name]][:limit]
+
+    def _add(self, coin):
+        id = coin["id"]
+        self._by_id[id] = coin
+        self._by_symbol.setdefault(coin["symbol"].lower(), []).append(id)
+        bisect.insort(self._names, (coin["name"].lower(), id))
+
+    def _remove(self, id):
+        coin = self._by_id.pop(id)
+        self._by_symbol[coin["symbol"].lower()].remove(id)
+        name = (coin["name"].lower(), id)
+        del self._names[bisect.bisect_left(self._names, name)]
+
+
+ContractEntry = namedtuple(
+    "ContractEntry", ["platform", "address", "coin_id", "symbol", "name", "decimals"]
+)
+
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+
+def normalize_address(address):
+    """Return the lookup form of a contract address
+
+    EVM (0x-prefixed hex) addresses are case insensitive because of EIP-55
+    checksums and are lowercased; other chains (e.g. base58 Solana mints)
+    are case sensitive and only stripped.
+    """
+    address = address.strip()
+    if address[:2] in ("0x", "0X") and _HEX_DIGITS.issuperset(address[2:]):
+        return "0x" + address[2:].lower()
+    return address
+
+
+class ContractIndex:
+    """Index of contract addresses to coins and tokens across asset platforms
+
+    Built from ``get_coins_list(include_platform=True)``, which maps
+    addresses to coin ids, and from the token lists of
+    ``get_asset_platform_by_id``, which add tokens without a coin id and
+    their decimals. The index can be saved to a gzip file and loaded
+    again without any API call.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, entries=()):
+        self._lock = threading.RLock()
+        self._by_address = {}  # normalized address -> {platform: ContractEntry}
+        self.update(entries)
+
+    @classmethod
+    def from_api(cls, api, platforms=None):
+        """Build an index from the coins list and the token lists of platforms (all if None)"""
+        index = cls()
+        index.add_coins(api.get_coins_list(include_platform=True))
+        if platforms is None:
+            platforms = [p["id"] for p in api.get_asset_platforms()]
+        for platform in platforms:
+            try:
+                token_list = api.get_asset_platform_by_id(platform)
+            except NotFoundError:
+                continue
+            index.add_tokens(platform, token_list["tokens"])
+        return index
+
+    def __len__(self):
+        return sum(len(platforms) for platforms in self._by_address.values())
+
+    def __contains__(self, address):
+        return normalize_address(address) in self._by_address
+
+    def update(self, entries):
+        """Add ContractEntry records, filling fields the known entry lacks"""
+        with self._lock:
+            for entry in entries:
+                address = normalize_address(entry.address)
+                platforms = self._by_address.setdefault(address, {})
+                known = platforms.get(entry.platform)
+                if known is not None:
+                    entry = ContractEntry(
+                        *(new if old is None else old for old, new in zip(known, entry))
+                    )
+                platforms[entry.platform] = entry._replace(address=address)
+
+    def add_coins(self, coins):
+        """Add the platform addresses of get_coins_list(include_platform=True) coins"""
+        self.update(
+            ContractEntry(
+                platform, address, coin["id"], coin["symbol"], coin["name"], None
+            )
+            for coin in coins
+            for platform, address in (coin.get("platforms") or {}).items()
+            if platform and address
+        )
+
+    def add_tokens(self, platform, tokens):
+        """Add the tokens of a get_asset_platform_by_id token list"""
+        self.update(
+            ContractEntry(
+                platform,
+                token["address"],
+                None,
+                token.get("symbol"),
+                token.get("name"),
+                token.get("decimals"),
+            )
+            for token in tokens
+        )
+
+    def lookup(self, address, platform=None):
+        """Return the entry of address on platform, or all its entries when platform is None
+
+        The same EVM address can exist on several chains, so without a
+        platform a list is returned (empty if the address is unknown).
+        """
+        platforms = self._by_address.get(normalize_address(address), {})
+        if platform is not None:
+            return platforms.get(platform)
+        return list(platforms.values())
+
+    def lookup_many(self, addresses, platform=None):
+        """Return a dict of every address to its lookup() result"""
+        return {address: self.lookup(address, platform) for address in addresses}
+
+    def coin_ids(self, addresses, platform=None):
+        """Return a dict of every address with a known coin id to that id"""
+        coin_ids = {}
+        for address in addresses:
+            for entry in self._entries(address, platform):
+                if entry.coin_id is not None:
+                    coin_ids[address] = entry.coin_id
+                    break
+        return coin_ids
+
+    def save(self, path):
+        """Write the index to a gzip-compressed JSON file"""
+        with self._lock:
+            platforms = sorted(
+                {p for entries in self._by_address.values() for p in entries}
+            )
+            platform_ids = {platform: i for i, platform in enumerate(platforms)}
+            rows = [
+                [
+                    platform_ids[e.platform],
+                    e.address,
+                    e.coin_id,
+                    e.symbol,
+                    e.name,
+                    e.decimals,
+                ]
+                for entries in self._by_address.values()
+                for e in entries.values()
+            ]
+        data = {"version": self.FORMAT_VERSION, "platforms": platforms, "rows": rows}
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by save()"""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != cls.FORMAT_VERSION:
+            raise ValueError(
+                "Unsupported contract index version: {0}".format(data.get("version"))
+            )
+        platforms = data["platforms"]
+        return cls(ContractEntry(platforms[row[0]], *row[1:]) for row in data["rows"])
+
+    def _entries(self, address, platform):
+        entry = self.lookup(address, platform)
+        if platform is None:
+            return entry
+        return [entry] if entry is not None else []
@@ -0,0 +1,192 @@
+import bisect
+import threading
+from collections import deque, namedtuple
+
+# one request made by the client; status_code is None when no response was
+# received and latency is 0 for responses served from the cache
+RequestSample = namedtuple(
+    "RequestSample",
+    [
+        "endpoint",
+        "status_code",
+        "latency",
+        "retries",
+        "bytes_received",
+        "decode_time",
+        "cache_hit",
+    ],
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def response_retries(response):
+    """Return the number of retries urllib3's Retry made for a requests response"""
+    retries = getattr(response.raw, "retries", None)
+    return len(retries.history) if retries is not None else 0
+
+
+class MetricsHook:
+    """Interface of the metrics hook of PestoAPI, called once per request"""
+
+    def record(self, sample):
+        """Record a RequestSample"""
+        raise NotImplementedError
+
+
+class _EndpointStats:
+    __slots__ = (
+        "requests",
+        "statuses",
+        "buckets",
+        "latency_sum",
+        "latencies",
+        "retries",
+        "bytes_received",
+        "decode_time",
+        "cache_hits",
+    )
+
+    def __init__(self, window):
+        self.requests = 0
+        self.statuses = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.latencies = deque(maxlen=window)
+        self.retries = 0
+        self.bytes_received = 0
+        self.decode_time = 0.0
+        self.cache_hits = 0
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[
+        min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    ]
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class InMemoryMetrics(MetricsHook):
+    """Thread-safe in-memory metrics per logical endpoint (path template)
+
+    Latency percentiles are computed over the last ``window`` requests of each
+    endpoint; the latency histogram, counters and sums cover every request.
+    """
+
+    def __init__(self, window=1024):
+        self.window = window
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, sample):
+        with self._lock:
+            stats = self._endpoints.get(sample.endpoint)
+            if stats is None:
+                stats = self._endpoints[sample.endpoint] = _EndpointStats(self.window)
+            if sample.cache_hit:
+                stats.cache_hits += 1
+                return
+            stats.requests += 1
+            status = sample.status_code
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, sample.latency)] += 1
+            stats.latency_sum += sample.latency
+            stats.latencies.append(sample.latency)
+            stats.retries += sample.retries
+            stats.bytes_received += sample.bytes_received
+            stats.decode_time += sample.decode_time
+
+    def reset(self):
+        """Forget every recorded request"""
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self):
+        """Return the metrics of every endpoint as a dict"""
+        with self._lock:
+            snapshot = {}
+            for endpoint, stats in self._endpoints.items():
+                latencies = sorted(stats.latencies)
+                snapshot[endpoint] = {
+                    "requests": stats.requests,
+                    "statuses": dict(stats.statuses),
+                    "latency": {
+                        "p50": _percentile(latencies, 0.5),
+                        "p90": _percentile(latencies, 0.9),
+                        "p99": _percentile(latencies, 0.99),
+                        "max": latencies[-1] if latencies else None,
+                    },
+                    "retries": stats.retries,
+                    "bytes_received": stats.bytes_received,
+                    "decode_seconds": stats.decode_time,
+                    "cache_hits": stats.cache_hits,
+                }
+            return snapshot
+
+    def to_prometheus(self, prefix="pesto"):
+        """Return the metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def metric(name, kind, help):
+            lines.append("# HELP {0}_{1} {2}".format(prefix, name, help))
+            lines.append("# TYPE {0}_{1} {2}".format(prefix, name, kind))
+
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+
+            metric("requests_total", "counter", "Requests by endpoint and status")
+            for endpoint, stats in endpoints:
+                for status, count in sorted(
+                    stats.statuses.items(), key=lambda item: str(item[0])
+                ):
+                    lines.append(
+                        '{0}_requests_total{{endpoint="{1}",status="{2}"}} {3}'.format(
+                            prefix,
+                            _label(endpoint),
+                            "error" if status is None else status,
+                            count,
+                        )
+                    )
+
+            metric("request_duration_seconds", "histogram", "Request latency")
+            for endpoint, stats in endpoints:
+                cumulative = 0
+                bounds = [str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+                for bound, count in zip(bounds, stats.buckets):
+                    cumulative += count
+                    lines.append(
+                        '{0}_request_duration_seconds_bucket{{endpoint="{1}",le="{2}"}} {3}'.format(
+                            prefix, _label(endpoint), bound, cumulative
+                        )
+                    )
+                lines.append(
+                    '{0}_request_duration_seconds_sum{{endpoint="{1}"}} {2}'.format(
+                        prefix, _label(endpoint), stats.latency_sum
+                    )
+                )
+                lines.append(
+                    '{0}_request_duration_seconds_count{{endpoint="{1}"}} {2}'.format(
+                        prefix, _label(endpoint), stats.requests
+                    )
+                )
+
+            counters = (
+                ("retries_total", "retries", "Retries made by the transport"),
+                ("response_bytes_total", "bytes_received", "Response bytes received"),
+                ("decode_seconds_total", "decode_time", "Time spent decoding JSON"),
+                ("cache_hits_total", "cache_hits", "Responses served from the cache"),
+            )
+            for name, attribute, help in counters:
+                metric(name, "counter", help)
+                for endpoint, stats in endpoints:
+                    lines.append(
+                        '{0}_{1}{{endpoint="{2}"}} {3}'.format(
+                            prefix, name, _label(endpoint), getattr(stats, attribute)
+                        )
+                    )
+        return "\n".join(lines) + "\n"
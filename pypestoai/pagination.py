@@ -0,0 +1,66 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _records(response, key):
+    return response[key] if key is not None else response
+
+
+def paginate(fetch_page, page_size, page=1, key=None, prefetch=True):
+    """Yield the records of consecutive pages until a short or empty page
+
+    ``fetch_page(page)`` returns one page of the API response and ``key`` names
+    the list of records in it (None when the response itself is the list).
+    With ``prefetch`` the next page is requested in a background thread while
+    the caller processes the current one, in the caller's context.
+    """
+    if not prefetch:
+        while True:
+            records = _records(fetch_page(page), key)
+            yield from records
+            if len(records) < page_size:
+                return
+            page += 1
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(contextvars.copy_context().run, fetch_page, page)
+    try:
+        while True:
+            records = _records(future.result(), key)
+            future = None
+            if len(records) >= page_size:
+                page += 1
+                future = executor.submit(
+                    contextvars.copy_context().run, fetch_page, page
+                )
+            yield from records
+            if future is None:
+                return
+    finally:
+        if future is not None:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+async def paginate_async(fetch_page, page_size, page=1, key=None, prefetch=True):
+    """asyncio version of paginate, ``fetch_page(page)`` returns a coroutine"""
+    task = asyncio.ensure_future(fetch_page(page))
+    try:
+        while True:
+            records = _records(await task, key)
+            task = None
+            full_page = len(records) >= page_size
+            if full_page:
+                page += 1
+                if prefetch:
+                    task = asyncio.ensure_future(fetch_page(page))
+            for record in records:
+                yield record
+            if not full_page:
+                return
+            if task is None:
+                task = asyncio.ensure_future(fetch_page(page))
+    finally:
+        if task is not None:
+            task.cancel()
@@ -0,0 +1,156 @@
+import threading
+
+from .exceptions import RateLimitError
+
+
+class Subscription:
+    """A subscriber's ids, vs_currencies and callback, returned by PricePoller.subscribe"""
+
+    __slots__ = ("ids", "vs_currencies", "callback", "_last")
+
+    def __init__(self, ids, vs_currencies, callback):
+        self.ids = frozenset(ids)
+        self.vs_currencies = frozenset(vs_currencies)
+        self.callback = callback
+        self._last = {}
+
+    def _changes(self, prices):
+        """Return the prices of this subscription that differ from the last delivered ones"""
+        changes = {}
+        for id in self.ids:
+            quote = prices.get(id)
+            if quote is None:
+                continue
+            view = {
+                field: value
+                for field, value in quote.items()
+                if field in self.vs_currencies or field == "last_updated_at"
+            }
+            if view and view != self._last.get(id):
+                changes[id] = self._last[id] = view
+        return changes
+
+
+def _as_list(values):
+    if isinstance(values, str):
+        return [v for v in values.replace(" ", "").split(",") if v]
+    return list(values)
+
+
+class PricePoller:
+    """Background thread polling get_price for every subscriber in one batched call
+
+    The ids and vs_currencies of all subscriptions are merged into a single
+    ``get_price(..., include_last_updated_at=True)`` request per poll (split
+    by the client only when the lists exceed ``max_list_length``). A
+    subscriber's callback receives ``{id: {currency: price, ...,
+    "last_updated_at": ts}}`` with only the ids whose values or
+    ``last_updated_at`` changed since its previous call.
+
+    The interval adapts between ``min_interval`` and ``max_interval``
+    seconds: it is reset to ``min_interval`` whenever a poll sees a change
+    and multiplied by ``backoff`` after every poll that does not (or that
+    fails). Errors are passed to ``on_error`` and never stop the thread.
+    """
+
+    def __init__(
+        self, api, min_interval=10, max_interval=120, backoff=1.5, on_error=None
+    ):
+        self.api = api
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.on_error = on_error
+        self.interval = min_interval
+        self.polls = 0
+        self._subscriptions = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def subscribe(self, ids, vs_currencies, callback):
+        """Call callback(changes) when the prices of ids in vs_currencies change"""
+        subscription = Subscription(_as_list(ids), _as_list(vs_currencies), callback)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        self.interval = self.min_interval
+        self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Stop delivering changes to a subscription"""
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def poll_once(self):
+        """Fetch the prices of all subscriptions and notify subscribers, return True if any changed"""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        if not subscriptions:
+            return False
+        ids = sorted(set().union(*(s.ids for s in subscriptions)))
+        vs_currencies = sorted(set().union(*(s.vs_currencies for s in subscriptions)))
+        prices = self.api.get_price(
+            ",".join(ids), ",".join(vs_currencies), include_last_updated_at=True
+        )
+        self.polls += 1
+
+        changed = False
+        for subscription in subscriptions:
+            changes = subscription._changes(prices)
+            if changes:
+                changed = True
+                try:
+                    subscription.callback(changes)
+                except Exception as e:
+                    self._error(e)
+        return changed
+
+    def start(self):
+        """Start polling in a daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="pesto-price-poller", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the polling thread and wait for it to exit"""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.clear()
+            wait = None
+            try:
+                changed = self.poll_once()
+            except Exception as e:
+                changed = False
+                if isinstance(e, RateLimitError):
+                    wait = e.retry_after
+                self._error(e)
+
+            if changed:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+            self._wake.wait(max(self.interval, wait or 0))
+
+    def _error(self, error):
+        if self.on_error is not None:
+            self.on_error(error)
@@ -0,0 +1,77 @@
+_DAY = 24 * 60 * 60
+
+# longest range for which the API still returns each granularity
+GRANULARITY_WINDOWS = {
+    "5m": _DAY,
+    "5minutely": _DAY,
+    "hourly": 90 * _DAY,
+    "daily": 365 * _DAY,
+}
+
+
+def window_size(split):
+    """Return the window length in seconds for a split option (granularity name or seconds)"""
+    if isinstance(split, str) and not split.isdigit():
+        try:
+            return GRANULARITY_WINDOWS[split]
+        except KeyError:
+            raise ValueError(
+                "split must be a number of seconds or one of: {0}".format(
+                    ", ".join(GRANULARITY_WINDOWS)
+                )
+            )
+    # True would be a window of 1 second
+    if isinstance(split, bool) or not isinstance(split, (str, int, float)):
+        raise ValueError(
+            "split must be a number of seconds or a granularity, got {0!r}".format(
+                split
+            )
+        )
+    seconds = int(split)
+    if seconds < 1:
+        raise ValueError("split must be at least 1 second, got {0!r}".format(split))
+    return seconds
+
+
+def split_range(start, end, window):
+    """Return consecutive (start, end) windows of at most window seconds covering [start, end]"""
+    start, end = int(float(start)), int(float(end))
+    windows = []
+    while True:
+        window_end = min(start + window, end)
+        windows.append((start, window_end))
+        if window_end >= end:
+            return windows
+        start = window_end
+
+
+def _merge_rows(parts):
+    rows = {}
+    for part in parts:
+        for row in part:
+            rows[row[0]] = row
+    return [rows[ts] for ts in sorted(rows)]
+
+
+def merge_series(results):
+    """Stitch the responses of consecutive windows into one ordered series without duplicates"""
+    if results and isinstance(results[0], list):
+        return _merge_rows(results)
+    merged = {}
+    for key in results[0] if results else ():
+        values = [result.get(key) for result in results]
+        if all(isinstance(value, list) for value in values):
+            merged[key] = _merge_rows(values)
+        elif all(isinstance(value, dict) for value in values):
+            merged[key] = merge_series(values)
+        else:
+            merged[key] = values[-1]
+    return merged
+
+
+def range_batches(params, split):
+    """Return a copy of the request params for every window of their from/to range"""
+    if "from" not in params or "to" not in params:
+        raise ValueError("split is only supported by *_range endpoints")
+    windows = split_range(params["from"], params["to"], window_size(split))
+    return [dict(params, **{"from": start, "to": end}) for start, end in windows]
@@ -0,0 +1,50 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe token bucket limiting requests to a number of calls per minute
+
+    Calls are spread evenly over the minute; ``burst`` is the number of calls
+    that may be made back to back after an idle period. Every caller reserves
+    its own slot, so concurrent threads are released in order without polling.
+    """
+
+    def __init__(self, calls_per_minute, burst=1):
+        self._lock = threading.Lock()
+        self.set_rate(calls_per_minute, burst)
+
+    @classmethod
+    def from_key(cls, key_data, burst=1):
+        """Return a limiter configured from the response of the /key endpoint"""
+        return cls(key_data["rate_limit_request_per_minute"], burst)
+
+    def set_rate(self, calls_per_minute, burst=1):
+        """Change the allowed number of calls per minute"""
+        if calls_per_minute <= 0:
+            raise ValueError("calls_per_minute must be positive")
+        with self._lock:
+            self.calls_per_minute = calls_per_minute
+            self.burst = max(1, burst)
+            self._rate = calls_per_minute / 60.0
+            self._tokens = float(self.burst)
+            self._updated = time.monotonic()
+
+    def reserve(self):
+        """Take a slot and return the number of seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+    def acquire(self):
+        """Block until a call is allowed"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,168 @@
+import sys
+
+
+class Record:
+    """Base of the compact record types returned with ``as_records=True``
+
+    Records keep the fields of one API row in ``__slots__`` instead of a
+    dict, and intern the strings of ``_interned`` fields (symbols, market
+    names) so that every row shares one copy of them. Fields missing from
+    the row read as None and are remembered in a bit mask, so ``to_dict``
+    leaves them out; fields the record type does not declare are kept in
+    ``extra`` (None when there are none), so ``to_dict`` loses nothing.
+    """
+
+    __slots__ = ("extra", "_missing")
+    _fields = ()
+    _field_set = frozenset()
+    _interned = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls._fields)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Return a record with the fields of an API row"""
+        record = cls.__new__(cls)
+        missing = 0
+        for bit, field in enumerate(cls._fields):
+            if field in data:
+                setattr(record, field, data[field])
+            else:
+                setattr(record, field, None)
+                missing |= 1 << bit
+        record._missing = missing
+        for field in cls._interned:
+            value = getattr(record, field)
+            if type(value) is str:
+                setattr(record, field, sys.intern(value))
+        record.extra = None
+        if not cls._field_set.issuperset(data):
+            record.extra = {k: v for k, v in data.items() if k not in cls._field_set}
+        return record
+
+    def to_dict(self):
+        """Return the row as a dict, like the API response"""
+        missing = self._missing
+        data = {
+            field: getattr(self, field)
+            for bit, field in enumerate(self._fields)
+            if not missing >> bit & 1
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return "{0}({1})".format(
+            type(self).__name__,
+            ", ".join(
+                "{0}={1!r}".format(field, getattr(self, field))
+                for field in self._fields[:3]
+            )
+            + ", ...",
+        )
+
+
+class CoinListEntry(Record):
+    """A row of get_coins_list"""
+
+    _fields = __slots__ = ("id", "symbol", "name", "platforms")
+    _interned = ("symbol",)
+
+
+class CoinMarketRow(Record):
+    """A row of get_coins_markets"""
+
+    _fields = __slots__ = (
+        "id",
+        "symbol",
+        "name",
+        "image",
+        "current_price",
+        "market_cap",
+        "market_cap_rank",
+        "fully_diluted_valuation",
+        "total_volume",
+        "high_24h",
+        "low_24h",
+        "price_change_24h",
+        "price_change_percentage_24h",
+        "market_cap_change_24h",
+        "market_cap_change_percentage_24h",
+        "circulating_supply",
+        "total_supply",
+        "max_supply",
+        "ath",
+        "ath_change_percentage",
+        "ath_date",
+        "atl",
+        "atl_change_percentage",
+        "atl_date",
+        "roi",
+        "last_updated",
+    )
+    _interned = ("symbol",)
+
+
+class ExchangeTicker(Record):
+    """A ticker of get_coin_ticker_by_id and get_exchanges_tickers_by_id"""
+
+    _fields = __slots__ = (
+        "base",
+        "target",
+        "market",
+        "last",
+        "volume",
+        "converted_last",
+        "converted_volume",
+        "trust_score",
+        "bid_ask_spread_percentage",
+        "timestamp",
+        "last_traded_at",
+        "last_fetch_at",
+        "is_anomaly",
+        "is_stale",
+        "trade_url",
+        "token_info_url",
+        "coin_id",
+        "target_coin_id",
+    )
+    _interned = ("base", "target", "trust_score", "coin_id", "target_coin_id")
+
+
+class DerivativeTicker(Record):
+    """A row of get_derivatives"""
+
+    _fields = __slots__ = (
+        "market",
+        "symbol",
+        "index_id",
+        "price",
+        "price_percentage_change_24h",
+        "contract_type",
+        "index",
+        "basis",
+        "spread",
+        "funding_rate",
+        "open_interest",
+        "volume_24h",
+        "last_traded_at",
+        "expired_at",
+    )
+    _interned = ("market", "symbol", "index_id", "contract_type")
+
+
+def to_records(content, record_type, key=None):
+    """Return the rows of a response as records, the rows under key for dict responses"""
+    if key is None:
+        return [record_type.from_dict(row) for row in content]
+    content = dict(content)
+    content[key] = [record_type.from_dict(row) for row in content[key]]
+    return content
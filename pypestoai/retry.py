@@ -0,0 +1,114 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+from requests.packages.urllib3.exceptions import MaxRetryError, ResponseError
+from requests.packages.urllib3.util.retry import Retry
+
+# statuses retried by both clients: rate limited and temporary server errors
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+def decorrelated_jitter(previous, base, cap):
+    """Return the next retry delay: random between base and 3x the previous delay, at most cap"""
+    return min(cap, random.uniform(base, max(base, previous * 3)))
+
+
+def parse_retry_after(value):
+    """Return the seconds to wait from a Retry-After header (delay or HTTP date), or None"""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class JitteredRetry(Retry):
+    """urllib3 Retry policy with decorrelated jitter and a total time budget
+
+    429 and temporary 5xx responses are retried, waiting for the server's
+    ``Retry-After`` when it sends one and otherwise a random delay that
+    grows from ``backoff_factor`` (see ``decorrelated_jitter``), so that
+    clients failing together do not retry together. No retry is made once
+    the next wait would end more than ``budget`` seconds after the first
+    failure; the last response is then returned (``raise_on_status=False``)
+    and raised by the client as a RateLimitError or ServerError.
+    """
+
+    def __init__(
+        self,
+        total=5,
+        backoff_factor=0.5,
+        budget=60.0,
+        status_forcelist=RETRY_STATUSES,
+        raise_on_status=False,
+        started=None,
+        previous_backoff=None,
+        **kwargs,
+    ):
+        super().__init__(
+            total=total,
+            backoff_factor=backoff_factor,
+            status_forcelist=status_forcelist,
+            raise_on_status=raise_on_status,
+            **kwargs,
+        )
+        self.budget = budget
+        self._started = started
+        self._previous_backoff = previous_backoff
+        self._backoff = None
+
+    def new(self, **kw):
+        # called by increment(): carry the budget and jitter state to the next attempt
+        kw.setdefault("budget", self.budget)
+        kw.setdefault(
+            "started", self._started if self._started is not None else time.monotonic()
+        )
+        kw.setdefault(
+            "previous_backoff",
+            self._backoff if self._backoff is not None else self._previous_backoff,
+        )
+        return super().new(**kw)
+
+    def get_backoff_time(self):
+        if not self.history:
+            return 0
+        # drawn once per attempt, then reused by the budget check and the sleep
+        if self._backoff is None:
+            base = self.backoff_factor
+            self._backoff = decorrelated_jitter(
+                self._previous_backoff or base,
+                base,
+                getattr(self, "backoff_max", self.DEFAULT_BACKOFF_MAX),
+            )
+        return self._backoff
+
+    def increment(
+        self,
+        method=None,
+        url=None,
+        response=None,
+        error=None,
+        _pool=None,
+        _stacktrace=None,
+    ):
+        new_retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        if self.budget is None:
+            return new_retry
+
+        delay = None
+        if response is not None and self.respect_retry_after_header:
+            delay = new_retry.get_retry_after(response)
+        if delay is None:
+            delay = new_retry.get_backoff_time()
+        if time.monotonic() + delay - new_retry._started > self.budget:
+            reason = error or ResponseError(
+                "retry budget of {0}s exhausted".format(self.budget)
+            )
+            raise MaxRetryError(_pool, url, reason) from reason
+        return new_retry
@@ -0,0 +1,197 @@
+import contextlib
+import contextvars
+import threading
+import time
+from datetime import datetime, timezone
+
+from .exceptions import CreditBudgetError
+from .ratelimit import RateLimiter
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+_context = contextvars.ContextVar(
+    "pesto_scheduler_context", default=(None, INTERACTIVE)
+)
+
+
+def next_month(now=None):
+    """Return the UNIX time of the start of the next month (UTC), when plan credits reset"""
+    now = datetime.fromtimestamp(time.time() if now is None else now, timezone.utc)
+    if now.month == 12:
+        start = datetime(now.year + 1, 1, 1, tzinfo=timezone.utc)
+    else:
+        start = datetime(now.year, now.month + 1, 1, tzinfo=timezone.utc)
+    return start.timestamp()
+
+
+class _TagStats:
+    __slots__ = ("requests", "credits", "throttled", "deferred")
+
+    def __init__(self):
+        self.requests = 0
+        self.credits = 0
+        self.throttled = 0.0
+        self.deferred = 0
+
+
+class CreditScheduler:
+    """Admission of requests against the monthly credit budget of the API plan
+
+    Every request runs in a lane, interactive (the default) or batch, under
+    an optional caller tag, both set for the calling thread or task with
+    ``context(tag, lane)``. Requests are charged the ``credits`` of their
+    endpoint (cache hits are free) and the spend is reported per tag and
+    lane by ``report()``.
+
+    Interactive requests are never held back. Batch requests:
+
+    * run freely while more than ``batch_throttle`` of the monthly credits
+      remain;
+    * below that, are paced so that the credits left above the reserve last
+      until the budget resets (``resets_at``, the next month by default),
+      with bursts of up to ``batch_burst`` credits;
+    * raise CreditBudgetError once only ``batch_reserve`` of the monthly
+      credits remain, which are kept for interactive traffic.
+
+    ``batch_calls_per_minute`` additionally caps the batch lane's share of
+    the plan rate limit. Without ``monthly_credits`` (see ``sync`` and
+    ``from_key``) requests are only counted.
+    """
+
+    def __init__(
+        self,
+        monthly_credits=None,
+        remaining_credits=None,
+        resets_at=None,
+        batch_reserve=0.1,
+        batch_throttle=0.5,
+        batch_burst=50,
+        batch_calls_per_minute=None,
+    ):
+        self.batch_reserve = batch_reserve
+        self.batch_throttle = batch_throttle
+        self.batch_burst = batch_burst
+        self.batch_rate_limiter = (
+            RateLimiter(batch_calls_per_minute) if batch_calls_per_minute else None
+        )
+        self._lock = threading.Lock()
+        self._tags = {}
+        self._lanes = {INTERACTIVE: 0, BATCH: 0}
+        self.monthly_credits = None
+        self.remaining_credits = None
+        self.resets_at = None
+        self._tokens = float(batch_burst)
+        self._updated = time.monotonic()
+        if monthly_credits is not None:
+            self.set_budget(monthly_credits, remaining_credits, resets_at)
+
+    @classmethod
+    def from_key(cls, key_data, **kwargs):
+        """Return a scheduler configured from the response of the /key endpoint"""
+        scheduler = cls(**kwargs)
+        scheduler.sync(key_data)
+        return scheduler
+
+    def sync(self, key_data):
+        """Update the budget from the response of the /key endpoint"""
+        self.set_budget(
+            key_data["monthly_call_credit"],
+            key_data.get("current_remaining_monthly_calls"),
+        )
+
+    def set_budget(self, monthly_credits, remaining_credits=None, resets_at=None):
+        """Set the monthly credits, the credits left and when they reset (UNIX time)"""
+        with self._lock:
+            self.monthly_credits = monthly_credits
+            self.remaining_credits = (
+                monthly_credits if remaining_credits is None else remaining_credits
+            )
+            self.resets_at = next_month() if resets_at is None else resets_at
+
+    @contextlib.contextmanager
+    def context(self, tag=None, lane=INTERACTIVE):
+        """Run the requests made inside the block under a tag and lane"""
+        if lane not in (INTERACTIVE, BATCH):
+            raise ValueError("lane must be {0!r} or {1!r}".format(INTERACTIVE, BATCH))
+        token = _context.set((tag, lane))
+        try:
+            yield
+        finally:
+            _context.reset(token)
+
+    def reserve(self, credits):
+        """Charge a request of the current context, return the seconds to wait before sending it
+
+        Raises CreditBudgetError for batch requests once the reserve is reached.
+        """
+        tag, lane = _context.get()
+        delay = 0.0
+        with self._lock:
+            stats = self._tags.get(tag)
+            if stats is None:
+                stats = self._tags[tag] = _TagStats()
+            if self.monthly_credits is not None:
+                self._roll_over()
+            if lane == BATCH and self.monthly_credits is not None:
+                reserve = self.batch_reserve * self.monthly_credits
+                if self.remaining_credits - credits < reserve:
+                    stats.deferred += 1
+                    raise CreditBudgetError(tag, self.remaining_credits)
+                if self.remaining_credits < self.batch_throttle * self.monthly_credits:
+                    delay = self._pace(credits, reserve)
+                    stats.throttled += delay
+            stats.requests += 1
+            stats.credits += credits
+            self._lanes[lane] += credits
+            if self.remaining_credits is not None:
+                self.remaining_credits -= credits
+        if lane == BATCH and self.batch_rate_limiter is not None:
+            delay = max(delay, self.batch_rate_limiter.reserve())
+        return delay
+
+    def acquire(self, credits):
+        """Charge a request of the current context, blocking while it is throttled"""
+        delay = self.reserve(credits)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _roll_over(self):
+        if time.time() >= self.resets_at:
+            self.remaining_credits = self.monthly_credits
+            self.resets_at = next_month()
+
+    def _pace(self, credits, reserve):
+        # token bucket refilled at the rate spreading the batch credits left
+        # above the reserve until the reset
+        now = time.monotonic()
+        rate = (self.remaining_credits - reserve) / max(
+            1.0, self.resets_at - time.time()
+        )
+        self._tokens = min(
+            self.batch_burst, self._tokens + (now - self._updated) * rate
+        )
+        self._updated = now
+        self._tokens -= credits
+        if self._tokens >= 0 or rate <= 0:
+            return 0.0
+        return -self._tokens / rate
+
+    def report(self):
+        """Return the budget and the spend per lane and per tag"""
+        with self._lock:
+            return {
+                "monthly_credits": self.monthly_credits,
+                "remaining_credits": self.remaining_credits,
+                "resets_at": self.resets_at,
+                "lanes": dict(self._lanes),
+                "tags": {
+                    tag: {
+                        "requests": stats.requests,
+                        "credits": stats.credits,
+                        "throttled_seconds": stats.throttled,
+                        "deferred": stats.deferred,
+                    }
+                    for tag, stats in self._tags.items()
+                },
+            }
@@ -0,0 +1,161 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class TimeSeriesStore:
+    """Local SQLite store for range endpoints that only downloads missing intervals
+
+    Every series is identified by its endpoint, coin or exchange id, vs_currency
+    and granularity. The store remembers which time intervals have already been
+    downloaded; a range query fetches only the missing sub-ranges from the API,
+    saves them and returns the merged series from disk. The last
+    ``refresh_window`` seconds before now are never marked as covered, so
+    recent (still changing) data is always downloaded again.
+
+    ``interval`` should be given explicitly: with the API's automatic
+    granularity, windows of different lengths come back at different
+    resolutions and would be mixed in the same series.
+    """
+
+    def __init__(self, api, path="pesto_timeseries.sqlite", refresh_window=3600):
+        self.api = api
+        self.path = path
+        self.refresh_window = refresh_window
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS points (
+                series TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (series, ts)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS coverage (
+                series TEXT NOT NULL,
+                start INTEGER NOT NULL,
+                end INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS coverage_series ON coverage (series);
+            """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the database"""
+        self._db.close()
+
+    def get_coin_market_chart_range_by_id(
+        self, id, vs_currency, from_timestamp, to_timestamp, interval=None
+    ):
+        """Get prices, market caps and total volumes of a coin within a range of timestamp"""
+
+        def fetch(start, end):
+            kwargs = {"interval": interval} if interval else {}
+            return self.api.get_coin_market_chart_range_by_id(
+                id, vs_currency, start, end, **kwargs
+            )
+
+        series = "market_chart/{0}/{1}/{2}".format(id, vs_currency, interval or "auto")
+        fields = ("prices", "market_caps", "total_volumes")
+        return self._range(series, fields, from_timestamp, to_timestamp, fetch)
+
+    def get_coin_ohlc_by_id_range(
+        self, id, vs_currency, from_timestamp, to_timestamp, interval
+    ):
+        """Get OHLC rows of a coin within a range of timestamp"""
+
+        def fetch(start, end):
+            rows = self.api.get_coin_ohlc_by_id_range(
+                id, vs_currency, start, end, interval
+            )
+            return {"ohlc": rows}
+
+        series = "ohlc/{0}/{1}/{2}".format(id, vs_currency, interval)
+        return self._range(series, ("ohlc",), from_timestamp, to_timestamp, fetch)[
+            "ohlc"
+        ]
+
+    def get_exchanges_volume_chart_by_id_within_time_range(
+        self, id, from_timestamp, to_timestamp
+    ):
+        """Get the volume chart of an exchange within a range of timestamp"""
+
+        def fetch(start, end):
+            rows = self.api.get_exchanges_volume_chart_by_id_within_time_range(
+                id, start, end
+            )
+            return {"volume": rows}
+
+        series = "volume_chart/{0}".format(id)
+        return self._range(series, ("volume",), from_timestamp, to_timestamp, fetch)[
+            "volume"
+        ]
+
+    def missing_intervals(self, series, start, end):
+        """Return the (start, end) sub-ranges of [start, end] not covered yet for a series"""
+        with self._lock:
+            covered = self._db.execute(
+                "SELECT start, end FROM coverage WHERE series = ? AND end >= ? AND start <= ? "
+                "ORDER BY start",
+                (series, start, end),
+            ).fetchall()
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in covered:
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def _range(self, series, fields, start, end, fetch):
+        start, end = int(start), int(end)
+        for gap_start, gap_end in self.missing_intervals(series, start, end):
+            self._save(series, fields, gap_start, gap_end, fetch(gap_start, gap_end))
+        return {field: self._load(series + ":" + field, start, end) for field in fields}
+
+    def _save(self, series, fields, start, end, data):
+        with self._lock, self._db:
+            for field in fields:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO points (series, ts, value) VALUES (?, ?, ?)",
+                    (
+                        (series + ":" + field, int(row[0]), json.dumps(row[1:]))
+                        for row in data.get(field) or ()
+                    ),
+                )
+            end = min(end, int(time.time()) - self.refresh_window)
+            if end > start:
+                self._add_coverage(series, start, end)
+
+    def _add_coverage(self, series, start, end):
+        # merge with every overlapping or adjacent interval
+        overlapping = self._db.execute(
+            "SELECT rowid, start, end FROM coverage WHERE series = ? AND end >= ? AND start <= ?",
+            (series, start, end),
+        ).fetchall()
+        for rowid, covered_start, covered_end in overlapping:
+            start = min(start, covered_start)
+            end = max(end, covered_end)
+            self._db.execute("DELETE FROM coverage WHERE rowid = ?", (rowid,))
+        self._db.execute(
+            "INSERT INTO coverage (series, start, end) VALUES (?, ?, ?)",
+            (series, start, end),
+        )
+
+    def _load(self, series, start, end):
+        # timestamps of the points are in milliseconds, ranges in seconds
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT ts, value FROM points WHERE series = ? AND ts >= ? AND ts <= ? "
+                "ORDER BY ts",
+                (series, start * 1000, end * 1000),
+            ).fetchall()
+        return [[ts] + json.loads(value) for ts, value in rows]
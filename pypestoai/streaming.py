@@ -0,0 +1,137 @@
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+_MORE = object()
+
+
+class JSONArrayStream:
+    """Incremental parser yielding the elements of a top-level JSON array
+
+    Bytes are fed in chunks as they arrive and every complete element is
+    returned as soon as it is parsed, so only the unparsed tail of the body
+    is kept in memory. With ``key`` the body is an object and the elements
+    of the array under that key are returned (e.g. ``"tokens"`` for token
+    lists); the other members are parsed and discarded. ``factory``, when
+    given, is applied to every element (e.g. a record type's ``from_dict``).
+    """
+
+    def __init__(self, key=None, factory=None):
+        self.key = key
+        self.factory = factory
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._target = False
+
+    def feed(self, data, final=False):
+        """Parse a chunk of bytes and return the elements it completed"""
+        self._buffer = self._buffer[self._pos :] + self._text.decode(data, final)
+        self._pos = 0
+        items = []
+        while self._step(items, final):
+            pass
+        return items
+
+    def close(self):
+        """Signal the end of the body and return the remaining elements"""
+        items = self.feed(b"", final=True)
+        if self._state != "done":
+            raise ValueError("Incomplete JSON array in response body")
+        return items
+
+    def _step(self, items, final):
+        char = self._skip_whitespace()
+        if char is None:
+            return False
+        state = self._state
+        if state == "start":
+            self._expect(char, "{" if self.key is not None else "[")
+            self._state = "key" if self.key is not None else "item"
+        elif state == "key":
+            if char == "}":
+                raise ValueError("Key {0!r} not found in response".format(self.key))
+            key = self._decode(final)
+            if key is _MORE:
+                return False
+            self._target = key == self.key
+            self._state = "colon"
+        elif state == "colon":
+            self._expect(char, ":")
+            self._state = "value"
+        elif state == "value":
+            if self._target:
+                self._expect(char, "[")
+                self._state = "item"
+            elif self._decode(final) is _MORE:
+                return False
+            else:
+                self._state = "next_key"
+        elif state == "next_key":
+            self._expect(char, ",")
+            self._state = "key"
+        elif state == "item":
+            if char == "]":
+                self._pos += 1
+                self._state = "done"
+                return True
+            item = self._decode(final)
+            if item is _MORE:
+                return False
+            items.append(item if self.factory is None else self.factory(item))
+            self._state = "next_item"
+        elif state == "next_item":
+            if char == "]":
+                self._pos += 1
+                self._state = "done"
+            else:
+                self._expect(char, ",")
+                self._state = "item"
+        else:
+            # anything after the array (the rest of the object) is ignored
+            self._pos = len(self._buffer)
+            return False
+        return True
+
+    def _skip_whitespace(self):
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return buffer[pos] if pos < len(buffer) else None
+
+    def _expect(self, char, expected):
+        if char != expected:
+            raise ValueError(
+                "Expected {0!r} at position {1} of the buffered response, got {2!r}".format(
+                    expected, self._pos, char
+                )
+            )
+        self._pos += 1
+
+    def _decode(self, final):
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return _MORE
+        # a number cut by the end of the buffer ("12" of "123", "1." of "1.5")
+        # may continue in the next chunk
+        if not final and (
+            end == len(self._buffer) or self._buffer[end] in _NUMBER_CHARS
+        ):
+            return _MORE
+        self._pos = end
+        return value
+
+
+def iter_json_array(chunks, key=None):
+    """Yield the elements of the JSON array streamed as byte chunks"""
+    parser = JSONArrayStream(key)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
@@ -0,0 +1,297 @@
+import threading
+from http import HTTPStatus
+from urllib.parse import urlencode, urlsplit
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+from .metrics import response_retries
+
+
+class Response:
+    """An HTTP response returned by a Transport
+
+    ``content`` holds the raw body bytes. Streamed responses read their
+    body through ``iter_content`` instead and must be closed (they are
+    context managers); reading ``content`` on them downloads the rest.
+    """
+
+    __slots__ = (
+        "status_code",
+        "reason",
+        "headers",
+        "url",
+        "retries",
+        "_content",
+        "_raw",
+    )
+
+    def __init__(
+        self, status_code, reason, headers, url, content=None, retries=0, raw=None
+    ):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.url = url
+        self.retries = retries
+        self._content = content
+        self._raw = raw
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = b"".join(self.iter_content(65536))
+        return self._content
+
+    def iter_content(self, chunk_size):
+        """Yield the body in chunks of at most chunk_size bytes"""
+        if self._content is not None:
+            for start in range(0, len(self._content), chunk_size):
+                yield self._content[start : start + chunk_size]
+        elif isinstance(self._raw, requests.Response):
+            yield from self._raw.iter_content(chunk_size)
+        else:
+            yield from self._raw.stream(chunk_size)
+
+    def close(self):
+        if self._raw is not None:
+            self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class Transport:
+    """Interface between PestoAPI and the HTTP library sending its requests
+
+    ``get`` returns a Response with the whole body in ``content``;
+    ``stream`` returns one whose body is read with ``iter_content``.
+    Connection errors are raised as ``requests.exceptions.RequestException``
+    whatever the library, so that callers handle a single exception type.
+    """
+
+    def get(self, url, params, headers, timeout):
+        """Send a GET request and return its Response"""
+        raise NotImplementedError
+
+    def stream(self, url, params, headers, timeout):
+        """Send a GET request and return its Response without reading the body"""
+        return self.get(url, params, headers, timeout)
+
+    def close(self):
+        """Close the pooled connections"""
+
+
+class RequestsTransport(Transport):
+    """Transport sending requests through a requests.Session (the default)
+
+    The session mounts an HTTPAdapter with the given pool sizes and urllib3
+    ``retry`` policy. With ``per_thread_session=True`` every thread gets its
+    own session and connection pool.
+    """
+
+    def __init__(
+        self,
+        retry=None,
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_block=False,
+        keep_alive=True,
+        per_thread_session=False,
+    ):
+        self.retry = retry
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self._thread_local = threading.local() if per_thread_session else None
+        self._session = None if per_thread_session else self._new_session()
+
+    @property
+    def session(self):
+        """The requests.Session used by the calling thread"""
+        if self._thread_local is None:
+            return self._session
+        session = getattr(self._thread_local, "session", None)
+        if session is None:
+            session = self._thread_local.session = self._new_session()
+        return session
+
+    @session.setter
+    def session(self, session):
+        self._thread_local = None
+        self._session = session
+
+    def _new_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self.retry,
+            pool_block=self.pool_block,
+        )
+        session.mount("https://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def get(self, url, params, headers, timeout):
+        response = self.session.get(
+            url, params=params, headers=headers, timeout=timeout
+        )
+        return self._response(response, response.content)
+
+    def stream(self, url, params, headers, timeout):
+        response = self.session.get(
+            url, params=params, headers=headers, timeout=timeout, stream=True
+        )
+        return self._response(response, None)
+
+    def _response(self, response, content):
+        return Response(
+            response.status_code,
+            response.reason,
+            response.headers,
+            response.url,
+            content,
+            response_retries(response),
+            response,
+        )
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+class Urllib3Transport(Transport):
+    """Transport sending requests straight to a urllib3 PoolManager
+
+    Skips the per-request work of requests (session and header merging,
+    hooks, cookies, response objects) and returns the raw body bytes. Pool
+    sizes, keep-alive and the ``retry`` policy behave as in
+    RequestsTransport.
+    """
+
+    def __init__(
+        self,
+        retry=None,
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_block=False,
+        keep_alive=True,
+    ):
+        self.headers = {"Accept-Encoding": "gzip, deflate"}
+        if not keep_alive:
+            self.headers["Connection"] = "close"
+        self.pool = urllib3.PoolManager(
+            num_pools=pool_connections,
+            maxsize=pool_maxsize,
+            block=pool_block,
+            retries=retry,
+        )
+
+    def get(self, url, params, headers, timeout):
+        return self._request(url, params, headers, timeout, preload_content=True)
+
+    def stream(self, url, params, headers, timeout):
+        return self._request(url, params, headers, timeout, preload_content=False)
+
+    def _request(self, url, params, headers, timeout, preload_content):
+        if params:
+            url = _with_query(url, params)
+        if headers:
+            headers = dict(self.headers, **headers)
+        else:
+            headers = self.headers
+        if isinstance(timeout, tuple):
+            timeout = urllib3.Timeout(connect=timeout[0], read=timeout[1])
+        try:
+            response = self.pool.request(
+                "GET",
+                url,
+                headers=headers,
+                timeout=timeout,
+                preload_content=preload_content,
+            )
+        except urllib3.exceptions.MaxRetryError as e:
+            if isinstance(e.reason, urllib3.exceptions.ResponseError):
+                raise requests.exceptions.RetryError(e) from e
+            raise requests.exceptions.ConnectionError(e) from e
+        except urllib3.exceptions.TimeoutError as e:
+            raise requests.exceptions.Timeout(e) from e
+        except urllib3.exceptions.HTTPError as e:
+            raise requests.exceptions.ConnectionError(e) from e
+
+        retries = response.retries
+        return Response(
+            response.status,
+            response.reason,
+            response.headers,
+            url,
+            response.data if preload_content else None,
+            len(retries.history) if retries is not None else 0,
+            None if preload_content else response,
+        )
+
+    def close(self):
+        self.pool.clear()
+
+
+class InMemoryTransport(Transport):
+    """Transport answering requests from memory, for tests and benchmarks
+
+    ``handler(path, params, headers)`` receives the url path relative to
+    ``base_path`` and returns ``(status_code, body_bytes)`` or
+    ``(status_code, body_bytes, headers)``. Every request is appended to
+    ``requests`` as ``(path, params)`` unless ``record=False``.
+    """
+
+    def __init__(self, handler, base_path="/v2/", record=True):
+        self.handler = handler
+        self.base_path = base_path
+        self.record = record
+        self.requests = []
+
+    def get(self, url, params, headers, timeout):
+        path = urlsplit(url).path
+        if path.startswith(self.base_path):
+            path = path[len(self.base_path) :]
+        # None values are left out, as requests does
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        if self.record:
+            self.requests.append((path, params))
+        result = self.handler(path, params, headers)
+        status_code, content = result[0], result[1]
+        response_headers = requests.structures.CaseInsensitiveDict(
+            result[2] if len(result) > 2 else {}
+        )
+        if params:
+            url = _with_query(url, params)
+        return Response(
+            status_code,
+            _reason(status_code),
+            response_headers,
+            url,
+            content,
+        )
+
+
+def _with_query(url, params):
+    """Return url with the query string of params, leaving out None values like requests"""
+    query = urlencode([(k, v) for k, v in params.items() if v is not None])
+    return "{0}?{1}".format(url, query) if query else url
+
+
+def _reason(status_code):
+    try:
+        return HTTPStatus(status_code).phrase
+    except ValueError:
+        return ""
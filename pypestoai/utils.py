@@ -1,4 +1,9 @@
+import json
 from functools import wraps
+from urllib.parse import urlencode
+
+# keyword arguments handled by the client itself, never sent to the API
+CLIENT_ARGS = frozenset(["as_arrays", "as_records", "split"])
 
 
 def func_args_preprocessing(func):
@@ -7,7 +12,8 @@ def func_args_preprocessing(func):
     @wraps(func)
     def input_args(*args, **kwargs):
         for v in kwargs:
-            kwargs[v] = arg_preprocessing(kwargs[v])
+            if v not in CLIENT_ARGS:
+                kwargs[v] = arg_preprocessing(kwargs[v])
         args = [arg_preprocessing(v) for v in args]
         return func(*args, **kwargs)
 
@@ -28,3 +34,61 @@ def get_comma_separated_values(values):
     if not isinstance(values, list) and not isinstance(values, tuple):
         values = [values]
     return ",".join(values)
+
+
+def canonical_url(url, params):
+    """Return the url with its query parameters in sorted order"""
+    if not params:
+        return url
+    return "{0}?{1}".format(url, urlencode(sorted(params.items())))
+
+
+def chunk_comma_separated(value, max_length):
+    """Split a comma-separated string into comma-separated chunks of at most max_length characters"""
+    if len(value) <= max_length:
+        return [value]
+    chunks = []
+    current = []
+    current_length = -1
+    for item in value.split(","):
+        if current and current_length + 1 + len(item) > max_length:
+            chunks.append(",".join(current))
+            current = []
+            current_length = -1
+        current.append(item)
+        current_length += 1 + len(item)
+    chunks.append(",".join(current))
+    return chunks
+
+
+def split_batches(params, names, max_length):
+    """Return the params split into batches so that none of the named comma-separated values exceeds max_length"""
+    batches = [params]
+    for name in names:
+        chunks = chunk_comma_separated(params[name], max_length)
+        if len(chunks) > 1:
+            batches = [
+                dict(batch, **{name: chunk}) for batch in batches for chunk in chunks
+            ]
+    return batches
+
+
+def merge_batch_results(results):
+    """Merge per-id result dicts of batched requests into a single dict"""
+    merged = {}
+    for result in results:
+        for key, value in result.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key].update(value)
+            else:
+                merged[key] = value
+    return merged
+
+
+def default_json_decoder():
+    """Return orjson.loads if orjson is installed, json.loads otherwise (both decode raw bytes)"""
+    try:
+        import orjson
+    except ImportError:
+        return json.loads
+    return orjson.loads
@@ -1,8 +1,12 @@
+import json
+import time
+
 import pytest
 import requests.exceptions
 import responses
 
-from pypestoai import PestoAPI
+from pypestoai import NotFoundError, PestoAPI, RateLimitError, ServerError
+from pypestoai.utils import chunk_comma_separated
 from requests.exceptions import HTTPError
 
 
@@ -1021,3 +1025,148 @@ class TestWrapper:
             "markets": 197,
         }
         assert response == expected_response
+
+    # ---------- batching of comma-separated params ----------#
+    @responses.activate
+    def test_get_price_splits_oversized_ids(self):
+        def price_callback(request):
+            ids = request.params["ids"].split(",")
+            assert len(request.params["ids"]) <= 20
+            body = {id: {"usd": float(len(id))} for id in ids}
+            return 200, {}, json.dumps(body)
+
+        responses.add_callback(
+            responses.GET,
+            "https://api.pestoai.fun/v2/simple/price",
+            callback=price_callback,
+        )
+        ids = ["coin{0}".format(i) for i in range(10)]
+
+        response = PestoAPI(max_list_length=20).get_price(ids, "usd")
+
+        ## Assert
+        assert len(responses.calls) == 4
+        assert response == {id: {"usd": 5.0} for id in ids}
+
+    @responses.activate
+    def test_get_token_price_merges_split_currencies(self):
+        def token_price_callback(request):
+            body = {
+                "0xabc": {
+                    currency: 1.0
+                    for currency in request.params["vs_currencies"].split(",")
+                }
+            }
+            return 200, {}, json.dumps(body)
+
+        responses.add_callback(
+            responses.GET,
+            "https://api.pestoai.fun/v2/simple/token_price/ethereum",
+            callback=token_price_callback,
+        )
+
+        response = PestoAPI(max_list_length=8).get_token_price(
+            "ethereum", "0xabc", ["usd", "eur", "btc", "eth"]
+        )
+
+        ## Assert
+        assert len(responses.calls) == 2
+        assert response == {"0xabc": {"usd": 1.0, "eur": 1.0, "btc": 1.0, "eth": 1.0}}
+
+
+def test_chunk_comma_separated():
+    assert chunk_comma_separated("a,b,c", 10) == ["a,b,c"]
+    assert chunk_comma_separated("aa,bb,cc,dd", 5) == ["aa,bb", "cc,dd"]
+    assert chunk_comma_separated("aaaaaaa,b", 3) == ["aaaaaaa", "b"]
+
+
+class TestErrors:
+    @responses.activate
+    def test_error_body_is_decoded_once(self):
+        error_json = {"error": "coin not found"}
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/foo/",
+            json=error_json,
+            status=404,
+        )
+        decoded = []
+
+        def decoder(content):
+            decoded.append(content)
+            return json.loads(content)
+
+        with pytest.raises(NotFoundError) as exc:
+            PestoAPI(json_decoder=decoder).get_coin_by_id("foo")
+
+        ## Assert
+        assert len(decoded) == 1
+        assert exc.value.body == error_json
+        assert exc.value.status_code == 404
+        # backwards compatible with the ValueError(content) of previous versions
+        assert isinstance(exc.value, ValueError)
+        assert exc.value.args[0] == error_json
+
+    @responses.activate
+    def test_rate_limited(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/ping",
+            json={"status": {"error_code": 429}},
+            status=429,
+            headers={"Retry-After": "12"},
+        )
+
+        with pytest.raises(RateLimitError) as exc:
+            PestoAPI().ping()
+
+        ## Assert
+        assert exc.value.retry_after == 12
+        assert isinstance(exc.value, HTTPError)
+
+    @responses.activate
+    def test_rate_limited_until_http_date(self):
+        retry_at = time.strftime(
+            "%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 120)
+        )
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/ping",
+            json={"status": {"error_code": 429}},
+            status=429,
+            headers={"Retry-After": retry_at},
+        )
+
+        with pytest.raises(RateLimitError) as exc:
+            PestoAPI().ping()
+
+        ## Assert
+        assert 110 < exc.value.retry_after <= 120
+
+    @responses.activate
+    def test_server_error_without_json_body(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/ping",
+            body="<html>oops</html>",
+            status=500,
+        )
+
+        with pytest.raises(ServerError) as exc:
+            PestoAPI().ping()
+
+        ## Assert
+        assert exc.value.body is None
+        assert "500 Server Error" in str(exc.value)
+
+    @responses.activate
+    def test_invalid_json_on_success(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/ping",
+            body="<html>maintenance</html>",
+            status=200,
+        )
+
+        with pytest.raises(ValueError):
+            PestoAPI().ping()
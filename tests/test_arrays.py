@@ -0,0 +1,81 @@
+import pytest
+import responses
+
+np = pytest.importorskip("numpy")
+
+from pypestoai import PestoAPI
+from pypestoai.arrays import chart_to_arrays, ohlc_to_array, series_to_arrays
+
+
+class TestArrays:
+    def test_series_to_arrays(self):
+        series = series_to_arrays([[1711929600000, 70000.5], [1711933200000, None]])
+        assert series.timestamps.dtype == np.int64
+        assert series.values.dtype == np.float64
+        assert series.timestamps.tolist() == [1711929600000, 1711933200000]
+        assert series.values[0] == 70000.5
+        assert np.isnan(series.values[1])
+        assert series.values.flags["C_CONTIGUOUS"]
+
+    def test_empty_series(self):
+        series = series_to_arrays([])
+        assert len(series.timestamps) == 0
+        assert series.values.dtype == np.float64
+
+    def test_nested_chart_and_string_values(self):
+        chart = chart_to_arrays(
+            {"market_cap_chart": {"volume": [[1, "2.5"]]}, "note": "x"}
+        )
+        assert chart["market_cap_chart"]["volume"].values.tolist() == [2.5]
+        assert chart["note"] == "x"
+
+    def test_ohlc_to_array(self):
+        array = ohlc_to_array([[1, 2.0, 4.0, 1.0, 3.0], [2, 3.0, 5.0, 2.0, 4.0]])
+        assert array["timestamp"].tolist() == [1, 2]
+        assert array["close"].tolist() == [3.0, 4.0]
+
+
+class TestArrayClient:
+    @responses.activate
+    def test_market_chart_as_arrays(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/bitcoin/market_chart?vs_currency=usd&days=1",
+            json={
+                "prices": [[1, 10.0], [2, 11.0]],
+                "market_caps": [[1, 100.0], [2, 110.0]],
+                "total_volumes": [[1, 5.0], [2, 6.0]],
+            },
+            status=200,
+        )
+
+        chart = PestoAPI().get_coin_market_chart_by_id(
+            "bitcoin", "usd", 1, as_arrays=True
+        )
+
+        ## Assert
+        assert "as_arrays" not in responses.calls[0].request.url
+        assert chart["prices"].timestamps.tolist() == [1, 2]
+        assert chart["total_volumes"].values.tolist() == [5.0, 6.0]
+
+    @responses.activate
+    def test_ohlc_as_arrays(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/bitcoin/ohlc?vs_currency=usd&days=1",
+            json=[[1, 2.0, 4.0, 1.0, 3.0]],
+            status=200,
+        )
+
+        array = PestoAPI().get_coin_ohlc_by_id("bitcoin", "usd", 1, as_arrays=True)
+
+        ## Assert
+        assert array["high"].tolist() == [4.0]
+
+    @responses.activate
+    def test_as_arrays_requires_array_endpoint(self):
+        with pytest.raises(ValueError):
+            PestoAPI().get_exchanges_volume_chart_by_id("binance", 1, as_arrays=True)
+
+        ## Assert
+        assert len(responses.calls) == 0
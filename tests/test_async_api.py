@@ -0,0 +1,315 @@
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pypestoai import AsyncPestoAPI, CircuitOpenError, ServerError
+from pypestoai.circuit import CircuitBreaker
+from pypestoai.exceptions import NotFoundError
+from pypestoai.scheduler import BATCH
+
+
+def run_with_server(routes, coro_fn, **client_kwargs):
+    """Serve ``routes`` locally and run ``coro_fn(client, server)`` against them"""
+
+    async def main():
+        app = web.Application()
+        app.add_routes(routes)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            async with AsyncPestoAPI(**client_kwargs) as pto:
+                pto.api_base_url = str(server.make_url("/v2/"))
+                return await coro_fn(pto, server)
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+class TestAsyncWrapper:
+    def test_ping(self):
+        ping_json = {"reaction": "It works!"}
+
+        async def ping(request):
+            return web.json_response(ping_json)
+
+        response = run_with_server(
+            [web.get("/v2/ping", ping)], lambda pto, server: pto.ping()
+        )
+        assert response == ping_json
+
+    def test_get_price_preprocesses_arguments(self):
+        seen = {}
+
+        async def price(request):
+            seen.update(request.query)
+            return web.json_response({"bitcoin": {"usd": 7984.89}})
+
+        response = run_with_server(
+            [web.get("/v2/simple/price", price)],
+            lambda pto, server: pto.get_price(
+                ["bitcoin", "ethereum"], "usd", include_market_cap=True
+            ),
+        )
+        assert response == {"bitcoin": {"usd": 7984.89}}
+        assert seen == {
+            "ids": "bitcoin,ethereum",
+            "vs_currencies": "usd",
+            "include_market_cap": "true",
+        }
+
+    def test_get_global_returns_data(self):
+        async def global_(request):
+            return web.json_response({"data": {"active_cryptocurrencies": 2517}})
+
+        response = run_with_server(
+            [web.get("/v2/global", global_)], lambda pto, server: pto.get_global()
+        )
+        assert response == {"active_cryptocurrencies": 2517}
+
+    def test_failed_ping(self):
+        async def ping(request):
+            return web.Response(status=404)
+
+        with pytest.raises(NotFoundError) as exc:
+            run_with_server([web.get("/v2/ping", ping)], lambda pto, server: pto.ping())
+        assert exc.value.status_code == 404
+        assert exc.value.body is None
+
+    def test_none_params_are_left_out(self):
+        seen = {}
+
+        async def markets(request):
+            seen.update(request.query)
+            return web.json_response([])
+
+        async def markets_and_stream(pto, server):
+            await pto.get_coins_markets("usd", category=None)
+            return [coin async for coin in pto.stream_coins_list(status=None)]
+
+        response = run_with_server(
+            [
+                web.get("/v2/coins/markets", markets),
+                web.get("/v2/coins/list", markets),
+            ],
+            markets_and_stream,
+        )
+        assert response == []
+        assert seen == {"vs_currency": "usd"}
+
+    def test_error_with_json_body(self):
+        async def coin(request):
+            return web.json_response({"error": "coin not found"}, status=404)
+
+        with pytest.raises(ValueError) as exc:
+            run_with_server(
+                [web.get("/v2/coins/foo/", coin)],
+                lambda pto, server: pto.get_coin_by_id("foo"),
+            )
+        assert exc.value.args[0] == {"error": "coin not found"}
+
+    def test_retries_server_errors(self):
+        calls = []
+
+        async def ping(request):
+            calls.append(1)
+            if len(calls) < 2:
+                return web.Response(status=503)
+            return web.json_response({"reaction": "It works!"})
+
+        response = run_with_server(
+            [web.get("/v2/ping", ping)], lambda pto, server: pto.ping()
+        )
+        assert response == {"reaction": "It works!"}
+        assert len(calls) == 2
+
+    def test_retries_rate_limited_after_retry_after(self):
+        calls = []
+
+        async def ping(request):
+            calls.append(1)
+            if len(calls) < 2:
+                return web.Response(status=429, headers={"Retry-After": "0"})
+            return web.json_response({"reaction": "It works!"})
+
+        response = run_with_server(
+            [web.get("/v2/ping", ping)], lambda pto, server: pto.ping()
+        )
+        assert response == {"reaction": "It works!"}
+        assert len(calls) == 2
+
+    def test_circuit_breaker(self):
+        calls = []
+
+        async def ping(request):
+            calls.append(1)
+            return web.Response(status=500)
+
+        async def call_three_times(pto, server):
+            errors = []
+            for _ in range(3):
+                try:
+                    await pto.ping()
+                except Exception as e:
+                    errors.append(type(e))
+            return errors
+
+        errors = run_with_server(
+            [web.get("/v2/ping", ping)],
+            call_three_times,
+            retries=0,
+            circuit_breaker=CircuitBreaker(failure_threshold=2),
+        )
+        assert errors == [ServerError, ServerError, CircuitOpenError]
+        assert len(calls) == 2
+
+    def test_timeouts_are_retried_and_open_the_circuit(self):
+        calls = []
+
+        async def ping(request):
+            calls.append(1)
+            await asyncio.sleep(1)
+            return web.json_response({"reaction": "It works!"})
+
+        async def ping_twice(pto, server):
+            for _ in range(2):
+                try:
+                    await pto.ping()
+                except Exception as e:
+                    error = e
+            return error, pto.circuit_breaker.state("ping"), pto.metrics.snapshot()
+
+        error, state, snapshot = run_with_server(
+            [web.get("/v2/ping", ping)],
+            ping_twice,
+            retries=1,
+            read_timeout=0.05,
+            circuit_breaker=CircuitBreaker(failure_threshold=1),
+            metrics=True,
+        )
+        assert isinstance(error, CircuitOpenError)
+        assert state == "open"
+        assert len(calls) == 2
+        assert snapshot["ping"]["statuses"] == {None: 1}
+
+    def test_stream_timeouts_open_the_circuit(self):
+        async def coins_list(request):
+            await asyncio.sleep(1)
+            return web.json_response([])
+
+        async def stream_twice(pto, server):
+            errors = []
+            for _ in range(2):
+                try:
+                    async for _ in pto.stream_coins_list():
+                        pass
+                except Exception as e:
+                    errors.append(e)
+            return errors, pto.circuit_breaker.state("coins/list")
+
+        errors, state = run_with_server(
+            [web.get("/v2/coins/list", coins_list)],
+            stream_twice,
+            read_timeout=0.05,
+            circuit_breaker=CircuitBreaker(failure_threshold=1),
+        )
+        assert isinstance(errors[0], asyncio.TimeoutError)
+        assert isinstance(errors[1], CircuitOpenError)
+        assert state == "open"
+
+    def test_backoff_does_not_hold_a_concurrency_slot(self):
+        done = []
+        calls = []
+
+        async def ping(request):
+            calls.append(1)
+            if len(calls) == 1:
+                return web.json_response(
+                    {"error": "busy"}, status=503, headers={"Retry-After": "0.3"}
+                )
+            return web.json_response({"reaction": "It works!"})
+
+        async def coins_list(request):
+            return web.json_response([])
+
+        async def ping_then_list(pto, server):
+            async def first():
+                await pto.ping()
+                done.append("ping")
+
+            async def second():
+                await asyncio.sleep(0.1)
+                await pto.get_coins_list()
+                done.append("coins/list")
+
+            await asyncio.gather(first(), second())
+            return done
+
+        done_order = run_with_server(
+            [web.get("/v2/ping", ping), web.get("/v2/coins/list", coins_list)],
+            ping_then_list,
+            max_concurrency=1,
+            retries=1,
+        )
+        assert done_order == ["coins/list", "ping"]
+
+    def test_scheduler_tags(self):
+        async def ping(request):
+            return web.json_response({"reaction": "It works!"})
+
+        async def tagged_pings(pto, server):
+            with pto.scheduler.context("backfill", lane=BATCH):
+                await asyncio.gather(pto.ping(), pto.ping())
+            return pto.scheduler.report()
+
+        report = run_with_server(
+            [web.get("/v2/ping", ping)], tagged_pings, scheduler=True
+        )
+        assert report["tags"]["backfill"]["requests"] == 2
+        assert report["lanes"]["batch"] == 2
+
+    def test_timeouts(self):
+        pto = AsyncPestoAPI(connect_timeout=3, read_timeout=30)
+        assert pto.request_timeout == 30
+        assert pto.connect_timeout == 3
+
+    def test_concurrency_limit(self):
+        state = {"active": 0, "peak": 0}
+
+        async def ping(request):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.01)
+            state["active"] -= 1
+            return web.json_response({"reaction": "It works!"})
+
+        async def fan_out(pto, server):
+            return await asyncio.gather(*(pto.ping() for _ in range(20)))
+
+        responses = run_with_server(
+            [web.get("/v2/ping", ping)], fan_out, max_concurrency=3
+        )
+        assert len(responses) == 20
+        assert state["peak"] <= 3
+
+    def test_stream_asset_platform_by_id(self):
+        tokens = [{"address": "0x{0:040x}".format(i)} for i in range(500)]
+
+        async def token_list(request):
+            return web.json_response({"name": "Pesto", "tokens": tokens})
+
+        async def stream(pto, server):
+            return [
+                token async for token in pto.stream_asset_platform_by_id("ethereum")
+            ]
+
+        streamed = run_with_server(
+            [web.get("/v2/token_lists/ethereum/all.json", token_list)],
+            stream,
+            stream_chunk_size=1000,
+        )
+        assert streamed == tokens
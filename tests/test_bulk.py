@@ -0,0 +1,63 @@
+import time
+
+import responses
+
+from pypestoai import PestoAPI
+from pypestoai.bulk import bulk
+
+
+class TestBulk:
+    def test_ordered_results(self):
+        def slow_square(x):
+            time.sleep(0.01 * (5 - x))
+            return x * x
+
+        results = list(bulk(slow_square, range(5), max_workers=5))
+        assert [r.result for r in results] == [0, 1, 4, 9, 16]
+        assert [r.index for r in results] == [0, 1, 2, 3, 4]
+
+    def test_as_completed(self):
+        def slow_square(x):
+            time.sleep(0.02 * (3 - x))
+            return x * x
+
+        results = list(bulk(slow_square, range(3), max_workers=3, ordered=False))
+        assert [r.result for r in results] == [4, 1, 0]
+
+    def test_errors_do_not_abort(self):
+        def parse(value):
+            return int(value)
+
+        results = list(bulk(parse, [["1"], ("x",), {"value": "3"}]))
+        assert [r.ok for r in results] == [True, False, True]
+        assert isinstance(results[1].error, ValueError)
+        assert results[2].result == 3
+
+
+class TestBulkClient:
+    @responses.activate
+    def test_bulk_get_coin_by_id(self):
+        for id in ("bitcoin", "ethereum"):
+            responses.add(
+                responses.GET,
+                "https://api.pestoai.fun/v2/coins/{0}/".format(id),
+                json={"id": id},
+                status=200,
+            )
+        responses.add(
+            responses.GET, "https://api.pestoai.fun/v2/coins/unknown/", status=404
+        )
+        pto = PestoAPI()
+
+        results = list(
+            pto.bulk(
+                pto.get_coin_by_id,
+                [{"id": id} for id in ("bitcoin", "unknown", "ethereum")],
+                max_workers=4,
+            )
+        )
+
+        ## Assert
+        assert results[0].result == {"id": "bitcoin"}
+        assert results[1].error.status_code == 404
+        assert results[2].result == {"id": "ethereum"}
@@ -0,0 +1,174 @@
+import multiprocessing
+import time
+
+import pytest
+import responses
+
+from pypestoai import PestoAPI
+from pypestoai.cache import ResponseCache, SQLiteCache
+from pypestoai.endpoints import ENDPOINTS_BY_PATH
+
+
+def _fill_cache(path, key, value):
+    SQLiteCache(path).set(key, value, 60)
+
+
+class TestSQLiteCache:
+    def test_get_set(self, tmp_path):
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite"))
+        assert cache.get("a") is None
+        cache.set("a", b"[1]", 60)
+        cache.set("a", b"[1, 2]", 60)
+
+        ## Assert
+        assert cache.get("a") == b"[1, 2]"
+        assert len(cache) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["bytes"] == len("a") + len(b"[1, 2]")
+
+    def test_responses_are_compressed(self, tmp_path):
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite"))
+        value = b'{"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}' * 1000
+        cache.set("coins", value, 60)
+
+        ## Assert
+        assert cache.get("coins") == value
+        assert cache.stats()["bytes"] < len(value) / 10
+
+    def test_expiry(self, tmp_path):
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite"))
+        cache.set("a", b"[1]", 0.01)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+
+    def test_eviction(self, tmp_path):
+        cache = SQLiteCache(
+            str(tmp_path / "cache.sqlite"), compress_level=0, max_bytes=30
+        )
+        cache.set("a", b"0123456789", 60)
+        cache.set("b", b"0123456789", 10)
+        cache.set("c", b"0123456789", 60)
+
+        ## Assert
+        assert cache.get("b") is None
+        assert cache.get("a") == b"0123456789"
+        assert cache.get("c") == b"0123456789"
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] == 22
+
+    def test_clear(self, tmp_path):
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite"))
+        cache.set("a", b"[1]", 60)
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["bytes"] == 0
+
+    @pytest.mark.skipif(
+        "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+    )
+    def test_shared_between_processes(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        cache = SQLiteCache(path)
+        assert cache.get("a") is None
+
+        process = multiprocessing.get_context("fork").Process(
+            target=_fill_cache, args=(path, "a", b"[1]")
+        )
+        process.start()
+        process.join()
+
+        ## Assert
+        assert process.exitcode == 0
+        assert cache.get("a") == b"[1]"
+
+
+class TestCachedClient:
+    @responses.activate
+    def test_reference_data_is_cached(self):
+        coins_json_sample = [{"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}]
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/list",
+            json=coins_json_sample,
+            status=200,
+        )
+        pto = PestoAPI(cache=True)
+
+        assert pto.get_coins_list() == coins_json_sample
+        assert pto.get_coins_list() == coins_json_sample
+        assert len(responses.calls) == 1
+        assert pto.cache.stats()["hits"] == 1
+
+    @responses.activate
+    def test_params_are_part_of_the_key(self):
+        responses.add(
+            responses.GET, "https://api.pestoai.fun/v2/coins/list", json=[], status=200
+        )
+        pto = PestoAPI(cache=True)
+
+        pto.get_coins_list(include_platform=True, status="active")
+        pto.get_coins_list(status="active", include_platform=True)
+        pto.get_coins_list()
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_endpoints_without_ttl_are_not_cached(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/simple/price?ids=bitcoin&vs_currencies=usd",
+            json={"bitcoin": {"usd": 7984.89}},
+            status=200,
+        )
+        pto = PestoAPI(cache=True)
+
+        pto.get_price("bitcoin", "usd")
+        pto.get_price("bitcoin", "usd")
+        assert len(responses.calls) == 2
+        assert pto.cache.stats()["misses"] == 0
+
+    @responses.activate
+    def test_errors_are_not_cached(self):
+        responses.add(
+            responses.GET, "https://api.pestoai.fun/v2/coins/list", status=500
+        )
+        pto = PestoAPI(cache=True, retries=0)
+
+        for _ in range(2):
+            try:
+                pto.get_coins_list()
+            except Exception:
+                pass
+        assert len(responses.calls) == 2
+        assert len(pto.cache) == 0
+
+    @responses.activate
+    def test_custom_cache_instance(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/markets?vs_currency=usd",
+            json=[],
+            status=200,
+        )
+        cache = ResponseCache(ttls={"coins/markets": 60})
+        pto = PestoAPI(cache=cache)
+
+        pto.get_coins_markets("usd")
+        pto.get_coins_markets("usd")
+        assert pto.cache is cache
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_sqlite_cache_is_shared_between_clients(self, tmp_path):
+        coins_json_sample = [{"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}]
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/list",
+            json=coins_json_sample,
+            status=200,
+        )
+        path = str(tmp_path / "cache.sqlite")
+
+        assert PestoAPI(cache=SQLiteCache(path)).get_coins_list() == coins_json_sample
+        assert PestoAPI(cache=SQLiteCache(path)).get_coins_list() == coins_json_sample
+        assert len(responses.calls) == 1
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+import requests
+import responses
+
+from pypestoai import CircuitOpenError, PestoAPI, ServerError
+from pypestoai.circuit import CircuitBreaker
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3)
+        breaker.failure("ping")
+        breaker.failure("ping")
+        breaker.success("ping")
+        breaker.failure("ping")
+        breaker.failure("ping")
+        breaker.before("ping")
+        breaker.failure("ping")
+
+        ## Assert
+        assert breaker.state("ping") == "open"
+        assert breaker.state("coins/list") == "closed"
+        with pytest.raises(CircuitOpenError) as exc:
+            breaker.before("ping")
+        assert exc.value.endpoint == "ping"
+        assert 0 < exc.value.retry_after <= 30
+        breaker.before("coins/list")
+
+    def test_half_open_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01)
+        breaker.failure("ping")
+        time.sleep(0.02)
+
+        breaker.before("ping")
+        assert breaker.state("ping") == "half_open"
+        # only one probe at a time
+        with pytest.raises(CircuitOpenError):
+            breaker.before("ping")
+        breaker.failure("ping")
+        assert breaker.state("ping") == "open"
+
+        time.sleep(0.02)
+        breaker.before("ping")
+        breaker.success("ping")
+
+        ## Assert
+        assert breaker.state("ping") == "closed"
+
+    def test_reset(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.failure("ping")
+        breaker.reset()
+        assert breaker.state("ping") == "closed"
+
+
+class TestCircuitBreakerClient:
+    @responses.activate
+    def test_fails_fast_once_open(self):
+        responses.add(responses.GET, "https://api.pestoai.fun/v2/ping", status=500)
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/list",
+            json=[],
+            status=200,
+        )
+        pto = PestoAPI(retries=0, circuit_breaker=CircuitBreaker(failure_threshold=2))
+
+        for _ in range(2):
+            with pytest.raises(ServerError):
+                pto.ping()
+
+        ## Assert
+        with pytest.raises(CircuitOpenError):
+            pto.ping()
+        assert isinstance(CircuitOpenError("ping", 1), requests.RequestException)
+        assert len(responses.calls) == 2
+        assert pto.get_coins_list() == []
+
+    @responses.activate
+    def test_client_errors_do_not_count(self):
+        responses.add(responses.GET, "https://api.pestoai.fun/v2/ping", status=404)
+        pto = PestoAPI(circuit_breaker=CircuitBreaker(failure_threshold=1))
+
+        with pytest.raises(Exception):
+            pto.ping()
+
+        ## Assert
+        assert pto.circuit_breaker.state("ping") == "closed"
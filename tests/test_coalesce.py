@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+
+import responses
+
+from pypestoai import PestoAPI
+from pypestoai.coalesce import AsyncSingleFlight, SingleFlight
+
+
+def run_concurrently(fn, count):
+    results = [None] * count
+    errors = [None] * count
+
+    def worker(i):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_share_one_result(self):
+        flight = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.05)
+            return {"bitcoin": {"usd": 1.0}}
+
+        results, _ = run_concurrently(lambda: flight.do("key", slow), 8)
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.shared == 7
+
+    def test_exception_is_shared(self):
+        flight = SingleFlight()
+
+        def failing():
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        _, errors = run_concurrently(lambda: flight.do("key", failing), 4)
+        assert all(isinstance(error, ValueError) for error in errors)
+
+    def test_sequential_calls_are_not_shared(self):
+        flight = SingleFlight()
+        assert flight.do("key", lambda: 1) == 1
+        assert flight.do("key", lambda: 2) == 2
+
+    def test_async(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 42
+
+        async def main():
+            return await asyncio.gather(*(flight.do("key", slow) for _ in range(5)))
+
+        assert asyncio.run(main()) == [42] * 5
+        assert len(calls) == 1
+
+
+class TestCoalescingClient:
+    @responses.activate
+    def test_identical_requests_are_coalesced(self):
+        def callback(request):
+            time.sleep(0.05)
+            return 200, {}, '{"bitcoin": {"usd": 7984.89}}'
+
+        responses.add_callback(
+            responses.GET,
+            "https://api.pestoai.fun/v2/simple/price",
+            callback=callback,
+        )
+        pto = PestoAPI(coalesce=True)
+
+        results, _ = run_concurrently(lambda: pto.get_price("bitcoin", "usd"), 6)
+
+        ## Assert
+        assert len(responses.calls) == 1
+        assert results == [{"bitcoin": {"usd": 7984.89}}] * 6
@@ -0,0 +1,95 @@
+import responses
+from responses import matchers
+
+from pypestoai import PestoAPI
+from pypestoai.conditional import ValidatorStore
+
+
+class TestValidatorStore:
+    def test_responses_without_validators_are_not_stored(self):
+        store = ValidatorStore()
+        store.store("a", {}, [1])
+        store.store("b", {"ETag": '"x"', "Cache-Control": "no-store"}, [1])
+        assert len(store) == 0
+
+    def test_lru_bound(self):
+        store = ValidatorStore(max_entries=2)
+        for key in "abc":
+            store.store(key, {"ETag": '"x"'}, [1])
+        assert store.get("a") is None
+        assert store.get("c").request_headers() == {"If-None-Match": '"x"'}
+
+    def test_max_age(self):
+        store = ValidatorStore()
+        store.store("a", {"Cache-Control": "public, max-age=60"}, [1])
+        assert store.get("a").is_fresh()
+
+
+class TestConditionalClient:
+    @responses.activate
+    def test_not_modified_returns_stored_body(self):
+        rates = {"rates": {"btc": {"value": 1.0}}}
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/exchange_rates",
+            json=rates,
+            status=200,
+            headers={"ETag": '"v1"', "Last-Modified": "Wed, 01 May 2024 00:00:00 GMT"},
+        )
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/exchange_rates",
+            status=304,
+            match=[
+                matchers.header_matcher(
+                    {
+                        "If-None-Match": '"v1"',
+                        "If-Modified-Since": "Wed, 01 May 2024 00:00:00 GMT",
+                    }
+                )
+            ],
+        )
+        pto = PestoAPI(conditional_requests=True)
+
+        first = pto.get_exchange_rates()
+        second = pto.get_exchange_rates()
+
+        ## Assert
+        assert first == rates
+        assert second is first
+        assert len(responses.calls) == 2
+        assert pto.validators.not_modified == 1
+
+    @responses.activate
+    def test_fresh_response_skips_the_request(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/search/trending",
+            json={"coins": []},
+            status=200,
+            headers={"Cache-Control": "public, max-age=30"},
+        )
+        pto = PestoAPI(conditional_requests=True)
+
+        pto.get_search_trending()
+        pto.get_search_trending()
+
+        ## Assert
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_get_global_revalidated(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/global",
+            json={"data": {"markets": 197}},
+            status=200,
+            headers={"ETag": '"v1"'},
+        )
+        responses.add(responses.GET, "https://api.pestoai.fun/v2/global", status=304)
+        pto = PestoAPI(conditional_requests=True)
+
+        pto.get_global()
+
+        ## Assert
+        assert pto.get_global() == {"markets": 197}
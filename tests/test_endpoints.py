@@ -0,0 +1,107 @@
+import inspect
+
+import pytest
+import responses
+
+from pypestoai import AsyncPestoAPI, PestoAPI
+from pypestoai.cache import ResponseCache
+from pypestoai.endpoints import ENDPOINTS, ENDPOINTS_BY_NAME, ENDPOINTS_BY_PATH
+
+
+class TestEndpointRegistry:
+    def test_every_endpoint_has_a_method_on_both_clients(self):
+        for endpoint in ENDPOINTS:
+            method = getattr(PestoAPI, endpoint.name)
+            async_method = getattr(AsyncPestoAPI, endpoint.name)
+
+            ## Assert
+            assert list(inspect.signature(method).parameters) == [
+                "self",
+                *endpoint.params,
+                "kwargs",
+            ]
+            assert method.__doc__ == endpoint.doc
+            assert inspect.iscoroutinefunction(async_method)
+        assert len(ENDPOINTS_BY_PATH) == len(ENDPOINTS)
+
+    def test_iter_and_stream_methods(self):
+        ## Assert
+        assert str(inspect.signature(PestoAPI.iter_coins_markets)) == (
+            "(self, vs_currency, per_page=250, page=1, prefetch=True, **kwargs)"
+        )
+        assert str(inspect.signature(PestoAPI.iter_exchanges_tickers_by_id)) == (
+            "(self, id, page=1, prefetch=True, **kwargs)"
+        )
+        assert str(inspect.signature(PestoAPI.stream_asset_platform_by_id)) == (
+            "(self, asset_platform_id, **kwargs)"
+        )
+        assert not hasattr(PestoAPI, "stream_coins_markets")
+
+    def test_bind(self):
+        endpoint = ENDPOINTS_BY_NAME["get_coin_market_chart_range_by_id"]
+
+        path, params = endpoint.bind(
+            ("bitcoin", "usd"),
+            {"from_timestamp": 1, "to_timestamp": 2, "precision": 2},
+        )
+
+        ## Assert
+        assert path == "coins/bitcoin/market_chart/range"
+        assert params == {"vs_currency": "usd", "from": 1, "to": 2, "precision": 2}
+
+    def test_bind_preprocesses_arguments(self):
+        path, params = ENDPOINTS_BY_NAME["get_price"].bind(
+            (["bitcoin", "ethereum "],),
+            {"vs_currencies": "usd, eur", "include_24hr_vol": True},
+        )
+
+        ## Assert
+        assert path == "simple/price"
+        assert params == {
+            "ids": "bitcoin,ethereum",
+            "vs_currencies": "usd,eur",
+            "include_24hr_vol": "true",
+        }
+
+    def test_bind_errors(self):
+        endpoint = ENDPOINTS_BY_NAME["get_coin_history_by_id"]
+
+        ## Assert
+        with pytest.raises(TypeError, match="missing required argument: 'date'"):
+            endpoint.bind(("bitcoin",), {})
+        with pytest.raises(TypeError, match="takes 2 positional arguments"):
+            endpoint.bind(("bitcoin", "30-12-2017", "extra"), {})
+
+    def test_cache_ttls_come_from_the_registry(self):
+        endpoint = ENDPOINTS_BY_PATH["coins/categories"]
+        cache = ResponseCache()
+        assert cache.ttl_for("coins/list") == ENDPOINTS_BY_PATH["coins/list"].cache_ttl
+        assert cache.ttl_for(endpoint.path) == 0
+
+        endpoint.cache_ttl = 300
+        try:
+            ## Assert
+            assert cache.ttl_for(endpoint.path) == 300
+        finally:
+            endpoint.cache_ttl = None
+
+    @responses.activate
+    def test_keyword_arguments(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/bitcoin/market_chart/range?vs_currency=usd&from=1&to=2",
+            json={"prices": []},
+            status=200,
+        )
+
+        response = PestoAPI().get_coin_market_chart_range_by_id(
+            id="bitcoin", vs_currency="usd", from_timestamp=1, to_timestamp=2
+        )
+
+        ## Assert
+        assert response == {"prices": []}
+
+    def test_split_requires_splittable_endpoint(self):
+        ## Assert
+        with pytest.raises(ValueError):
+            PestoAPI().get_coins_list(split="daily")
@@ -0,0 +1,223 @@
+import json
+
+import responses
+
+from pypestoai import PestoAPI
+from pypestoai.index import CoinIndex, ContractIndex, normalize_address
+
+COINS = [
+    {"id": "ethereum", "symbol": "eth", "name": "Ethereum"},
+    {"id": "ethereum-wormhole", "symbol": "eth", "name": "Ethereum (Wormhole)"},
+    {"id": "ethena", "symbol": "ena", "name": "Ethena"},
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+]
+
+
+class TestCoinIndex:
+    def test_lookup_by_id_and_symbol(self):
+        index = CoinIndex(COINS)
+
+        ## Assert
+        assert len(index) == 4
+        assert "bitcoin" in index
+        assert index.get("bitcoin")["name"] == "Bitcoin"
+        assert index.get("unknown") is None
+        assert [c["id"] for c in index.by_symbol("ETH")] == [
+            "ethereum",
+            "ethereum-wormhole",
+        ]
+        assert index.by_symbol("xyz") == []
+
+    def test_symbol_candidates_ranked_by_market_cap(self):
+        index = CoinIndex(COINS)
+        index.update_market_caps(
+            [
+                {"id": "ethereum-wormhole", "market_cap": 10.0},
+                {"id": "ethereum", "market_cap": 1000.0},
+            ]
+        )
+        index.update_market_caps([{"id": "ethereum-wormhole", "market_cap": 5000.0}])
+
+        ## Assert
+        assert [c["id"] for c in index.by_symbol("eth")] == [
+            "ethereum-wormhole",
+            "ethereum",
+        ]
+
+    def test_prefix_and_fuzzy_search(self):
+        index = CoinIndex(COINS)
+
+        ## Assert
+        assert [c["id"] for c in index.search("eth")] == [
+            "ethena",
+            "ethereum",
+            "ethereum-wormhole",
+        ]
+        assert [c["id"] for c in index.search("ETHER", limit=1)] == ["ethereum"]
+        assert index.search("doge") == []
+        assert index.fuzzy_search("etherium")[0]["id"] == "ethereum"
+        assert index.fuzzy_search("zzzz") == []
+
+    def test_update_replaces_known_id(self):
+        index = CoinIndex(COINS)
+        index.update([{"id": "bitcoin", "symbol": "xbt", "name": "Bitcoin Core"}])
+
+        ## Assert
+        assert len(index) == 4
+        assert index.by_symbol("btc") == []
+        assert index.by_symbol("xbt")[0]["name"] == "Bitcoin Core"
+        assert [c["id"] for c in index.search("bitcoin")] == ["bitcoin"]
+
+    @responses.activate
+    def test_from_api_and_refresh(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/list",
+            json=COINS,
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/markets?vs_currency=usd&per_page=250&page=1",
+            json=[{"id": "ethereum-wormhole", "market_cap": 5000.0}],
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/list/new",
+            body=json.dumps(
+                [
+                    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+                    {"id": "pepe", "symbol": "pepe", "name": "Pepe", "activated_at": 1},
+                ]
+            ),
+            status=200,
+        )
+
+        index = CoinIndex.from_api(PestoAPI(), market_cap_pages=1)
+        added = index.refresh(PestoAPI())
+
+        ## Assert
+        assert index.by_symbol("eth")[0]["id"] == "ethereum-wormhole"
+        assert added == 1
+        assert index.get("pepe")["symbol"] == "pepe"
+        assert len(index) == 5
+
+
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+SOL_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+COINS_WITH_PLATFORMS = [
+    {
+        "id": "usd-coin",
+        "symbol": "usdc",
+        "name": "USDC",
+        "platforms": {"ethereum": USDC.lower(), "solana": SOL_MINT},
+    },
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "platforms": {}},
+    {"id": "weird", "symbol": "w", "name": "Weird", "platforms": {"": ""}},
+]
+
+ETHEREUM_TOKENS = {
+    "tokens": [
+        {"chainId": 1, "address": USDC, "symbol": "USDC", "decimals": 6},
+        {
+            "chainId": 1,
+            "address": "0x00000000000000000000000000000000000000AA",
+            "symbol": "NEW",
+            "name": "New",
+            "decimals": 18,
+        },
+    ]
+}
+
+
+class TestContractIndex:
+    def test_normalize_address(self):
+        ## Assert
+        assert normalize_address(" " + USDC) == USDC.lower()
+        assert normalize_address("0X" + USDC[2:]) == USDC.lower()
+        assert normalize_address(SOL_MINT) == SOL_MINT
+
+    def test_lookup_is_case_insensitive_for_evm_only(self):
+        index = ContractIndex()
+        index.add_coins(COINS_WITH_PLATFORMS)
+        index.add_tokens("ethereum", ETHEREUM_TOKENS["tokens"])
+
+        usdc = index.lookup(USDC.upper().replace("0X", "0x"), "ethereum")
+
+        ## Assert
+        assert len(index) == 3
+        assert usdc.coin_id == "usd-coin"
+        assert usdc.name == "USDC"
+        assert usdc.decimals == 6
+        assert index.lookup(SOL_MINT, "solana").coin_id == "usd-coin"
+        assert index.lookup(SOL_MINT.lower()) == []
+        assert index.lookup(USDC, "polygon-pos") is None
+        assert (
+            index.lookup("0x00000000000000000000000000000000000000aa")[0].coin_id
+            is None
+        )
+
+    def test_batch_lookup(self):
+        index = ContractIndex()
+        index.add_coins(COINS_WITH_PLATFORMS)
+        addresses = [USDC, SOL_MINT, "0xdead"]
+
+        ## Assert
+        assert index.coin_ids(addresses) == {USDC: "usd-coin", SOL_MINT: "usd-coin"}
+        assert index.coin_ids(addresses, platform="solana") == {SOL_MINT: "usd-coin"}
+        assert index.lookup_many(addresses, platform="ethereum")["0xdead"] is None
+
+    def test_save_and_load(self, tmp_path):
+        index = ContractIndex()
+        index.add_coins(COINS_WITH_PLATFORMS)
+        index.add_tokens("ethereum", ETHEREUM_TOKENS["tokens"])
+        path = str(tmp_path / "contracts.json.gz")
+
+        index.save(path)
+        loaded = ContractIndex.load(path)
+
+        ## Assert
+        assert len(loaded) == len(index)
+        assert loaded.lookup(USDC, "ethereum") == index.lookup(USDC, "ethereum")
+        assert loaded.lookup(SOL_MINT) == index.lookup(SOL_MINT)
+
+    @responses.activate
+    def test_from_api(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/list?include_platform=true",
+            json=COINS_WITH_PLATFORMS,
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/asset_platforms",
+            json=[{"id": "ethereum"}, {"id": "solana"}],
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/token_lists/ethereum/all.json",
+            json=ETHEREUM_TOKENS,
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/token_lists/solana/all.json",
+            json={"error": "not found"},
+            status=404,
+        )
+
+        index = ContractIndex.from_api(PestoAPI())
+
+        ## Assert
+        assert index.lookup(USDC, "ethereum").decimals == 6
+        assert (
+            index.lookup(
+                "0x00000000000000000000000000000000000000AA", "ethereum"
+            ).symbol
+            == "NEW"
+        )
+        assert index.lookup(SOL_MINT, "solana").coin_id == "usd-coin"
@@ -0,0 +1,86 @@
+import responses
+
+from pypestoai import PestoAPI
+from pypestoai.metrics import InMemoryMetrics, RequestSample
+
+
+def sample(endpoint="coins/list", status_code=200, latency=0.1, cache_hit=False):
+    return RequestSample(endpoint, status_code, latency, 1, 100, 0.01, cache_hit)
+
+
+class TestInMemoryMetrics:
+    def test_snapshot(self):
+        metrics = InMemoryMetrics()
+        for latency in (0.1, 0.2, 0.3, 0.4):
+            metrics.record(sample(latency=latency))
+        metrics.record(sample(status_code=None, latency=5.0))
+        metrics.record(sample(cache_hit=True))
+
+        stats = metrics.snapshot()["coins/list"]
+        assert stats["requests"] == 5
+        assert stats["statuses"] == {200: 4, None: 1}
+        assert stats["latency"]["p50"] == 0.3
+        assert stats["latency"]["max"] == 5.0
+        assert stats["retries"] == 5
+        assert stats["bytes_received"] == 500
+        assert stats["cache_hits"] == 1
+
+    def test_to_prometheus(self):
+        metrics = InMemoryMetrics()
+        metrics.record(sample(endpoint="coins/{id}/", latency=0.02))
+        metrics.record(sample(endpoint="coins/{id}/", status_code=404, latency=0.3))
+
+        text = metrics.to_prometheus()
+        assert 'pesto_requests_total{endpoint="coins/{id}/",status="200"} 1' in text
+        assert 'pesto_requests_total{endpoint="coins/{id}/",status="404"} 1' in text
+        assert (
+            'pesto_request_duration_seconds_bucket{endpoint="coins/{id}/",le="0.025"} 1'
+            in text
+        )
+        assert (
+            'pesto_request_duration_seconds_bucket{endpoint="coins/{id}/",le="+Inf"} 2'
+            in text
+        )
+        assert 'pesto_request_duration_seconds_count{endpoint="coins/{id}/"} 2' in text
+        assert "# TYPE pesto_request_duration_seconds histogram" in text
+
+
+class TestInstrumentedClient:
+    @responses.activate
+    def test_requests_are_recorded_per_endpoint(self):
+        for id, status in (("bitcoin", 200), ("ethereum", 200), ("unknown", 404)):
+            responses.add(
+                responses.GET,
+                "https://api.pestoai.fun/v2/coins/{0}/".format(id),
+                json={"id": id},
+                status=status,
+            )
+        pto = PestoAPI(metrics=True)
+
+        pto.get_coin_by_id("bitcoin")
+        pto.get_coin_by_id("ethereum")
+        try:
+            pto.get_coin_by_id("unknown")
+        except ValueError:
+            pass
+
+        ## Assert
+        stats = pto.metrics.snapshot()
+        assert list(stats) == ["coins/{id}/"]
+        assert stats["coins/{id}/"]["statuses"] == {200: 2, 404: 1}
+        assert stats["coins/{id}/"]["bytes_received"] > 0
+
+    @responses.activate
+    def test_cache_hits_are_recorded(self):
+        responses.add(
+            responses.GET, "https://api.pestoai.fun/v2/coins/list", json=[], status=200
+        )
+        pto = PestoAPI(cache=True, metrics=True)
+
+        pto.get_coins_list()
+        pto.get_coins_list()
+
+        ## Assert
+        stats = pto.metrics.snapshot()["coins/list"]
+        assert stats["requests"] == 1
+        assert stats["cache_hits"] == 1
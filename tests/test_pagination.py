@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+import responses
+
+from pypestoai import PestoAPI
+from pypestoai.pagination import paginate, paginate_async
+
+
+def make_fetch(pages):
+    calls = []
+
+    def fetch_page(page):
+        calls.append(page)
+        return pages.get(page, [])
+
+    return fetch_page, calls
+
+
+class TestPaginate:
+    def test_stops_on_short_page(self):
+        fetch_page, calls = make_fetch({1: [1, 2], 2: [3, 4], 3: [5]})
+        assert list(paginate(fetch_page, 2)) == [1, 2, 3, 4, 5]
+        assert calls == [1, 2, 3]
+
+    def test_stops_on_empty_page(self):
+        fetch_page, calls = make_fetch({1: [1, 2], 2: [3, 4]})
+        assert list(paginate(fetch_page, 2, prefetch=False)) == [1, 2, 3, 4]
+        assert calls == [1, 2, 3]
+
+    def test_records_key(self):
+        fetch_page, _ = make_fetch(
+            {1: {"name": "x", "tickers": [1, 2]}, 2: {"name": "x", "tickers": [3]}}
+        )
+        assert list(paginate(fetch_page, 2, key="tickers")) == [1, 2, 3]
+
+    def test_prefetches_next_page(self):
+        fetched = threading.Event()
+
+        def fetch_page(page):
+            if page == 2:
+                fetched.set()
+                return []
+            return [1, 2]
+
+        records = paginate(fetch_page, 2)
+        assert next(records) == 1
+        # page 2 is requested while the caller is still on page 1
+        assert fetched.wait(1)
+        assert list(records) == [2]
+
+    def test_async(self):
+        async def fetch_page(page):
+            return {1: [1, 2], 2: [3]}.get(page, [])
+
+        async def collect():
+            return [record async for record in paginate_async(fetch_page, 2)]
+
+        assert asyncio.run(collect()) == [1, 2, 3]
+
+
+class TestPaginatedClient:
+    @responses.activate
+    def test_iter_coins_markets(self):
+        for page, rows in ((1, [{"id": "bitcoin"}, {"id": "ethereum"}]), (2, [])):
+            responses.add(
+                responses.GET,
+                "https://api.pestoai.fun/v2/coins/markets?vs_currency=usd&per_page=2&page={0}".format(
+                    page
+                ),
+                json=rows,
+                status=200,
+            )
+
+        records = list(PestoAPI().iter_coins_markets("usd", per_page=2))
+        assert records == [{"id": "bitcoin"}, {"id": "ethereum"}]
+
+    @responses.activate
+    def test_iter_exchanges_tickers_by_id(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/exchanges/binance/tickers?page=1",
+            json={"name": "Binance", "tickers": [{"base": "BTC"}]},
+            status=200,
+        )
+
+        records = list(PestoAPI().iter_exchanges_tickers_by_id("binance"))
+        assert records == [{"base": "BTC"}]
+        assert len(responses.calls) == 1
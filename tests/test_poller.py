@@ -0,0 +1,112 @@
+import threading
+
+import responses
+from responses import matchers
+
+from pypestoai import PestoAPI
+from pypestoai.poller import PricePoller
+
+PRICE_URL = "https://api.pestoai.fun/v2/simple/price"
+
+
+def add_prices(body, ids="bitcoin,ethereum", vs_currencies="eur,usd"):
+    responses.add(
+        responses.GET,
+        PRICE_URL,
+        json=body,
+        status=200,
+        match=[
+            matchers.query_param_matcher(
+                {
+                    "ids": ids,
+                    "vs_currencies": vs_currencies,
+                    "include_last_updated_at": "true",
+                }
+            )
+        ],
+    )
+
+
+class TestPricePoller:
+    @responses.activate
+    def test_subscriptions_share_one_request_and_get_only_changes(self):
+        add_prices(
+            {
+                "bitcoin": {"usd": 100, "eur": 90, "last_updated_at": 1},
+                "ethereum": {"usd": 10, "eur": 9, "last_updated_at": 1},
+            }
+        )
+        add_prices(
+            {
+                "bitcoin": {"usd": 100, "eur": 91, "last_updated_at": 2},
+                "ethereum": {"usd": 10, "eur": 9, "last_updated_at": 1},
+            }
+        )
+        btc_usd, all_eur = [], []
+        poller = PricePoller(PestoAPI())
+        poller.subscribe("bitcoin", "usd", btc_usd.append)
+        poller.subscribe(["bitcoin", "ethereum"], ["eur"], all_eur.append)
+
+        first = poller.poll_once()
+        second = poller.poll_once()
+
+        ## Assert
+        assert first is True and second is True
+        assert len(responses.calls) == 2
+        assert btc_usd == [
+            {"bitcoin": {"usd": 100, "last_updated_at": 1}},
+            {"bitcoin": {"usd": 100, "last_updated_at": 2}},
+        ]
+        assert all_eur == [
+            {
+                "bitcoin": {"eur": 90, "last_updated_at": 1},
+                "ethereum": {"eur": 9, "last_updated_at": 1},
+            },
+            {"bitcoin": {"eur": 91, "last_updated_at": 2}},
+        ]
+
+    @responses.activate
+    def test_unchanged_poll_does_not_notify(self):
+        body = {"bitcoin": {"usd": 100, "last_updated_at": 1}}
+        add_prices(body, ids="bitcoin", vs_currencies="usd")
+        add_prices(body, ids="bitcoin", vs_currencies="usd")
+        received = []
+        poller = PricePoller(PestoAPI())
+        subscription = poller.subscribe("bitcoin", "usd", received.append)
+
+        ## Assert
+        assert poller.poll_once() is True
+        assert poller.poll_once() is False
+        assert len(received) == 1
+        poller.unsubscribe(subscription)
+        assert poller.poll_once() is False
+        assert poller.polls == 2
+
+    @responses.activate
+    def test_background_thread_backs_off_and_reports_errors(self):
+        responses.add(responses.GET, PRICE_URL, json={"error": "bad"}, status=400)
+        errors = []
+        polled = threading.Event()
+
+        def on_error(e):
+            errors.append(e)
+            polled.set()
+
+        poller = PricePoller(
+            PestoAPI(),
+            min_interval=0.01,
+            max_interval=0.04,
+            backoff=2,
+            on_error=on_error,
+        )
+        poller.subscribe("bitcoin", "usd", lambda changes: None)
+        with poller:
+            assert polled.wait(5)
+            while poller.interval < 0.04:
+                polled.clear()
+                assert polled.wait(5)
+
+        ## Assert
+        assert errors[0].status_code == 400
+        assert poller.interval == 0.04
+        assert poller._thread is None
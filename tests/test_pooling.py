@@ -0,0 +1,54 @@
+import threading
+
+import responses
+
+from pypestoai import PestoAPI
+
+
+class TestConnectionPooling:
+    def test_pool_options(self):
+        pto = PestoAPI(pool_maxsize=32, pool_block=True)
+        adapter = pto.session.get_adapter("https://api.pestoai.fun/v2/ping")
+        assert adapter._pool_maxsize == 32
+        assert adapter._pool_block is True
+
+    def test_timeouts(self):
+        assert PestoAPI().request_timeout == 120
+        assert PestoAPI(connect_timeout=3, read_timeout=30).request_timeout == (3, 30)
+
+    def test_keep_alive_disabled(self):
+        assert PestoAPI(keep_alive=False).session.headers["Connection"] == "close"
+
+    def test_shared_session(self):
+        pto = PestoAPI()
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(pto.session))
+        thread.start()
+        thread.join()
+        assert sessions[0] is pto.session
+
+    def test_per_thread_session(self):
+        pto = PestoAPI(per_thread_session=True)
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(pto.session))
+        thread.start()
+        thread.join()
+        assert sessions[0] is not pto.session
+        assert pto.session is pto.session
+
+    @responses.activate
+    def test_warm_up(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/ping",
+            json={"reaction": "It works!"},
+            status=200,
+        )
+        assert PestoAPI(demo_api_key="key").warm_up(4) == 4
+        assert len(responses.calls) == 4
+        assert responses.calls[0].request.headers["x-demo-api-key"] == "key"
+
+    @responses.activate
+    def test_warm_up_without_connections(self):
+        assert PestoAPI().warm_up(0) == 0
+        assert len(responses.calls) == 0
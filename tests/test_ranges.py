@@ -0,0 +1,87 @@
+import json
+
+import pytest
+import responses
+
+from pypestoai import PestoAPI
+from pypestoai.ranges import merge_series, range_batches, split_range, window_size
+
+DAY = 24 * 60 * 60
+
+
+class TestRanges:
+    def test_split_range(self):
+        assert split_range(0, 10, 4) == [(0, 4), (4, 8), (8, 10)]
+        assert split_range("0", "3", 4) == [(0, 3)]
+
+    def test_window_size(self):
+        assert window_size("hourly") == 90 * DAY
+        assert window_size(3600) == 3600
+        assert window_size("3600") == 3600
+        with pytest.raises(ValueError):
+            window_size("weekly")
+
+    @pytest.mark.parametrize("split", [True, "0", 0, 0.5, -3600, "-3600", None])
+    def test_invalid_window_size(self, split):
+        with pytest.raises(ValueError):
+            window_size(split)
+
+    def test_range_batches_rejects_invalid_split(self):
+        with pytest.raises(ValueError):
+            range_batches({"from": 0, "to": 30 * DAY}, True)
+        with pytest.raises(ValueError):
+            range_batches({"from": 0, "to": 30 * DAY}, "0")
+
+    def test_merge_series_deduplicates_boundaries(self):
+        merged = merge_series(
+            [
+                {"prices": [[1, 1.0], [2, 2.0]], "total_volumes": [[1, 5.0]]},
+                {"prices": [[2, 2.5], [3, 3.0]], "total_volumes": [[3, 6.0]]},
+            ]
+        )
+        assert merged == {
+            "prices": [[1, 1.0], [2, 2.5], [3, 3.0]],
+            "total_volumes": [[1, 5.0], [3, 6.0]],
+        }
+
+    def test_merge_series_of_lists(self):
+        assert merge_series([[[2, "b"]], [[1, "a"], [2, "b"]]]) == [[1, "a"], [2, "b"]]
+
+
+class TestSplitClient:
+    @responses.activate
+    def test_market_chart_range_split_hourly(self):
+        requested = []
+
+        def callback(request):
+            start, end = int(request.params["from"]), int(request.params["to"])
+            requested.append((start, end))
+            body = {"prices": [[start * 1000, 1.0], [end * 1000, 2.0]]}
+            return 200, {}, json.dumps(body)
+
+        responses.add_callback(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/bitcoin/market_chart/range",
+            callback=callback,
+        )
+
+        chart = PestoAPI().get_coin_market_chart_range_by_id(
+            "bitcoin", "usd", 0, 200 * DAY, split="hourly"
+        )
+
+        ## Assert
+        assert sorted(requested) == [
+            (0, 90 * DAY),
+            (90 * DAY, 180 * DAY),
+            (180 * DAY, 200 * DAY),
+        ]
+        assert [p[0] for p in chart["prices"]] == [
+            0,
+            90 * DAY * 1000,
+            180 * DAY * 1000,
+            200 * DAY * 1000,
+        ]
+
+    def test_split_requires_range_endpoint(self):
+        with pytest.raises(ValueError):
+            PestoAPI().get_coin_market_chart_by_id("bitcoin", "usd", 1, split="hourly")
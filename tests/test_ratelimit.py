@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+import responses
+
+from pypestoai import PestoAPI
+from pypestoai.ratelimit import RateLimiter
+
+
+class TestRateLimiter:
+    def test_burst_then_spacing(self):
+        limiter = RateLimiter(600, burst=2)
+        assert limiter.reserve() == 0
+        assert limiter.reserve() == 0
+        assert limiter.reserve() == pytest.approx(0.1, abs=0.01)
+        assert limiter.reserve() == pytest.approx(0.2, abs=0.01)
+
+    def test_shared_between_threads(self):
+        limiter = RateLimiter(1200)
+        start = time.monotonic()
+        threads = [threading.Thread(target=limiter.acquire) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # 1 call immediately, then one every 50ms
+        assert time.monotonic() - start >= 0.24
+
+    def test_from_key(self):
+        limiter = RateLimiter.from_key({"rate_limit_request_per_minute": 500})
+        assert limiter.calls_per_minute == 500
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            RateLimiter(0)
+
+
+class TestRateLimitedClient:
+    @responses.activate
+    def test_requests_are_throttled(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/ping",
+            json={"reaction": "It works!"},
+            status=200,
+        )
+        pto = PestoAPI(rate_limit=1200)
+
+        start = time.monotonic()
+        for _ in range(3):
+            pto.ping()
+        assert time.monotonic() - start >= 0.09
+
+    @responses.activate
+    def test_configure_rate_limit_from_key(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/key",
+            json={"plan": "Analyst", "rate_limit_request_per_minute": 500},
+            status=200,
+        )
+        pto = PestoAPI(api_key="key")
+
+        limiter = pto.configure_rate_limit()
+        assert pto.rate_limiter is limiter
+        assert limiter.calls_per_minute == 500
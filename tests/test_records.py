@@ -0,0 +1,162 @@
+import tracemalloc
+
+import pytest
+import responses
+
+from pypestoai import PestoAPI
+from pypestoai.records import (
+    CoinListEntry,
+    CoinMarketRow,
+    DerivativeTicker,
+    ExchangeTicker,
+    to_records,
+)
+
+MARKET_ROW = {
+    "id": "bitcoin",
+    "symbol": "btc",
+    "name": "Bitcoin",
+    "current_price": 67000.5,
+    "market_cap": 1320000000000,
+    "market_cap_rank": 1,
+    "roi": None,
+    "last_updated": "2024-04-01T00:00:00.000Z",
+    "price_change_percentage_1h_in_currency": 0.1,
+}
+
+
+class TestRecords:
+    def test_fields_and_round_trip(self):
+        row = CoinMarketRow.from_dict(MARKET_ROW)
+
+        ## Assert
+        assert row.id == "bitcoin"
+        assert row.market_cap_rank == 1
+        assert row.ath is None
+        assert row.extra == {"price_change_percentage_1h_in_currency": 0.1}
+        assert row.to_dict() == MARKET_ROW
+        assert row == CoinMarketRow.from_dict(MARKET_ROW)
+        assert not hasattr(row, "__dict__")
+
+    def test_symbols_are_interned(self):
+        symbol = "".join(["bt", "c"])
+        first = CoinListEntry.from_dict({"id": "a", "symbol": symbol, "name": "A"})
+        second = CoinListEntry.from_dict(
+            {"id": "b", "symbol": "btc"[:2] + "c", "name": "B"}
+        )
+
+        ## Assert
+        assert first.symbol is second.symbol
+        assert first.extra is None
+
+    def test_missing_fields_are_left_out_of_to_dict(self):
+        row = {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}
+        entry = CoinListEntry.from_dict(row)
+
+        ## Assert
+        assert entry.platforms is None
+        assert entry.to_dict() == row
+        assert CoinListEntry.from_dict(dict(row, platforms=None)).to_dict() == dict(
+            row, platforms=None
+        )
+        assert entry != CoinListEntry.from_dict(dict(row, platforms=None))
+
+    def test_to_records_under_key(self):
+        response = {"name": "Binance", "tickers": [{"base": "BTC", "target": "USDT"}]}
+
+        records = to_records(response, ExchangeTicker, key="tickers")
+
+        ## Assert
+        assert records["name"] == "Binance"
+        assert records["tickers"][0].base == "BTC"
+        assert isinstance(response["tickers"][0], dict)
+
+    def test_records_use_less_memory_than_dicts(self):
+        full_row = {
+            field: MARKET_ROW.get(field, 1.0) for field in CoinMarketRow._fields
+        }
+        payload = [dict(full_row, id="coin-{0}".format(i)) for i in range(2000)]
+
+        tracemalloc.start()
+        dicts = [dict(row) for row in payload]
+        dict_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        records = [CoinMarketRow.from_dict(row) for row in payload]
+        record_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        ## Assert
+        assert len(dicts) == len(records)
+        assert record_size * 3 < dict_size
+
+
+class TestAsRecords:
+    @responses.activate
+    def test_get_coins_markets_as_records(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/markets?vs_currency=usd",
+            json=[MARKET_ROW],
+            status=200,
+        )
+
+        rows = PestoAPI().get_coins_markets("usd", as_records=True)
+
+        ## Assert
+        assert rows == [CoinMarketRow.from_dict(MARKET_ROW)]
+        assert "as_records" not in responses.calls[0].request.url
+
+    @responses.activate
+    def test_get_exchanges_tickers_by_id_as_records(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/exchanges/binance/tickers",
+            json={"name": "Binance", "tickers": [{"base": "BTC", "last": 1.0}]},
+            status=200,
+        )
+
+        response = PestoAPI().get_exchanges_tickers_by_id("binance", as_records=True)
+
+        ## Assert
+        assert response["tickers"][0].last == 1.0
+
+    @responses.activate
+    def test_stream_derivatives_as_records(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/derivatives",
+            json=[{"market": "Binance (Futures)", "symbol": "BTCUSDT"}],
+            status=200,
+        )
+
+        tickers = list(PestoAPI().stream_derivatives(as_records=True))
+
+        ## Assert
+        assert isinstance(tickers[0], DerivativeTicker)
+        assert tickers[0].symbol == "BTCUSDT"
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_as_records_requires_record_endpoint(self):
+        with pytest.raises(ValueError):
+            PestoAPI().get_exchanges_list(as_records=True)
+        with pytest.raises(ValueError):
+            list(PestoAPI().stream_exchanges_list(as_records=True))
+
+        ## Assert
+        assert len(responses.calls) == 0
+
+    @responses.activate
+    def test_plain_dicts_by_default(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/list",
+            json=[{"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}],
+            status=200,
+        )
+
+        ## Assert
+        assert PestoAPI().get_coins_list() == [
+            {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}
+        ]
@@ -0,0 +1,112 @@
+import time
+
+import pytest
+import responses
+from requests.packages.urllib3.exceptions import MaxRetryError
+from requests.packages.urllib3.response import HTTPResponse
+
+from pypestoai import PestoAPI, RateLimitError, ServerError
+from pypestoai.retry import JitteredRetry, decorrelated_jitter, parse_retry_after
+
+
+def error_response(status, headers=None):
+    return HTTPResponse(body=b"", status=status, headers=headers or {})
+
+
+class TestJitteredRetry:
+    def test_decorrelated_jitter(self):
+        for _ in range(100):
+            assert 0.5 <= decorrelated_jitter(0.0, 0.5, 30) <= 0.5
+            assert 0.5 <= decorrelated_jitter(2.0, 0.5, 30) <= 6.0
+            assert decorrelated_jitter(20.0, 0.5, 30) <= 30
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("12") == 12
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+        future = time.strftime(
+            "%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 60)
+        )
+        assert 55 < parse_retry_after(future) <= 60
+
+    def test_backoff_grows_with_jitter(self):
+        retry = JitteredRetry(total=5, backoff_factor=0.5)
+        assert retry.get_backoff_time() == 0
+
+        retry = retry.increment("GET", "/ping", response=error_response(503))
+        first = retry.get_backoff_time()
+        retry = retry.increment("GET", "/ping", response=error_response(503))
+        second = retry.get_backoff_time()
+
+        ## Assert
+        assert 0.5 <= first <= 1.5
+        assert 0.5 <= second <= first * 3
+        # drawn once per attempt
+        assert retry.get_backoff_time() == second
+
+    def test_rate_limited_responses_are_retried(self):
+        assert JitteredRetry().is_retry("GET", 429)
+        assert JitteredRetry().is_retry("GET", 503)
+        assert not JitteredRetry().is_retry("GET", 404)
+
+    def test_budget(self):
+        retry = JitteredRetry(total=5, budget=10)
+        retry = retry.increment(
+            "GET", "/ping", response=error_response(429, {"Retry-After": "5"})
+        )
+
+        ## Assert
+        with pytest.raises(MaxRetryError):
+            retry.increment(
+                "GET", "/ping", response=error_response(429, {"Retry-After": "30"})
+            )
+
+
+class TestRetriedClient:
+    @responses.activate
+    def test_rate_limited_then_ok(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/ping",
+            status=429,
+            headers={"Retry-After": "0"},
+        )
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/ping",
+            json={"reaction": "It works!"},
+            status=200,
+        )
+
+        ## Assert
+        assert PestoAPI().ping() == {"reaction": "It works!"}
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_exhausted_retries_raise_the_last_error(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/ping",
+            json={"status": {"error_code": 429}},
+            status=429,
+            headers={"Retry-After": "120"},
+        )
+
+        with pytest.raises(RateLimitError) as exc:
+            PestoAPI(retry_budget=60).ping()
+
+        ## Assert
+        assert exc.value.retry_after == 120
+        # a wait longer than the budget is not attempted
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_server_errors(self):
+        responses.add(responses.GET, "https://api.pestoai.fun/v2/ping", status=503)
+
+        with pytest.raises(ServerError):
+            PestoAPI(retries=2).ping()
+
+        ## Assert
+        assert len(responses.calls) == 3
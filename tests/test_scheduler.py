@@ -0,0 +1,168 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+import responses
+
+from pypestoai import CreditBudgetError, PestoAPI
+from pypestoai.scheduler import BATCH, CreditScheduler, next_month
+
+
+class TestCreditScheduler:
+    def test_next_month(self):
+        december = datetime(2023, 12, 15, tzinfo=timezone.utc).timestamp()
+        assert (
+            next_month(december)
+            == datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+        )
+
+    def test_spend_per_tag_and_lane(self):
+        scheduler = CreditScheduler(monthly_credits=1000)
+        scheduler.reserve(1)
+        with scheduler.context("backfill", lane=BATCH):
+            scheduler.reserve(1)
+            scheduler.reserve(2)
+        with scheduler.context("dashboard"):
+            scheduler.reserve(1)
+
+        report = scheduler.report()
+
+        ## Assert
+        assert report["remaining_credits"] == 995
+        assert report["lanes"] == {"interactive": 2, "batch": 3}
+        assert report["tags"]["backfill"]["credits"] == 3
+        assert report["tags"]["backfill"]["requests"] == 2
+        assert report["tags"]["dashboard"]["credits"] == 1
+        assert report["tags"][None]["credits"] == 1
+
+    def test_batch_is_deferred_at_the_reserve(self):
+        scheduler = CreditScheduler(
+            monthly_credits=1000, remaining_credits=101, batch_reserve=0.1
+        )
+        with scheduler.context("backfill", lane=BATCH):
+            scheduler.reserve(1)
+            with pytest.raises(CreditBudgetError) as exc:
+                scheduler.reserve(1)
+        # the reserve is left to interactive requests
+        scheduler.reserve(1)
+
+        ## Assert
+        assert exc.value.tag == "backfill"
+        assert exc.value.remaining_credits == 100
+        assert scheduler.report()["tags"]["backfill"]["deferred"] == 1
+        assert scheduler.remaining_credits == 99
+
+    def test_batch_is_paced_below_the_throttle(self):
+        scheduler = CreditScheduler(
+            monthly_credits=1000,
+            remaining_credits=400,
+            resets_at=time.time() + 300,
+            batch_reserve=0.1,
+            batch_burst=2,
+        )
+        with scheduler.context("backfill", lane=BATCH):
+            delays = [scheduler.reserve(1) for _ in range(4)]
+
+        ## Assert
+        # 300 credits above the reserve over 300s: one credit per second after the burst
+        assert delays[:2] == [0.0, 0.0]
+        assert delays[2] == pytest.approx(1.0, rel=0.05)
+        assert delays[3] == pytest.approx(2.0, rel=0.05)
+        assert scheduler.report()["tags"]["backfill"]["throttled_seconds"] > 2.9
+
+    def test_interactive_requests_roll_the_budget_over(self):
+        scheduler = CreditScheduler(
+            monthly_credits=1000, remaining_credits=5, resets_at=time.time() - 1
+        )
+        scheduler.reserve(1)
+
+        ## Assert
+        assert scheduler.remaining_credits == 999
+        assert scheduler.resets_at > time.time()
+
+    def test_batch_runs_freely_with_budget_left(self):
+        scheduler = CreditScheduler(monthly_credits=1000, batch_burst=1)
+        with scheduler.context(lane=BATCH):
+            assert [scheduler.reserve(1) for _ in range(10)] == [0.0] * 10
+
+    def test_counts_only_without_budget(self):
+        scheduler = CreditScheduler()
+        with scheduler.context("backfill", lane=BATCH):
+            assert scheduler.reserve(1) == 0.0
+        assert scheduler.remaining_credits is None
+        assert scheduler.report()["tags"]["backfill"]["credits"] == 1
+
+    def test_invalid_lane(self):
+        with pytest.raises(ValueError):
+            with CreditScheduler().context(lane="urgent"):
+                pass
+
+
+class TestScheduledClient:
+    @responses.activate
+    def test_configure_credit_budget_from_key(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/key",
+            json={
+                "plan": "Analyst",
+                "rate_limit_request_per_minute": 500,
+                "monthly_call_credit": 500000,
+                "current_total_monthly_calls": 1000,
+                "current_remaining_monthly_calls": 499000,
+            },
+            status=200,
+        )
+        pto = PestoAPI(api_key="key")
+
+        scheduler = pto.configure_credit_budget(batch_reserve=0.2)
+
+        ## Assert
+        assert pto.scheduler is scheduler
+        assert scheduler.monthly_credits == 500000
+        assert scheduler.remaining_credits == 499000
+        assert scheduler.batch_reserve == 0.2
+
+    @responses.activate
+    def test_tags_follow_batched_requests(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/simple/price",
+            json={"bitcoin": {"usd": 1}},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/list",
+            json=[],
+            status=200,
+        )
+        pto = PestoAPI(cache=True, scheduler=True, max_list_length=20)
+        ids = ["coin-{0}".format(i) for i in range(10)]
+
+        with pto.scheduler.context("backfill", lane=BATCH):
+            pto.get_price(ids, "usd")
+            results = list(pto.bulk(pto.get_coins_list, [(), ()]))
+        pto.get_coins_list()
+
+        report = pto.scheduler.report()
+
+        ## Assert
+        assert all(result.ok for result in results)
+        # every request made from the batch workers is charged to the tag; the
+        # last coins list comes from the cache and costs nothing
+        assert len(responses.calls) > 3
+        assert report["tags"]["backfill"]["requests"] == len(responses.calls)
+        assert report["lanes"] == {"interactive": 0, "batch": len(responses.calls)}
+
+    @responses.activate
+    def test_batch_request_deferred(self):
+        pto = PestoAPI(
+            scheduler=CreditScheduler(monthly_credits=100, remaining_credits=10)
+        )
+
+        ## Assert
+        with pytest.raises(CreditBudgetError):
+            with pto.scheduler.context("backfill", lane=BATCH):
+                pto.ping()
+        assert len(responses.calls) == 0
@@ -0,0 +1,117 @@
+import json
+
+import responses
+
+from pypestoai import PestoAPI
+from pypestoai.store import TimeSeriesStore
+
+DAY = 24 * 60 * 60
+
+
+def market_chart_callback(requested):
+    def callback(request):
+        start, end = int(request.params["from"]), int(request.params["to"])
+        requested.append((start, end))
+        timestamps = range(start - start % DAY + DAY, end + 1, DAY)
+        body = {
+            "prices": [[ts * 1000, float(ts // DAY)] for ts in timestamps],
+            "market_caps": [[ts * 1000, 1.0] for ts in timestamps],
+            "total_volumes": [[ts * 1000, 2.0] for ts in timestamps],
+        }
+        return 200, {}, json.dumps(body)
+
+    return callback
+
+
+class TestTimeSeriesStore:
+    @responses.activate
+    def test_only_missing_ranges_are_fetched(self, tmp_path):
+        requested = []
+        responses.add_callback(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/bitcoin/market_chart/range",
+            callback=market_chart_callback(requested),
+        )
+        store = TimeSeriesStore(PestoAPI(), str(tmp_path / "ts.sqlite"))
+
+        first = store.get_coin_market_chart_range_by_id(
+            "bitcoin", "usd", 10 * DAY, 20 * DAY, interval="daily"
+        )
+        second = store.get_coin_market_chart_range_by_id(
+            "bitcoin", "usd", 15 * DAY, 30 * DAY, interval="daily"
+        )
+
+        ## Assert
+        assert requested == [(10 * DAY, 20 * DAY), (20 * DAY, 30 * DAY)]
+        assert [p[0] for p in first["prices"]] == [
+            ts * 1000 for ts in range(11 * DAY, 21 * DAY, DAY)
+        ]
+        assert [p[0] for p in second["prices"]] == [
+            ts * 1000 for ts in range(15 * DAY, 31 * DAY, DAY)
+        ]
+        assert second["prices"][0] == [15 * DAY * 1000, 15.0]
+
+    @responses.activate
+    def test_gaps_between_covered_ranges(self, tmp_path):
+        requested = []
+        responses.add_callback(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/bitcoin/market_chart/range",
+            callback=market_chart_callback(requested),
+        )
+        store = TimeSeriesStore(PestoAPI(), str(tmp_path / "ts.sqlite"))
+
+        store.get_coin_market_chart_range_by_id("bitcoin", "usd", 0, 10 * DAY)
+        store.get_coin_market_chart_range_by_id("bitcoin", "usd", 20 * DAY, 30 * DAY)
+        store.get_coin_market_chart_range_by_id("bitcoin", "usd", 0, 30 * DAY)
+        store.get_coin_market_chart_range_by_id("bitcoin", "usd", 5 * DAY, 25 * DAY)
+
+        ## Assert
+        assert requested == [
+            (0, 10 * DAY),
+            (20 * DAY, 30 * DAY),
+            (10 * DAY, 20 * DAY),
+        ]
+        assert (
+            store.missing_intervals("market_chart/bitcoin/usd/auto", 0, 30 * DAY) == []
+        )
+
+    @responses.activate
+    def test_recent_data_is_refetched(self, tmp_path):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/exchanges/binance/volume_chart/range",
+            json=[[1000, "10.5"]],
+            status=200,
+        )
+        store = TimeSeriesStore(PestoAPI(), str(tmp_path / "ts.sqlite"))
+
+        for _ in range(2):
+            volume = store.get_exchanges_volume_chart_by_id_within_time_range(
+                "binance", 0, 4102444800
+            )
+
+        ## Assert
+        assert len(responses.calls) == 2
+        assert volume == [[1000, "10.5"]]
+
+    @responses.activate
+    def test_store_persists_between_instances(self, tmp_path):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/bitcoin/ohlc/range",
+            json=[[DAY * 1000, 1.0, 2.0, 0.5, 1.5]],
+            status=200,
+        )
+        path = str(tmp_path / "ts.sqlite")
+
+        with TimeSeriesStore(PestoAPI(), path) as store:
+            store.get_coin_ohlc_by_id_range("bitcoin", "usd", 0, 2 * DAY, "daily")
+        with TimeSeriesStore(PestoAPI(), path) as store:
+            ohlc = store.get_coin_ohlc_by_id_range(
+                "bitcoin", "usd", 0, 2 * DAY, "daily"
+            )
+
+        ## Assert
+        assert len(responses.calls) == 1
+        assert ohlc == [[DAY * 1000, 1.0, 2.0, 0.5, 1.5]]
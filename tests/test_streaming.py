@@ -0,0 +1,115 @@
+import json
+
+import pytest
+import responses
+
+from pypestoai import NotFoundError, PestoAPI
+from pypestoai.streaming import JSONArrayStream, iter_json_array
+
+COINS = [
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "platforms": {}},
+    {"id": "zürich-coin", "symbol": "zür", "name": "Zürich 🪙"},
+    12345,
+    -1.5e3,
+    None,
+    True,
+    "text, with ] and }",
+    [1, [2, 3]],
+]
+
+
+def chunked(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class TestJSONArrayStream:
+    @pytest.mark.parametrize("size", [1, 2, 7, 64, 100000])
+    def test_elements_are_identical_for_any_chunk_size(self, size):
+        body = json.dumps(COINS, ensure_ascii=False, indent=1).encode()
+
+        ## Assert
+        assert list(iter_json_array(chunked(body, size))) == COINS
+
+    @pytest.mark.parametrize("size", [1, 5, 100000])
+    def test_array_under_key(self, size):
+        body = json.dumps(
+            {
+                "name": "Pesto Token List",
+                "keywords": ["defi", {"nested": "[1, 2]"}],
+                "tokens": COINS,
+                "version": {"major": 1},
+            }
+        ).encode()
+
+        ## Assert
+        assert list(iter_json_array(chunked(body, size), key="tokens")) == COINS
+
+    def test_elements_are_returned_as_soon_as_complete(self):
+        parser = JSONArrayStream()
+
+        ## Assert
+        assert parser.feed(b'[{"id": "a"}, {"id": ') == [{"id": "a"}]
+        assert parser.feed(b'"b"}, 12') == [{"id": "b"}]
+        assert parser.feed(b"3") == []
+        assert parser.feed(b"]") == [123]
+        assert parser.close() == []
+
+    def test_empty_array(self):
+        ## Assert
+        assert list(iter_json_array([b" [ ] "])) == []
+        assert list(iter_json_array([b'{"tokens": []}'], key="tokens")) == []
+
+    def test_invalid_bodies_raise(self):
+        with pytest.raises(ValueError):
+            list(iter_json_array([b'[{"id": "a"}, {"id"']))
+        with pytest.raises(ValueError):
+            list(iter_json_array([b'{"id": "a"}']))
+        with pytest.raises(ValueError):
+            list(iter_json_array([b'{"name": "list"}'], key="tokens"))
+        with pytest.raises(ValueError):
+            list(iter_json_array([b"[1 2]"]))
+
+
+class TestStreamMethods:
+    @responses.activate
+    def test_stream_coins_list(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/coins/list?include_platform=true",
+            json=COINS[:2],
+            status=200,
+        )
+
+        coins = PestoAPI(stream_chunk_size=3).stream_coins_list(include_platform=True)
+
+        ## Assert
+        assert not responses.calls
+        assert list(coins) == COINS[:2]
+
+    @responses.activate
+    def test_stream_asset_platform_by_id(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/token_lists/ethereum/all.json",
+            json={"name": "Pesto", "tokens": [{"address": "0x1"}]},
+            status=200,
+        )
+
+        ## Assert
+        assert list(PestoAPI().stream_asset_platform_by_id("ethereum")) == [
+            {"address": "0x1"}
+        ]
+
+    @responses.activate
+    def test_stream_error(self):
+        responses.add(
+            responses.GET,
+            "https://api.pestoai.fun/v2/derivatives",
+            json={"error": "not found"},
+            status=404,
+        )
+
+        ## Assert
+        with pytest.raises(NotFoundError) as e:
+            list(PestoAPI(metrics=True).stream_derivatives())
+        assert e.value.body == {"error": "not found"}
@@ -0,0 +1,132 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from pypestoai import NotFoundError, PestoAPI
+from pypestoai.transport import InMemoryTransport, Urllib3Transport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    calls = []
+
+    def do_GET(self):
+        self.calls.append(self.path)
+        if self.path.startswith("/v2/flaky") and len(self.calls) == 1:
+            return self._send(503, {"error": "unavailable"})
+        if self.path.startswith("/v2/coins/missing"):
+            return self._send(404, {"error": "coin not found"})
+        if self.path == "/v2/coins/list":
+            return self._send(200, [{"id": "coin-{0}".format(i)} for i in range(50)])
+        self._send(
+            200,
+            {"path": self.path, "key": self.headers.get("x-demo-api-key")},
+        )
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.calls = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{0}/v2/".format(httpd.server_address[1])
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestUrllib3Transport:
+    def test_get(self, server):
+        pto = PestoAPI(demo_api_key="key", transport="urllib3")
+        pto.api_base_url = server
+
+        response = pto.get_price("bitcoin", "usd", include_market_cap=True)
+
+        ## Assert
+        assert isinstance(pto.transport, Urllib3Transport)
+        assert response == {
+            "path": "/v2/simple/price?include_market_cap=true&ids=bitcoin&vs_currencies=usd",
+            "key": "key",
+        }
+
+    def test_none_params_are_left_out(self, server):
+        pto = PestoAPI(transport="urllib3")
+        pto.api_base_url = server
+
+        response = pto.get_coins_markets("usd", category=None)
+
+        ## Assert
+        assert response["path"] == "/v2/coins/markets?vs_currency=usd"
+
+    def test_error_status(self, server):
+        pto = PestoAPI(transport="urllib3")
+        pto.api_base_url = server
+
+        ## Assert
+        with pytest.raises(NotFoundError) as e:
+            pto.get_coin_by_id("missing")
+        assert e.value.body == {"error": "coin not found"}
+
+    def test_retries_server_errors(self, server):
+        transport = PestoAPI(transport="urllib3").transport
+
+        response = transport.get(server + "flaky", None, {}, 5)
+
+        ## Assert
+        assert response.status_code == 200
+        assert response.retries == 1
+        assert len(_Handler.calls) == 2
+
+    def test_stream(self, server):
+        pto = PestoAPI(transport="urllib3", stream_chunk_size=4)
+        pto.api_base_url = server
+
+        ## Assert
+        assert list(pto.stream_coins_list()) == [
+            {"id": "coin-{0}".format(i)} for i in range(50)
+        ]
+
+    def test_connection_error(self):
+        pto = PestoAPI(retries=0, transport="urllib3")
+        pto.api_base_url = "http://127.0.0.1:1/v2/"
+
+        ## Assert
+        with pytest.raises(requests.exceptions.ConnectionError):
+            pto.ping()
+
+
+class TestInMemoryTransport:
+    def test_answers_from_handler(self):
+        def handler(path, params, headers):
+            if path == "coins/list":
+                return 200, b'[{"id": "bitcoin"}]'
+            return 404, b'{"error": "not found"}', {"X-Test": "1"}
+
+        transport = InMemoryTransport(handler)
+        pto = PestoAPI(transport=transport)
+
+        ## Assert
+        assert pto.get_coins_list(include_platform=True, status=None) == [
+            {"id": "bitcoin"}
+        ]
+        with pytest.raises(NotFoundError) as e:
+            pto.get_coin_by_id("bitcoin")
+        assert e.value.response.headers["x-test"] == "1"
+        assert e.value.response.reason == "Not Found"
+        assert transport.requests == [
+            ("coins/list", {"include_platform": "true"}),
+            ("coins/bitcoin/", {}),
+        ]